@@ -0,0 +1,15 @@
+"""
+API admin configuration.
+"""
+from django.contrib import admin
+from .models import IdempotencyKey
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    """Admin interface for IdempotencyKey model."""
+    list_display = ('key', 'method', 'path', 'status_code', 'user', 'created_at', 'tenant')
+    list_filter = ('tenant', 'method', 'status_code')
+    search_fields = ('key', 'path')
+    ordering = ('-created_at',)
+    readonly_fields = ('created_at',)
@@ -0,0 +1,109 @@
+"""
+Idempotency-Key support for API write endpoints.
+
+A client sends a unique ``Idempotency-Key`` header with a write request.
+The first successful response is stored with the key, in the same
+transaction as the write, and a retry with the same key and body gets that
+response back without redoing the work. Reusing a key for a different
+request is refused. Keys are remembered for API_IDEMPOTENCY_KEY_TTL
+seconds.
+"""
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+
+HEADER = 'Idempotency-Key'
+REPLAY_HEADER = 'Idempotent-Replayed'
+KEY_TTL = getattr(settings, 'API_IDEMPOTENCY_KEY_TTL', 24 * 60 * 60)
+MAX_KEY_LENGTH = IdempotencyKey._meta.get_field('key').max_length
+
+
+def request_fingerprint(request):
+    """SHA-256 of the request body, independent of key order."""
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _cutoff():
+    return timezone.now() - timedelta(seconds=KEY_TTL)
+
+
+def _find(user, key):
+    return IdempotencyKey.objects.filter(user=user, key=key, created_at__gte=_cutoff()).first()
+
+
+def _replay(stored, request, fingerprint):
+    if (stored.method, stored.path, stored.request_hash) != (request.method, request.path, fingerprint):
+        return Response(
+            {'detail': f'{HEADER} was already used for a different request.'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(stored.response, status=stored.status_code, headers={REPLAY_HEADER: 'true'})
+
+
+def idempotent(method):
+    """
+    Make an APIView handler honour the Idempotency-Key header. Requests
+    without the header are handled as usual.
+    """
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {'detail': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        fingerprint = request_fingerprint(request)
+        stored = _find(request.user, key)
+        if stored:
+            return _replay(stored, request, fingerprint)
+
+        try:
+            with transaction.atomic():
+                response = method(self, request, *args, **kwargs)
+                if not status.is_success(response.status_code):
+                    # Nothing to remember; the client may fix the request and retry
+                    return response
+                # An expired key may be reused; a live one is left to the
+                # unique constraint, so a concurrent retry ends up replayed
+                IdempotencyKey.objects.filter(user=request.user, key=key, created_at__lt=_cutoff()).delete()
+                IdempotencyKey.objects.create(
+                    tenant=request.user.tenant,
+                    user=request.user,
+                    key=key,
+                    method=request.method,
+                    path=request.path,
+                    request_hash=fingerprint,
+                    status_code=response.status_code,
+                    response=json.loads(JSONRenderer().render(response.data)),
+                )
+        except IntegrityError:
+            # A concurrent request with the same key committed first; this
+            # one's writes were rolled back with the transaction
+            stored = _find(request.user, key)
+            if stored is None:
+                raise
+            return _replay(stored, request, fingerprint)
+        return response
+    return wrapper
+
+
+def purge_expired_keys():
+    """Delete keys older than the TTL. Returns the number deleted."""
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=_cutoff()).delete()
+    return deleted
@@ -0,0 +1,16 @@
+"""
+Management command to delete expired API idempotency keys.
+Usage: python manage.py purge_idempotency_keys
+"""
+from django.core.management.base import BaseCommand
+from api.idempotency import KEY_TTL, purge_expired_keys
+
+
+class Command(BaseCommand):
+    help = 'Delete stored Idempotency-Key responses older than API_IDEMPOTENCY_KEY_TTL'
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_keys()
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Deleted {deleted} idempotency key(s) older than {KEY_TTL} seconds.'
+        ))
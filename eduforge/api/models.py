@@ -0,0 +1,42 @@
+"""
+API models.
+"""
+from django.db import models
+from django.utils import timezone
+from core.tenants.models import Tenant
+from core.users.models import CustomUser
+
+
+class IdempotencyKey(models.Model):
+    """
+    Stored response of a write request sent with an ``Idempotency-Key``
+    header. A retry with the same key and body gets the stored response back
+    instead of redoing the write.
+    """
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='idempotency_keys')
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    
+    # What the key was used for, so reuse with a different request is refused
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    
+    status_code = models.PositiveSmallIntegerField()
+    response = models.JSONField()
+    
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        verbose_name = 'Idempotency Key'
+        verbose_name_plural = 'Idempotency Keys'
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key_per_user'),
+        ]
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.key})"
@@ -0,0 +1,96 @@
+from django.urls import reverse
+
+from api.models import IdempotencyKey
+from modules.attendance.models import Attendance
+from modules.attendance.tests.base import DAYS, AttendanceTestCase
+
+
+class SectionAttendanceTests(AttendanceTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.teacher)
+        self.url = reverse('api:v1:section-attendance', args=[self.section.pk])
+
+    def post(self, status='present', key=None, day=DAYS[0]):
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+        return self.client.post(self.url, {
+            'date': day.isoformat(),
+            'records': [{'student': str(student.user_id), 'status': status} for student in self.section_students],
+        }, content_type='application/json', **headers)
+
+    def statuses(self):
+        return set(Attendance.objects.filter(date=DAYS[0]).values_list('status', flat=True))
+
+    def test_roster_shows_the_day(self):
+        self.post('late')
+
+        response = self.client.get(self.url, {'date': DAYS[0].isoformat()})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(entry['roll_number'], entry['status']) for entry in response.json()['students']],
+            [(str(i + 1), 'late') for i in range(6)],
+        )
+
+    def test_post_writes_the_day(self):
+        response = self.post()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['written'], 6)
+        self.assertEqual({result['result'] for result in response.json()['results']}, {'saved'})
+        self.assertEqual(Attendance.objects.filter(date=DAYS[0]).count(), 6)
+
+    def test_retry_with_the_same_key_is_replayed(self):
+        first = self.post(key='tablet-1')
+        Attendance.objects.update(status='absent')
+
+        retry = self.post(key='tablet-1')
+
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        # The write was not redone
+        self.assertEqual(self.statuses(), {'absent'})
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+    def test_reusing_a_key_for_another_request_is_refused(self):
+        self.post(key='tablet-1')
+
+        response = self.post('late', key='tablet-1')
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(self.statuses(), {'present'})
+
+    def test_failed_requests_are_not_remembered(self):
+        response = self.client.post(
+            self.url, {'records': []}, content_type='application/json', HTTP_IDEMPOTENCY_KEY='tablet-1',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        self.assertEqual(self.post(key='tablet-1').status_code, 200)
+
+    def test_students_of_other_sections_are_rejected(self):
+        outsider = self.class_students[0]
+
+        response = self.client.post(self.url, {
+            'date': DAYS[0].isoformat(),
+            'records': [{'student': str(outsider.user_id), 'status': 'present'}],
+        }, content_type='application/json')
+
+        self.assertEqual(response.json()['results'][0]['result'], 'rejected')
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_stale_version_is_a_conflict(self):
+        self.post()
+
+        response = self.client.post(self.url, {
+            'date': DAYS[0].isoformat(),
+            'version': 0,
+            'records': [{'student': str(self.section_students[0].user_id), 'status': 'absent'}],
+        }, content_type='application/json')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['version'], 1)
+        self.assertEqual(self.statuses(), {'present'})
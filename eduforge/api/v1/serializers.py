@@ -2,6 +2,7 @@
 API v1 serializers.
 """
 from rest_framework import serializers
+from modules.attendance.models import Attendance
 
 
 class BaseSerializer(serializers.ModelSerializer):
@@ -10,3 +11,23 @@ class BaseSerializer(serializers.ModelSerializer):
     """
     class Meta:
         fields = '__all__'
+
+
+class AttendanceEntrySerializer(serializers.Serializer):
+    """
+    One student's status in a bulk attendance submission. ``student`` is the
+    student's user id, as listed by the roster endpoint.
+    """
+    student = serializers.UUIDField()
+    status = serializers.ChoiceField(choices=Attendance.STATUS_CHOICES)
+
+
+class BulkAttendanceSerializer(serializers.Serializer):
+    """
+    A whole section-day or class-day of attendance. The date defaults to today.
+    ``version`` is the day's version from the roster; when given, the write
+    fails with a conflict if someone else has written the day since.
+    """
+    date = serializers.DateField(required=False)
+    version = serializers.IntegerField(required=False, min_value=0)
+    records = AttendanceEntrySerializer(many=True, allow_empty=False)
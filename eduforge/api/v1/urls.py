@@ -7,6 +7,9 @@ from . import views
 app_name = 'v1'
 
 urlpatterns = [
-    # Add your v1 API endpoints here
-    # Example: path('users/', views.UserListView.as_view(), name='user-list'),
+    path(
+        'attendance/sections/<str:target_id>/',
+        views.SectionAttendanceView.as_view(),
+        name='section-attendance'
+    ),
 ]
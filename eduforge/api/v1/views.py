@@ -1,9 +1,22 @@
 """
 API v1 views.
 """
-from rest_framework import viewsets
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import permissions, serializers, status, viewsets
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.views import APIView
+
+from api.idempotency import idempotent
+from core.plugins.entitlements import get_entitlements
+from modules.attendance.models import Class, Student
+from modules.attendance.queue import enqueue_attendance, write_behind_enabled
+from modules.attendance.rollups import AttendanceConflict
+from modules.attendance.roster import get_day_roster, invalidate_day_roster
+from modules.attendance.writer import write_attendance
+from .serializers import BulkAttendanceSerializer
 
 
 class BaseViewSet(viewsets.ModelViewSet):
@@ -11,3 +24,154 @@ class BaseViewSet(viewsets.ModelViewSet):
     Base ViewSet for all API endpoints.
     """
     pass
+
+
+class CanMarkAttendance(permissions.BasePermission):
+    """
+    Teachers and Principals of a tenant with the attendance module installed.
+    Reads need view access to the module, writes need edit access.
+    """
+    message = 'You do not have permission to mark attendance.'
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user.tenant_id or not user.role_id or user.role.name not in ['Teacher', 'Principal']:
+            return False
+        access = get_entitlements(user.tenant_id, user.role_id)
+        if not access.is_installed('attendance'):
+            return False
+        if request.method in permissions.SAFE_METHODS:
+            return access.can_view('attendance')
+        return access.can_edit('attendance')
+
+
+class SectionAttendanceView(APIView):
+    """
+    Roster and bulk attendance for one section-day.
+
+    ``target_id`` is an academic Section id, or a legacy attendance Class id
+    (a UUID). Students are addressed by their user id.
+
+    GET ?date=YYYY-MM-DD lists the roster with each student's status for the
+    day and the day's version. POST {"date": ..., "version": ..., "records":
+    [{"student": ..., "status": ...}]} writes the whole day in one
+    transaction and returns a result per student; in write-behind mode it
+    queues the day and answers 202. Either way it answers 409 if the day
+    has moved past ``version`` (or, queued, another user's submission is
+    already based on it).
+    POSTs honour the Idempotency-Key header.
+    """
+    permission_classes = [permissions.IsAuthenticated, CanMarkAttendance]
+
+    def get_target(self, request, target_id):
+        """Return (section, class_obj) for the addressed section or class."""
+        tenant = request.user.tenant
+        user_role = request.user.role.name if request.user.role else None
+
+        # Academic section IDs are integers, legacy class IDs are UUIDs
+        try:
+            section_id = int(target_id)
+        except ValueError:
+            section_id = None
+
+        if section_id is not None:
+            try:
+                from modules.academic.models import Section
+            except ImportError:
+                raise ValidationError({'detail': 'Academic sections are not available.'})
+
+            section = get_object_or_404(Section.objects.select_related('class_obj'), id=section_id, tenant=tenant)
+            if user_role == 'Teacher' and section.class_teacher_id != request.user.id:
+                raise PermissionDenied('You do not have permission to mark attendance for this section.')
+            return section, None
+
+        class_obj = get_object_or_404(Class, id=target_id, tenant=tenant)
+        if user_role == 'Teacher' and class_obj.class_teacher_id != request.user.id:
+            raise PermissionDenied('You do not have permission to mark attendance for this class.')
+        return None, class_obj
+
+    def describe_target(self, section, class_obj):
+        if section is not None:
+            return {'type': 'section', 'id': section.id, 'name': section.full_name}
+        return {'type': 'class', 'id': str(class_obj.id), 'name': str(class_obj)}
+
+    def get(self, request, target_id):
+        section, class_obj = self.get_target(request, target_id)
+
+        date = request.query_params.get('date')
+        if date:
+            date = serializers.DateField().run_validation(date)
+        else:
+            date = timezone.now().date()
+
+        roster = get_day_roster(request.user.tenant, date, section=section, class_obj=class_obj)
+        return Response({
+            'date': date,
+            'target': self.describe_target(section, class_obj),
+            'version': roster['version'],
+            'students': [
+                {
+                    'student': entry['user_id'],
+                    'roll_number': entry['roll_number'],
+                    'name': entry['name'],
+                    'status': entry['status'],
+                }
+                for entry in roster['students']
+            ],
+        })
+
+    @idempotent
+    def post(self, request, target_id):
+        tenant = request.user.tenant
+        section, class_obj = self.get_target(request, target_id)
+
+        serializer = BulkAttendanceSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        date = serializer.validated_data.get('date') or timezone.now().date()
+
+        # Later entries for the same student win
+        submitted = {record['student']: record['status'] for record in serializer.validated_data['records']}
+        roster = get_day_roster(tenant, date, section=section, class_obj=class_obj)
+        on_roster = [entry for entry in roster['students'] if entry['user_id'] in submitted]
+
+        students = Student.objects.in_bulk([entry['id'] for entry in on_roster])
+        entries = [(students[entry['id']], submitted[entry['user_id']]) for entry in on_roster]
+        queued = write_behind_enabled()
+        try:
+            if queued:
+                count = enqueue_attendance(
+                    tenant, request.user, date, entries, section=section, class_obj=class_obj,
+                    expected_version=serializer.validated_data.get('version'),
+                )
+                invalidate_day_roster(tenant, date, section=section, class_obj=class_obj)
+            else:
+                count = write_attendance(
+                    tenant, request.user, date, entries, section=section, class_obj=class_obj,
+                    expected_version=serializer.validated_data.get('version'),
+                )
+        except AttendanceConflict as exc:
+            return Response({
+                'detail': 'Someone else saved attendance for this day since it was read. Reload and resubmit.',
+                'version': exc.current_version,
+            }, status=status.HTTP_409_CONFLICT)
+
+        saved = {entry['user_id'] for entry in on_roster}
+        results = []
+        for user_id, student_status in submitted.items():
+            if user_id in saved:
+                results.append({'student': user_id, 'status': student_status, 'result': 'queued' if queued else 'saved'})
+            else:
+                results.append({
+                    'student': user_id,
+                    'status': student_status,
+                    'result': 'rejected',
+                    'error': 'Student is not on this roster.',
+                })
+
+        return Response({
+            'date': date,
+            'target': self.describe_target(section, class_obj),
+            'written': 0 if queued else count,
+            'queued': count if queued else 0,
+            'results': results,
+        }, status=status.HTTP_202_ACCEPTED if queued else status.HTTP_200_OK)
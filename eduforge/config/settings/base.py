@@ -45,6 +45,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     # Third-party apps
     'rest_framework',
+    'rest_framework.authtoken',
     'corsheaders',
     # Local apps
     'core.users',
@@ -104,6 +105,35 @@ DATABASES = {
     }
 }
 
+# Cache
+# Module entitlement snapshots live here. Use a backend shared by all worker
+# processes in production so invalidations reach every worker.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'eduforge',
+    }
+}
+
+# Seconds a (tenant, role) module entitlement snapshot may be served
+PLUGIN_ENTITLEMENT_CACHE_TIMEOUT = 300
+
+# Seconds a teacher's attendance dashboard for a day may be served
+ATTENDANCE_DASHBOARD_CACHE_TIMEOUT = 300
+
+# Seconds a tenant's monthly attendance heatmap may be served
+ATTENDANCE_HEATMAP_CACHE_TIMEOUT = 600
+
+# Seconds a section-day roster for the mark attendance page may be served
+ATTENDANCE_ROSTER_CACHE_TIMEOUT = 300
+
+# Queue attendance submissions for the process_attendance_queue workers
+ATTENDANCE_WRITE_BEHIND = False
+
+# PostgreSQL only: partition the attendance table by date ('month' or 'year')
+ATTENDANCE_PARTITIONING = False
+ATTENDANCE_PARTITION_INTERVAL = 'month'
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -150,6 +180,9 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20,
 }
 
+# Seconds an API Idempotency-Key and its stored response are remembered
+API_IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     'http://localhost:3000',
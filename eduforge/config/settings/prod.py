@@ -21,6 +21,21 @@ DATABASES = {
     }
 }
 
+# Cache - shared between gunicorn workers
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', os.path.join(BASE_DIR, 'cache')),
+    }
+}
+
+# Attendance table partitioning (see modules/attendance/partitions.py)
+ATTENDANCE_PARTITIONING = os.environ.get('ATTENDANCE_PARTITIONING', 'False').lower() in ('1', 'true', 'yes')
+ATTENDANCE_PARTITION_INTERVAL = os.environ.get('ATTENDANCE_PARTITION_INTERVAL', 'month')
+
+# Write-behind attendance submissions (see modules/attendance/queue.py)
+ATTENDANCE_WRITE_BEHIND = os.environ.get('ATTENDANCE_WRITE_BEHIND', 'False').lower() in ('1', 'true', 'yes')
+
 # Security settings
 SECURE_SSL_REDIRECT = True
 SESSION_COOKIE_SECURE = True
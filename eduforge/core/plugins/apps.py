@@ -8,3 +8,11 @@ class PluginsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core.plugins'
     verbose_name = 'Plugins'
+
+    def ready(self):
+        # Register cache invalidation handlers
+        from core.plugins import signals  # noqa: F401
+
+        # Parse every modules/<slug>/plugin.py once per process
+        from core.plugins.registry import plugin_registry
+        plugin_registry.load()
@@ -0,0 +1,186 @@
+"""
+Cached per-tenant module entitlements.
+
+The access middleware needs to know, for every module request, whether the
+module is active, whether the tenant has it installed and what the user's
+role may do with it. Those answers only change when a Module, TenantModule,
+ModulePermission or Role row is written, so they are computed once per
+(tenant, role) and kept in the cache until one of those writes happens.
+The dashboard's module cards are derived from the same rows and are cached
+the same way.
+
+Invalidation uses generation counters: a global one bumped on Module writes
+and one per tenant bumped on TenantModule, ModulePermission and Role writes.
+Snapshot keys embed both generations, so stale snapshots are simply never
+read again and expire on their own. Counters start from the current time so
+a counter that was evicted and recreated never reuses an old generation.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+CACHE_PREFIX = 'plugins:entitlements'
+GLOBAL_GENERATION_KEY = f'{CACHE_PREFIX}:generation'
+CACHE_TIMEOUT = getattr(settings, 'PLUGIN_ENTITLEMENT_CACHE_TIMEOUT', 300)
+
+
+class TenantEntitlements:
+    """
+    Immutable snapshot of module access for one tenant and role.
+    """
+
+    NO_PERMISSION = {'can_view': False, 'can_edit': False, 'can_manage': False}
+
+    def __init__(self, active_modules, installed_modules, permissions):
+        self.active_modules = frozenset(active_modules)
+        self.installed_modules = frozenset(installed_modules)
+        self.permissions = dict(permissions)
+
+    def is_active(self, slug):
+        """Whether the module exists and is available system-wide."""
+        return slug in self.active_modules
+
+    def is_installed(self, slug):
+        """Whether the tenant has the module installed."""
+        return slug in self.installed_modules
+
+    def has_permission(self, slug):
+        """Whether a ModulePermission row exists for this role and module."""
+        return slug in self.permissions
+
+    def get_permission(self, slug):
+        """Return the view/edit/manage bits for a module."""
+        return self.permissions.get(slug, self.NO_PERMISSION)
+
+    def can_view(self, slug):
+        return self.get_permission(slug)['can_view']
+
+    def can_edit(self, slug):
+        return self.get_permission(slug)['can_edit']
+
+    def can_manage(self, slug):
+        return self.get_permission(slug)['can_manage']
+
+
+def _tenant_generation_key(tenant_id):
+    return f'{CACHE_PREFIX}:tenant:{tenant_id}:generation'
+
+
+def _new_generation():
+    return int(time.time() * 1000)
+
+
+def _get_generations(tenant_id):
+    """Return (global, tenant) generation counters, initialising missing ones."""
+    tenant_key = _tenant_generation_key(tenant_id)
+    generations = cache.get_many([GLOBAL_GENERATION_KEY, tenant_key])
+    global_generation = generations.get(GLOBAL_GENERATION_KEY)
+    tenant_generation = generations.get(tenant_key)
+    if global_generation is None:
+        cache.add(GLOBAL_GENERATION_KEY, _new_generation(), None)
+        global_generation = cache.get(GLOBAL_GENERATION_KEY)
+    if tenant_generation is None:
+        cache.add(tenant_key, _new_generation(), None)
+        tenant_generation = cache.get(tenant_key)
+    return global_generation, tenant_generation
+
+
+def _bump(key):
+    """Increment a generation counter, creating it if it was evicted."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_generation(), None)
+
+
+def build_entitlements(tenant_id, role_id):
+    """
+    Build an entitlement snapshot from the database (three queries).
+    """
+    from core.plugins.models import Module, TenantModule, ModulePermission
+
+    active_modules = Module.objects.filter(is_active=True).values_list('slug', flat=True)
+    installed_modules = TenantModule.objects.filter(
+        tenant_id=tenant_id,
+        is_installed=True,
+        module__is_active=True,
+    ).values_list('module__slug', flat=True)
+
+    permissions = {}
+    if role_id:
+        rows = ModulePermission.objects.filter(
+            role_id=role_id,
+            role__tenant_id=tenant_id,
+        ).values_list('module__slug', 'can_view', 'can_edit', 'can_manage')
+        for slug, can_view, can_edit, can_manage in rows:
+            permissions[slug] = {
+                'can_view': can_view,
+                'can_edit': can_edit,
+                'can_manage': can_manage,
+            }
+
+    return TenantEntitlements(active_modules, installed_modules, permissions)
+
+
+def build_dashboard_modules(tenant_id, role_id):
+    """
+    Build the dashboard module cards the role may view, with the tenant's
+    install state, in a single annotated query.
+    """
+    from django.db.models import Exists, OuterRef
+    from core.plugins.models import Module, TenantModule
+
+    if not role_id:
+        return []
+
+    modules = Module.objects.filter(
+        is_active=True,
+        permissions__role_id=role_id,
+        permissions__can_view=True,
+    ).annotate(
+        is_installed=Exists(TenantModule.objects.filter(
+            tenant_id=tenant_id,
+            module=OuterRef('pk'),
+            is_installed=True,
+        ))
+    )
+
+    return [{'module': module, 'is_installed': module.is_installed} for module in modules]
+
+
+def _cached(kind, builder, tenant_id, role_id):
+    global_generation, tenant_generation = _get_generations(tenant_id)
+    key = f'{CACHE_PREFIX}:{kind}:{global_generation}:{tenant_generation}:{tenant_id}:{role_id}'
+
+    value = cache.get(key)
+    if value is None:
+        value = builder(tenant_id, role_id)
+        cache.set(key, value, CACHE_TIMEOUT)
+    return value
+
+
+def get_entitlements(tenant_id, role_id):
+    """
+    Return the cached entitlement snapshot for a tenant and role.
+    """
+    return _cached('access', build_entitlements, tenant_id, role_id)
+
+
+def get_dashboard_modules(tenant_id, role_id):
+    """
+    Return the cached dashboard module cards for a tenant and role.
+    """
+    return _cached('dashboard', build_dashboard_modules, tenant_id, role_id)
+
+
+def invalidate_tenant(tenant_id):
+    """Drop every cached snapshot for a tenant."""
+    if tenant_id is not None:
+        _bump(_tenant_generation_key(tenant_id))
+
+
+def invalidate_all():
+    """Drop every cached snapshot for every tenant."""
+    _bump(GLOBAL_GENERATION_KEY)
@@ -2,10 +2,9 @@
 Module Discovery and Loading System.
 Scans the modules/ directory and registers modules automatically.
 """
-import os
-import importlib.util
 from pathlib import Path
 from django.conf import settings
+from core.plugins.registry import plugin_registry
 
 
 class ModuleLoader:
@@ -19,73 +18,14 @@ class ModuleLoader:
     
     def discover_modules(self):
         """
-        Scan the modules/ directory for valid modules.
+        Rescan the modules/ directory for valid modules.
         A valid module has a plugin.py file with required attributes.
+        The process-wide plugin registry is reloaded as a side effect.
         """
-        if not self.modules_dir.exists():
-            print(f"Modules directory not found: {self.modules_dir}")
-            return []
-        
-        self.discovered_modules = []
-        
-        # Iterate through subdirectories in modules/
-        for module_path in self.modules_dir.iterdir():
-            if not module_path.is_dir():
-                continue
-            
-            # Skip __pycache__ and other special directories
-            if module_path.name.startswith('_'):
-                continue
-            
-            # Look for plugin.py
-            plugin_file = module_path / 'plugin.py'
-            if plugin_file.exists():
-                module_info = self._load_plugin_config(plugin_file, module_path.name)
-                if module_info:
-                    self.discovered_modules.append(module_info)
-        
+        plugins = plugin_registry.reload()
+        self.discovered_modules = [info.as_dict() for info in plugins.values()]
         return self.discovered_modules
     
-    def _load_plugin_config(self, plugin_file, module_dir_name):
-        """
-        Load configuration from plugin.py file.
-        """
-        try:
-            # Dynamically import the plugin.py file
-            spec = importlib.util.spec_from_file_location(
-                f"modules.{module_dir_name}.plugin", 
-                plugin_file
-            )
-            if spec and spec.loader:
-                plugin_module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(plugin_module)
-                
-                # Extract required attributes
-                plugin_name = getattr(plugin_module, 'PLUGIN_NAME', None)
-                slug = getattr(plugin_module, 'SLUG', None)
-                description = getattr(plugin_module, 'DESCRIPTION', '')
-                version = getattr(plugin_module, 'VERSION', '1.0.0')
-                icon = getattr(plugin_module, 'ICON', '')
-                color = getattr(plugin_module, 'COLOR', '')
-                
-                # Validate required fields
-                if not plugin_name or not slug:
-                    print(f"Warning: Module {module_dir_name} missing required fields (PLUGIN_NAME, SLUG)")
-                    return None
-                
-                return {
-                    'name': plugin_name,
-                    'slug': slug,
-                    'description': description,
-                    'version': version,
-                    'icon': icon,
-                    'color': color,
-                    'directory': module_dir_name,
-                }
-        except Exception as e:
-            print(f"Error loading plugin from {plugin_file}: {e}")
-            return None
-    
     def sync_to_database(self):
         """
         Sync discovered modules to the database.
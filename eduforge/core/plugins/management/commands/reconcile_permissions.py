@@ -0,0 +1,35 @@
+"""
+Management command to reconcile tenant roles and module permissions.
+Usage: python manage.py reconcile_permissions [--tenant <subdomain>]
+"""
+from django.core.management.base import BaseCommand, CommandError
+from core.plugins.reconcile import reconcile_all
+from core.tenants.models import Tenant
+
+
+class Command(BaseCommand):
+    help = 'Create missing default roles, module permissions and user roles for tenants'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            action='append',
+            dest='tenants',
+            help='Tenant subdomain to reconcile (repeatable). Defaults to all tenants.',
+        )
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.all()
+        if options['tenants']:
+            tenants = tenants.filter(subdomain__in=options['tenants'])
+            if not tenants.exists():
+                raise CommandError('No matching tenants found')
+
+        result = reconcile_all(tenants)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✓ Reconciled roles and module permissions for {result.tenants} tenant(s). '
+                f'Created {result.created}, updated {result.updated} permission records.'
+            )
+        )
@@ -1,54 +1,73 @@
 """
 Management command to sync module permissions from plugin.py across all tenants.
+Usage: python manage.py sync_module_permissions [--tenant <subdomain>] [--module <slug>] [--dry-run] [--workers N]
 """
-from django.core.management.base import BaseCommand
-from core.plugins.models import Module, ModulePermission
+from django.core.management.base import BaseCommand, CommandError
+from core.plugins.models import Module
+from core.plugins.permission_sync import sync_permissions, MODE_FORCE
 from core.tenants.models import Tenant
-from core.users.models import Role
 
 
 class Command(BaseCommand):
     help = 'Sync module permissions from plugin configurations across all tenants'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            action='append',
+            dest='tenants',
+            help='Tenant subdomain to sync (repeatable). Defaults to all tenants.',
+        )
+        parser.add_argument(
+            '--module',
+            action='append',
+            dest='modules',
+            help='Module slug to sync (repeatable). Defaults to all active modules.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change without writing anything',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of tenant chunks to sync in parallel (default: 1)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=200,
+            help='Tenants per chunk/transaction (default: 200)',
+        )
+
     def handle(self, *args, **options):
         tenants = Tenant.objects.all()
-        modules = Module.objects.filter(is_active=True)
-
-        total_updated = 0
-
-        for tenant in tenants:
-            for module in modules:
-                plugin_defaults = ModulePermission._load_plugin_defaults(module)
-                if not plugin_defaults:
-                    continue
+        if options['tenants']:
+            tenants = tenants.filter(subdomain__in=options['tenants'])
+            if not tenants.exists():
+                raise CommandError('No matching tenants found')
 
-                for role in Role.objects.filter(tenant=tenant):
-                    perms = plugin_defaults.get(
-                        role.name,
-                        {'can_view': False, 'can_edit': False, 'can_manage': False}
-                    )
-
-                    permission, created = ModulePermission.objects.get_or_create(
-                        module=module,
-                        role=role,
-                        defaults=perms,
-                    )
+        modules = Module.objects.filter(is_active=True)
+        if options['modules']:
+            modules = modules.filter(slug__in=options['modules'])
+            if not modules.exists():
+                raise CommandError('No matching active modules found')
 
-                    if not created:
-                        # Force update to match plugin defaults
-                        if (permission.can_view != perms['can_view'] or
-                            permission.can_edit != perms['can_edit'] or
-                            permission.can_manage != perms['can_manage']):
-                            
-                            permission.can_view = perms['can_view']
-                            permission.can_edit = perms['can_edit']
-                            permission.can_manage = perms['can_manage']
-                            permission.save(update_fields=['can_view', 'can_edit', 'can_manage'])
-                            total_updated += 1
+        result = sync_permissions(
+            tenants=tenants,
+            modules=list(modules),
+            mode=MODE_FORCE,
+            dry_run=options['dry_run'],
+            chunk_size=options['chunk_size'],
+            workers=options['workers'],
+        )
 
+        prefix = '[dry run] Would sync' if options['dry_run'] else '✓ Synced'
         self.stdout.write(
             self.style.SUCCESS(
-                f'✓ Synced permissions for {modules.count()} modules across {tenants.count()} tenants. '
-                f'Updated {total_updated} permission records.'
+                f'{prefix} permissions for {modules.count()} modules across {result.tenants} tenants. '
+                f'Created {result.created}, updated {result.updated} permission records.'
             )
         )
@@ -4,11 +4,19 @@ Usage: python manage.py sync_modules
 """
 from django.core.management.base import BaseCommand
 from core.plugins.loader import module_loader
+from core.plugins.reconcile import reconcile_all
 
 
 class Command(BaseCommand):
     help = 'Discover and synchronize modules from the modules/ directory'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--skip-permissions',
+            action='store_true',
+            help='Do not reconcile tenant roles and module permissions after syncing',
+        )
+
     def handle(self, *args, **options):
         self.stdout.write(self.style.WARNING('Starting module discovery...'))
         
@@ -23,6 +31,12 @@ class Command(BaseCommand):
                 self.stdout.write(
                     self.style.WARNING('No modules found to sync')
                 )
+
+            if not options['skip_permissions']:
+                result = reconcile_all()
+                self.stdout.write(
+                    self.style.SUCCESS(f'Reconciled module permissions for {result.tenants} tenant(s)')
+                )
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(f'Error syncing modules: {e}')
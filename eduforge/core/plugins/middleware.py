@@ -3,14 +3,17 @@ Middleware to check if a tenant has access to a module.
 """
 from django.shortcuts import redirect
 from django.contrib import messages
-from django.urls import resolve
-from core.plugins.models import Module, TenantModule, ModulePermission
-from core.users.models import Role
+from core.plugins.entitlements import get_entitlements
+from core.plugins.registry import plugin_registry
+from core.plugins.url_loader import url_loader
 
 
 class TenantModuleAccessMiddleware:
     """
     Middleware to ensure tenants can only access modules they have installed.
+
+    Module state and role permissions are read from a cached per-(tenant, role)
+    snapshot, so the check does not touch the database in the steady state.
     """
     
     def __init__(self, get_response):
@@ -21,10 +24,26 @@ class TenantModuleAccessMiddleware:
         response = self.get_response(request)
         return response
     
+    @property
+    def module_namespaces(self):
+        """
+        URL namespaces that belong to plugin modules. Read from the plugin
+        registry and the URL loader on every request, so a registry reload
+        or a URL reload is seen at once; both are in-memory sets.
+        """
+        return plugin_registry.slugs() & url_loader.namespaces
+
     def process_view(self, request, view_func, view_args, view_kwargs):
         """
         Check module access before view execution.
         """
+        # Reuse Django's own resolution; non-module pages (auth, admin, api)
+        # stop here without touching the cache or the database
+        resolver_match = getattr(request, 'resolver_match', None)
+        namespace = resolver_match.namespace if resolver_match else None
+        if namespace not in self.module_namespaces:
+            return None
+
         # Skip if user is not authenticated
         if not request.user.is_authenticated:
             return None
@@ -34,58 +53,31 @@ class TenantModuleAccessMiddleware:
             return None
         
         # Skip if no tenant (shouldn't happen but be safe)
-        if not hasattr(request.user, 'tenant') or not request.user.tenant:
+        tenant_id = getattr(request.user, 'tenant_id', None)
+        if not tenant_id:
             return None
         
-        # Get the current URL namespace
-        try:
-            resolved = resolve(request.path)
-            namespace = resolved.namespace
-        except:
-            return None
-        
-        # Check if this is a module namespace
-        if namespace and Module.objects.filter(slug=namespace, is_active=True).exists():
-            tenant = request.user.tenant
-
-            # Check if module exists and is installed for this tenant
-            try:
-                module = Module.objects.get(slug=namespace, is_active=True)
-                TenantModule.objects.get(
-                    tenant=tenant,
-                    module=module,
-                    is_installed=True
-                )
-            except (Module.DoesNotExist, TenantModule.DoesNotExist):
+        # Check the module is active (it may be disabled in the database)
+        access = get_entitlements(tenant_id, request.user.role_id)
+        if access.is_active(namespace):
+            # Check if module is installed for this tenant
+            if not access.is_installed(namespace):
                 messages.error(
                     request,
                     f'The {namespace.title()} module is not installed. Please install it from the dashboard.'
                 )
                 return redirect('auth:dashboard')
 
-            # Ensure the user has a role
-            if not request.user.role:
-                fallback_name = 'Principal' if request.user.is_staff else 'Student'
-                fallback_role = Role.objects.filter(tenant=tenant, name=fallback_name).first()
-                if fallback_role:
-                    request.user.role = fallback_role
-                    request.user.save(update_fields=['role'])
-                else:
-                    return redirect('auth:permission_denied')
-
-            permission = ModulePermission.objects.filter(module=module, role=request.user.role).first()
-            if not permission:
-                # Create defaults and retry
-                ModulePermission.ensure_default_permissions(tenant, module)
-                permission = ModulePermission.objects.filter(module=module, role=request.user.role).first()
-            if not permission:
+            # Roles and permissions are provisioned by core.plugins.reconcile,
+            # never on the request path
+            if not request.user.role_id or not access.has_permission(namespace):
                 return redirect('auth:permission_denied')
 
             if request.method in ['GET', 'HEAD', 'OPTIONS']:
-                if not permission.can_view:
+                if not access.can_view(namespace):
                     return redirect('auth:permission_denied')
             else:
-                if not permission.can_edit:
+                if not access.can_edit(namespace):
                     return redirect('auth:permission_denied')
         
         return None
@@ -5,9 +5,6 @@ from django.db import models
 from django.utils import timezone
 from core.tenants.models import Tenant
 from core.users.models import Role
-from django.conf import settings
-import importlib.util
-from pathlib import Path
 
 
 class Module(models.Model):
@@ -94,59 +91,16 @@ class ModulePermission(models.Model):
     @staticmethod
     def _load_plugin_defaults(module):
         """
-        Load DEFAULT_PERMISSIONS from a module's plugin.py if available.
+        Return DEFAULT_PERMISSIONS from the module's plugin.py if available.
+        Read from the in-memory plugin registry; nothing is loaded from disk.
         """
-        plugin_file = Path(settings.BASE_DIR) / 'modules' / module.slug / 'plugin.py'
-        if not plugin_file.exists():
-            return None
-
-        try:
-            spec = importlib.util.spec_from_file_location(
-                f"modules.{module.slug}.plugin",
-                plugin_file
-            )
-            if not spec or not spec.loader:
-                return None
-
-            plugin_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(plugin_module)
-            return getattr(plugin_module, 'DEFAULT_PERMISSIONS', None)
-        except Exception:
-            return None
+        from core.plugins.registry import plugin_registry
+        return plugin_registry.get_default_permissions(module.slug)
 
     @staticmethod
     def ensure_default_permissions(tenant, module):
         """
         Ensure default permissions exist for all roles in a tenant for a module.
         """
-        legacy_defaults = {
-            'Principal': {'can_view': True, 'can_edit': True, 'can_manage': True},
-            'Teacher': {'can_view': True, 'can_edit': True, 'can_manage': False},
-            'Staff': {'can_view': True, 'can_edit': False, 'can_manage': False},
-            'Student': {'can_view': True, 'can_edit': False, 'can_manage': False},
-        }
-
-        plugin_defaults = ModulePermission._load_plugin_defaults(module)
-        default_permissions = plugin_defaults or legacy_defaults
-
-        for role in Role.objects.filter(tenant=tenant):
-            perms = default_permissions.get(role.name, {'can_view': False, 'can_edit': False, 'can_manage': False})
-            permission, created = ModulePermission.objects.get_or_create(
-                module=module,
-                role=role,
-                defaults=perms,
-            )
-            if created:
-                continue
-
-            legacy = legacy_defaults.get(role.name, {'can_view': False, 'can_edit': False, 'can_manage': False})
-            is_legacy = (
-                permission.can_view == legacy['can_view']
-                and permission.can_edit == legacy['can_edit']
-                and permission.can_manage == legacy['can_manage']
-            )
-            if is_legacy and legacy != perms:
-                permission.can_view = perms['can_view']
-                permission.can_edit = perms['can_edit']
-                permission.can_manage = perms['can_manage']
-                permission.save(update_fields=['can_view', 'can_edit', 'can_manage'])
+        from core.plugins.permission_sync import sync_permissions
+        return sync_permissions(tenants=[tenant], modules=[module])
@@ -0,0 +1,188 @@
+"""
+Set-based module permission sync engine.
+
+Computes the desired (module, role) permission matrix for a chunk of tenants
+in memory, diffs it against the existing rows with one query, and applies the
+difference with bulk_create/bulk_update. Used by ensure_default_permissions,
+the reconciliation jobs and the sync_module_permissions command.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection, transaction
+
+from core.plugins import entitlements
+from core.plugins.registry import plugin_registry
+
+
+PERMISSION_FIELDS = ('can_view', 'can_edit', 'can_manage')
+
+NO_PERMISSION = {'can_view': False, 'can_edit': False, 'can_manage': False}
+
+LEGACY_DEFAULTS = {
+    'Principal': {'can_view': True, 'can_edit': True, 'can_manage': True},
+    'Teacher': {'can_view': True, 'can_edit': True, 'can_manage': False},
+    'Staff': {'can_view': True, 'can_edit': False, 'can_manage': False},
+    'Student': {'can_view': True, 'can_edit': False, 'can_manage': False},
+}
+
+# Create missing rows; only upgrade rows still holding the legacy defaults
+MODE_DEFAULTS = 'defaults'
+# Create missing rows and overwrite any row that differs from plugin.py
+MODE_FORCE = 'force'
+
+
+class SyncResult:
+    """
+    Counts of permission rows created and updated by a sync run.
+    """
+
+    def __init__(self, tenants=0, created=0, updated=0):
+        self.tenants = tenants
+        self.created = created
+        self.updated = updated
+
+    def __add__(self, other):
+        return SyncResult(
+            self.tenants + other.tenants,
+            self.created + other.created,
+            self.updated + other.updated,
+        )
+
+    def __repr__(self):
+        return f'SyncResult(tenants={self.tenants}, created={self.created}, updated={self.updated})'
+
+
+def _bits(perms):
+    return tuple(bool(perms.get(field, False)) for field in PERMISSION_FIELDS)
+
+
+def _desired_matrix(modules, mode):
+    """
+    Return {module_id: defaults_by_role_name} for the modules being synced.
+    In force mode, modules without plugin defaults are left untouched.
+    """
+    matrix = {}
+    for module in modules:
+        plugin_defaults = plugin_registry.get_default_permissions(module.slug)
+        if plugin_defaults:
+            matrix[module.id] = plugin_defaults
+        elif mode == MODE_DEFAULTS:
+            matrix[module.id] = LEGACY_DEFAULTS
+    return matrix
+
+
+def _sync_chunk(tenant_ids, matrix, mode, dry_run, batch_size):
+    """
+    Diff and apply the permission matrix for one chunk of tenants.
+    """
+    from core.plugins.models import ModulePermission
+    from core.users.models import Role
+
+    roles = list(Role.objects.filter(tenant_id__in=tenant_ids).values_list('id', 'name'))
+    if not roles or not matrix:
+        return SyncResult(tenants=len(tenant_ids))
+
+    existing = {
+        (permission.module_id, permission.role_id): permission
+        for permission in ModulePermission.objects.filter(
+            role_id__in=[role_id for role_id, _ in roles],
+            module_id__in=list(matrix),
+        )
+    }
+
+    to_create = []
+    to_update = []
+    for module_id, defaults in matrix.items():
+        for role_id, role_name in roles:
+            desired = _bits(defaults.get(role_name, NO_PERMISSION))
+            permission = existing.get((module_id, role_id))
+
+            if permission is None:
+                to_create.append(ModulePermission(
+                    module_id=module_id,
+                    role_id=role_id,
+                    **dict(zip(PERMISSION_FIELDS, desired)),
+                ))
+                continue
+
+            current = tuple(getattr(permission, field) for field in PERMISSION_FIELDS)
+            if current == desired:
+                continue
+
+            if mode == MODE_DEFAULTS:
+                # Only upgrade rows nobody has customised since the legacy defaults
+                legacy = _bits(LEGACY_DEFAULTS.get(role_name, NO_PERMISSION))
+                if current != legacy:
+                    continue
+
+            for field, value in zip(PERMISSION_FIELDS, desired):
+                setattr(permission, field, value)
+            to_update.append(permission)
+
+    result = SyncResult(tenants=len(tenant_ids), created=len(to_create), updated=len(to_update))
+    if dry_run or not (to_create or to_update):
+        return result
+
+    with transaction.atomic():
+        ModulePermission.objects.bulk_create(to_create, batch_size=batch_size, ignore_conflicts=True)
+        ModulePermission.objects.bulk_update(to_update, PERMISSION_FIELDS, batch_size=batch_size)
+
+        # Bulk writes skip model signals, so invalidate cached entitlements here
+        for tenant_id in tenant_ids:
+            transaction.on_commit(lambda tenant_id=tenant_id: entitlements.invalidate_tenant(tenant_id))
+
+    return result
+
+
+def _sync_chunk_in_thread(*args):
+    try:
+        return _sync_chunk(*args)
+    finally:
+        connection.close()
+
+
+def _chunks(items, size):
+    for index in range(0, len(items), size):
+        yield items[index:index + size]
+
+
+def sync_permissions(tenants=None, modules=None, mode=MODE_DEFAULTS, dry_run=False,
+                     chunk_size=200, batch_size=1000, workers=1):
+    """
+    Bring ModulePermission rows in line with plugin defaults.
+
+    ``tenants`` and ``modules`` accept querysets or lists and default to all
+    tenants and all active modules. Tenants are processed in chunks of
+    ``chunk_size``, each chunk in its own transaction; ``workers`` > 1 runs
+    chunks concurrently on separate database connections.
+    """
+    from core.plugins.models import Module
+    from core.tenants.models import Tenant
+
+    if tenants is None:
+        tenants = Tenant.objects.all()
+    if modules is None:
+        modules = Module.objects.filter(is_active=True)
+
+    if hasattr(tenants, 'values_list'):
+        tenant_ids = list(tenants.values_list('pk', flat=True))
+    else:
+        tenant_ids = [getattr(tenant, 'pk', tenant) for tenant in tenants]
+
+    matrix = _desired_matrix(modules, mode)
+    chunks = list(_chunks(tenant_ids, chunk_size))
+
+    result = SyncResult()
+    if workers > 1 and len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_sync_chunk_in_thread, chunk, matrix, mode, dry_run, batch_size)
+                for chunk in chunks
+            ]
+            for future in futures:
+                result += future.result()
+    else:
+        for chunk in chunks:
+            result += _sync_chunk(chunk, matrix, mode, dry_run, batch_size)
+
+    return result
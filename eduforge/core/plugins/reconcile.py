@@ -0,0 +1,98 @@
+"""
+Permission reconciliation jobs.
+
+Default roles, module permissions and user roles are created here, once per
+tenant or module change (registration, install_module, sync_modules), so the
+request path only ever reads them. New users get their fallback role as they
+are created, from a post_save handler in core.plugins.signals.
+"""
+from django.db.models import OuterRef, Subquery
+
+from core.plugins.permission_sync import sync_permissions
+from core.tenants.models import Tenant
+from core.users.models import CustomUser, Role
+
+
+def _as_queryset(tenants):
+    if hasattr(tenants, 'values_list'):
+        return tenants
+    return Tenant.objects.filter(pk__in=[tenant.pk for tenant in tenants])
+
+
+def fallback_role_name(is_staff):
+    """Staff users fall back to Principal, everyone else to Student."""
+    return 'Principal' if is_staff else 'Student'
+
+
+def assign_fallback_role(user):
+    """
+    Give a new user without a role their tenant's fallback role, if the
+    tenant has its default roles yet. Returns whether a role was assigned.
+    """
+    if user.role_id is not None or user.tenant_id is None:
+        return False
+    role = Role.objects.filter(tenant_id=user.tenant_id, name=fallback_role_name(user.is_staff)).first()
+    if role is None:
+        return False
+    CustomUser.objects.filter(pk=user.pk, role__isnull=True).update(role=role)
+    user.role = role
+    return True
+
+
+def assign_missing_roles(tenants):
+    """
+    Give users without a role their tenant's fallback role.
+    """
+    if isinstance(tenants, Tenant):
+        tenants = [tenants]
+    tenants = _as_queryset(tenants)
+
+    updated = 0
+    for is_staff in (True, False):
+        fallback_role = Role.objects.filter(
+            tenant=OuterRef('tenant'),
+            name=fallback_role_name(is_staff),
+        ).values('pk')[:1]
+        updated += CustomUser.objects.filter(
+            tenant__in=tenants,
+            role__isnull=True,
+            is_staff=is_staff,
+        ).update(role=Subquery(fallback_role))
+    return updated
+
+
+def create_missing_roles(tenants):
+    """
+    Create the default roles for tenants that have none.
+    """
+    for tenant in _as_queryset(tenants).filter(roles__isnull=True):
+        Role.create_default_roles(tenant)
+
+
+def reconcile_tenant(tenant, modules=None):
+    """
+    Ensure a tenant has default roles, a permission row for every role and
+    module, and a role for every user.
+    """
+    reconcile_all([tenant], modules)
+
+
+def reconcile_module(module, tenants=None):
+    """
+    Ensure permission rows exist for a module across tenants.
+    """
+    return sync_permissions(tenants=tenants, modules=[module])
+
+
+def reconcile_all(tenants=None, modules=None, workers=1):
+    """
+    Reconcile tenants against active modules.
+    Returns the permission SyncResult.
+    """
+    if tenants is None:
+        tenants = Tenant.objects.all()
+
+    create_missing_roles(tenants)
+    result = sync_permissions(tenants=tenants, modules=modules, workers=workers)
+    assign_missing_roles(tenants)
+    return result
@@ -0,0 +1,170 @@
+"""
+In-memory plugin registry.
+
+Every modules/<slug>/plugin.py is executed once per process, when the plugins
+app is ready, and its metadata is kept in an immutable mapping keyed by slug.
+Request paths read from this registry and never touch the filesystem;
+sync_modules calls reload() to pick up changes on disk.
+"""
+import importlib.util
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import NamedTuple
+
+from django.conf import settings
+
+
+class PluginInfo(NamedTuple):
+    """
+    Metadata declared by a module's plugin.py.
+    """
+    name: str
+    slug: str
+    description: str
+    version: str
+    icon: str
+    color: str
+    directory: str
+    default_permissions: MappingProxyType
+
+    def as_dict(self):
+        """Return the metadata in the format used by ModuleLoader."""
+        return {
+            'name': self.name,
+            'slug': self.slug,
+            'description': self.description,
+            'version': self.version,
+            'icon': self.icon,
+            'color': self.color,
+            'directory': self.directory,
+        }
+
+
+def load_plugin_file(plugin_file, module_dir_name):
+    """
+    Execute a plugin.py file and return its PluginInfo, or None if invalid.
+    """
+    try:
+        # Dynamically import the plugin.py file
+        spec = importlib.util.spec_from_file_location(
+            f"modules.{module_dir_name}.plugin",
+            plugin_file
+        )
+        if not spec or not spec.loader:
+            return None
+
+        plugin_module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(plugin_module)
+
+        # Extract required attributes
+        plugin_name = getattr(plugin_module, 'PLUGIN_NAME', None)
+        slug = getattr(plugin_module, 'SLUG', None)
+
+        # Validate required fields
+        if not plugin_name or not slug:
+            print(f"Warning: Module {module_dir_name} missing required fields (PLUGIN_NAME, SLUG)")
+            return None
+
+        default_permissions = getattr(plugin_module, 'DEFAULT_PERMISSIONS', None) or {}
+
+        return PluginInfo(
+            name=plugin_name,
+            slug=slug,
+            description=getattr(plugin_module, 'DESCRIPTION', ''),
+            version=getattr(plugin_module, 'VERSION', '1.0.0'),
+            icon=getattr(plugin_module, 'ICON', ''),
+            color=getattr(plugin_module, 'COLOR', ''),
+            directory=module_dir_name,
+            default_permissions=MappingProxyType({
+                role_name: MappingProxyType(dict(perms))
+                for role_name, perms in default_permissions.items()
+            }),
+        )
+    except Exception as e:
+        print(f"Error loading plugin from {plugin_file}: {e}")
+        return None
+
+
+class PluginRegistry:
+    """
+    Immutable, process-wide view of the plugins found in modules/.
+    """
+
+    def __init__(self, modules_dir=None):
+        self._modules_dir = modules_dir
+        self._plugins = None
+        self._lock = threading.Lock()
+
+    @property
+    def modules_dir(self):
+        return Path(self._modules_dir or Path(settings.BASE_DIR) / 'modules')
+
+    def _scan(self):
+        plugins = {}
+        if not self.modules_dir.exists():
+            print(f"Modules directory not found: {self.modules_dir}")
+            return MappingProxyType(plugins)
+
+        for module_path in sorted(self.modules_dir.iterdir()):
+            # Skip files, __pycache__ and other special directories
+            if not module_path.is_dir() or module_path.name.startswith('_'):
+                continue
+
+            plugin_file = module_path / 'plugin.py'
+            if plugin_file.exists():
+                info = load_plugin_file(plugin_file, module_path.name)
+                if info:
+                    plugins[info.slug] = info
+
+        return MappingProxyType(plugins)
+
+    def load(self):
+        """Scan modules/ if this process has not done so yet."""
+        if self._plugins is None:
+            with self._lock:
+                if self._plugins is None:
+                    self._plugins = self._scan()
+        return self._plugins
+
+    def reload(self):
+        """Rescan modules/ and atomically replace the registry contents."""
+        plugins = self._scan()
+        with self._lock:
+            self._plugins = plugins
+        return plugins
+
+    def get(self, slug):
+        """Return the PluginInfo for a slug, or None."""
+        return self.load().get(slug)
+
+    def all(self):
+        """Return every registered plugin."""
+        return tuple(self.load().values())
+
+    def slugs(self):
+        """Return the set of registered plugin slugs."""
+        return frozenset(self.load())
+
+    def get_default_permissions(self, slug):
+        """
+        Return a copy of DEFAULT_PERMISSIONS for a plugin, or None if it
+        declares none.
+        """
+        info = self.get(slug)
+        if not info or not info.default_permissions:
+            return None
+        return {role_name: dict(perms) for role_name, perms in info.default_permissions.items()}
+
+    def __contains__(self, slug):
+        return slug in self.load()
+
+    def __iter__(self):
+        return iter(self.all())
+
+    def __len__(self):
+        return len(self.load())
+
+
+# Global instance
+plugin_registry = PluginRegistry()
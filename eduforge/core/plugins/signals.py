@@ -0,0 +1,63 @@
+"""
+Signal handlers that keep cached module entitlements in sync with the database
+and give new users their fallback role.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.plugins import entitlements
+from core.plugins.models import Module, TenantModule, ModulePermission
+from core.plugins.reconcile import assign_fallback_role
+from core.users.models import CustomUser, Role
+
+
+def _invalidate_tenant_on_commit(tenant_id):
+    transaction.on_commit(lambda: entitlements.invalidate_tenant(tenant_id))
+
+
+def _tenant_id_for_permission(permission):
+    """Resolve the tenant of a ModulePermission without reloading its role if cached."""
+    if ModulePermission.role.is_cached(permission):
+        return permission.role.tenant_id
+    return Role.objects.filter(pk=permission.role_id).values_list('tenant_id', flat=True).first()
+
+
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+def module_changed(sender, instance, **kwargs):
+    """Module activation affects every tenant."""
+    transaction.on_commit(entitlements.invalidate_all)
+
+
+@receiver(post_save, sender=TenantModule)
+@receiver(post_delete, sender=TenantModule)
+def tenant_module_changed(sender, instance, **kwargs):
+    """Install/uninstall affects only the owning tenant."""
+    _invalidate_tenant_on_commit(instance.tenant_id)
+
+
+@receiver(post_save, sender=ModulePermission)
+@receiver(post_delete, sender=ModulePermission)
+def module_permission_changed(sender, instance, **kwargs):
+    """Permission bits are cached per role, which belongs to one tenant."""
+    tenant_id = _tenant_id_for_permission(instance)
+    if tenant_id is not None:
+        _invalidate_tenant_on_commit(tenant_id)
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def role_changed(sender, instance, **kwargs):
+    """Role changes affect the tenant's snapshots."""
+    _invalidate_tenant_on_commit(instance.tenant_id)
+
+
+@receiver(post_save, sender=CustomUser)
+def user_created(sender, instance, created, **kwargs):
+    """
+    The access middleware never assigns roles, so a user created without
+    one gets the fallback role straight away.
+    """
+    if created and not kwargs.get('raw'):
+        assign_fallback_role(instance)
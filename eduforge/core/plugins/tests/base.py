@@ -0,0 +1,32 @@
+"""
+Shared fixtures for tests that need a tenant with its default roles.
+"""
+from core.tenants.models import Tenant
+from core.users.models import CustomUser, Role
+
+
+def make_tenant(subdomain):
+    tenant = Tenant.objects.create(
+        school_name=subdomain.title(),
+        subdomain=subdomain,
+        official_email=f'office@{subdomain}.example.com',
+        phone_number='1234567890',
+        city='City',
+        state='State',
+        postal_code='123456',
+        school_type='primary',
+        student_count='<100',
+    )
+    return tenant, Role.create_default_roles(tenant)
+
+
+def make_user(tenant, role, name, **extra):
+    return CustomUser.objects.create_user(
+        username=f'{name}@{tenant.subdomain}',
+        email=f'{name}@{tenant.subdomain}.example.com',
+        password='password',
+        tenant=tenant,
+        role=role,
+        first_name=name,
+        **extra,
+    )
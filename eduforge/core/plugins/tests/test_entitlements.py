@@ -0,0 +1,113 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from core.plugins.entitlements import get_dashboard_modules, get_entitlements
+from core.plugins.models import Module, ModulePermission, TenantModule
+
+from .base import make_tenant
+
+
+class EntitlementCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant, roles = make_tenant('alpha')
+        cls.other_tenant, other_roles = make_tenant('beta')
+        cls.role = roles['Teacher']
+        cls.other_role = other_roles['Teacher']
+        cls.module = Module.objects.create(name='Library', slug='library')
+        cls.installed = TenantModule.objects.create(tenant=cls.tenant, module=cls.module)
+        TenantModule.objects.create(tenant=cls.other_tenant, module=cls.module)
+        cls.permission = ModulePermission.objects.create(module=cls.module, role=cls.role, can_view=True)
+        ModulePermission.objects.create(module=cls.module, role=cls.other_role, can_view=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def entitlements(self, tenant=None, role=None):
+        return get_entitlements((tenant or self.tenant).pk, (role or self.role).pk)
+
+    def test_snapshot_is_cached(self):
+        with self.assertNumQueries(3):
+            access = self.entitlements()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.entitlements().permissions, access.permissions)
+
+        self.assertTrue(access.is_active('library'))
+        self.assertTrue(access.is_installed('library'))
+        self.assertTrue(access.can_view('library'))
+        self.assertFalse(access.can_edit('library'))
+        self.assertFalse(access.has_permission('timetable'))
+
+    def test_module_change_invalidates_every_tenant(self):
+        self.entitlements()
+        self.entitlements(self.other_tenant, self.other_role)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.module.is_active = False
+            self.module.save()
+
+        self.assertFalse(self.entitlements().is_active('library'))
+        self.assertFalse(self.entitlements(self.other_tenant, self.other_role).is_active('library'))
+
+    def test_tenant_module_change_invalidates_only_its_tenant(self):
+        self.entitlements()
+        self.entitlements(self.other_tenant, self.other_role)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.installed.uninstall()
+
+        self.assertFalse(self.entitlements().is_installed('library'))
+        with self.assertNumQueries(0):
+            self.assertTrue(self.entitlements(self.other_tenant, self.other_role).is_installed('library'))
+
+    def test_permission_change_invalidates(self):
+        self.entitlements()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.permission.can_edit = True
+            self.permission.save()
+        self.assertTrue(self.entitlements().can_edit('library'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.permission.delete()
+        self.assertFalse(self.entitlements().has_permission('library'))
+
+
+class DashboardModuleTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant, roles = make_tenant('alpha')
+        cls.role = roles['Teacher']
+        cls.library = Module.objects.create(name='Library', slug='library')
+        cls.transport = Module.objects.create(name='Transport', slug='transport')
+        cls.hidden = Module.objects.create(name='Hostel', slug='hostel')
+        TenantModule.objects.create(tenant=cls.tenant, module=cls.library)
+        ModulePermission.objects.create(module=cls.library, role=cls.role, can_view=True)
+        ModulePermission.objects.create(module=cls.transport, role=cls.role, can_view=True)
+        ModulePermission.objects.create(module=cls.hidden, role=cls.role, can_view=False)
+
+    def setUp(self):
+        cache.clear()
+
+    def cards(self):
+        return [
+            (card['module'].slug, card['is_installed'])
+            for card in get_dashboard_modules(self.tenant.pk, self.role.pk)
+        ]
+
+    def test_cards_are_built_in_one_query_and_cached(self):
+        with self.assertNumQueries(1):
+            cards = self.cards()
+        self.assertEqual(cards, [('library', True), ('transport', False)])
+        with self.assertNumQueries(0):
+            self.cards()
+
+    def test_install_is_reflected(self):
+        self.cards()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TenantModule.objects.create(tenant=self.tenant, module=self.transport)
+
+        self.assertEqual(self.cards(), [('library', True), ('transport', True)])
@@ -0,0 +1,74 @@
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.urls import ResolverMatch, get_resolver
+
+from core.plugins.middleware import TenantModuleAccessMiddleware
+from core.plugins.models import Module, ModulePermission, TenantModule
+from core.plugins.url_loader import url_loader
+
+from .base import make_tenant, make_user
+
+
+def view(request):
+    return None
+
+
+class TenantModuleAccessMiddlewareTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant, roles = make_tenant('alpha')
+        cls.module = Module.objects.create(name='Attendance', slug='attendance')
+        cls.installed = TenantModule.objects.create(tenant=cls.tenant, module=cls.module)
+        ModulePermission.objects.create(module=cls.module, role=roles['Teacher'], can_view=True, can_edit=True)
+        ModulePermission.objects.create(module=cls.module, role=roles['Student'], can_view=True)
+        cls.teacher = make_user(cls.tenant, roles['Teacher'], 'teacher')
+        cls.student = make_user(cls.tenant, roles['Student'], 'student')
+        cls.staff = make_user(cls.tenant, roles['Staff'], 'staff')
+        # Module namespaces are known once the URLconf has been loaded
+        get_resolver().url_patterns
+
+    def setUp(self):
+        cache.clear()
+        self.middleware = TenantModuleAccessMiddleware(view)
+
+    def check(self, user, method='get', namespace='attendance'):
+        request = getattr(RequestFactory(), method)(f'/{namespace}/')
+        request.user = user
+        request.resolver_match = ResolverMatch(view, (), {}, namespaces=[namespace])
+        request._messages = CookieStorage(request)
+        response = self.middleware.process_view(request, view, (), {})
+        return response and response.url
+
+    def test_roles_are_checked_against_their_permission_bits(self):
+        self.assertIsNone(self.check(self.teacher, 'post'))
+        self.assertIsNone(self.check(self.student))
+        self.assertEqual(self.check(self.student, 'post'), '/permission-denied/')
+
+    def test_missing_permission_row_is_denied_without_writes(self):
+        self.assertEqual(self.check(self.staff), '/permission-denied/')
+        self.assertFalse(ModulePermission.objects.filter(role=self.staff.role).exists())
+
+    def test_uninstalled_module_redirects_to_the_dashboard(self):
+        self.installed.uninstall()
+        self.assertEqual(self.check(self.teacher), '/dashboard/')
+
+    def test_steady_state_check_makes_no_queries(self):
+        self.check(self.teacher)
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.check(self.teacher))
+
+    def test_non_module_pages_are_skipped(self):
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.check(AnonymousUser(), namespace='auth'))
+            self.assertIsNone(self.check(self.staff, namespace='api'))
+
+    def test_namespaces_follow_the_url_loader(self):
+        self.assertIn('attendance', self.middleware.module_namespaces)
+        with mock.patch.object(url_loader, 'namespaces', frozenset({'timetable'})):
+            self.assertNotIn('attendance', self.middleware.module_namespaces)
+            self.assertIsNone(self.check(self.staff))
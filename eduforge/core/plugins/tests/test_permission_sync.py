@@ -0,0 +1,64 @@
+from django.test import TestCase
+
+from core.plugins.models import Module, ModulePermission
+from core.plugins.permission_sync import MODE_FORCE, sync_permissions
+
+from .base import make_tenant
+
+
+class SyncPermissionsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenants = [make_tenant(name)[0] for name in ('alpha', 'beta', 'gamma')]
+        cls.library = Module.objects.create(name='Library', slug='library')
+        cls.attendance = Module.objects.create(name='Attendance', slug='attendance')
+
+    def rows(self, tenant, module):
+        return dict(
+            (role, (view, edit, manage))
+            for role, view, edit, manage in ModulePermission.objects.filter(
+                role__tenant=tenant, module=module,
+            ).values_list('role__name', 'can_view', 'can_edit', 'can_manage')
+        )
+
+    def test_creates_every_row_once(self):
+        result = sync_permissions()
+
+        self.assertEqual((result.tenants, result.created, result.updated), (3, 24, 0))
+        self.assertEqual(self.rows(self.tenants[0], self.library)['Teacher'], (True, True, False))
+
+        result = sync_permissions()
+        self.assertEqual((result.created, result.updated), (0, 0))
+
+    def test_query_count_does_not_grow_with_tenants(self):
+        # Modules, roles and existing rows, then one insert in a savepoint
+        with self.assertNumQueries(6):
+            sync_permissions(tenants=self.tenants[:1])
+        with self.assertNumQueries(6):
+            sync_permissions(tenants=self.tenants[1:])
+
+    def test_customised_rows_are_kept_unless_forced(self):
+        tenant = self.tenants[0]
+        sync_permissions(tenants=[tenant])
+        ModulePermission.objects.filter(
+            role__tenant=tenant, role__name='Student', module=self.attendance,
+        ).update(can_view=False)
+
+        sync_permissions(tenants=[tenant])
+        self.assertEqual(self.rows(tenant, self.attendance)['Student'], (False, False, False))
+
+        sync_permissions(tenants=[tenant], mode=MODE_FORCE)
+        self.assertEqual(self.rows(tenant, self.attendance)['Student'], (True, False, False))
+
+    def test_dry_run_writes_nothing(self):
+        result = sync_permissions(dry_run=True)
+
+        self.assertEqual(result.created, 24)
+        self.assertFalse(ModulePermission.objects.exists())
+
+    def test_ensure_default_permissions_syncs_one_tenant(self):
+        ModulePermission.ensure_default_permissions(self.tenants[0], self.library)
+
+        self.assertEqual(len(self.rows(self.tenants[0], self.library)), 4)
+        self.assertFalse(self.rows(self.tenants[1], self.library))
@@ -0,0 +1,55 @@
+from django.test import TestCase
+
+from core.plugins.models import Module, ModulePermission
+from core.plugins.reconcile import reconcile_tenant
+from core.users.models import Role
+
+from .base import make_tenant, make_user
+
+
+class FallbackRoleTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant, cls.roles = make_tenant('alpha')
+
+    def test_new_users_get_their_fallback_role(self):
+        student = make_user(self.tenant, None, 'student')
+        principal = make_user(self.tenant, None, 'principal', is_staff=True)
+
+        student.refresh_from_db()
+        principal.refresh_from_db()
+        self.assertEqual(student.role, self.roles['Student'])
+        self.assertEqual(principal.role, self.roles['Principal'])
+
+    def test_explicit_roles_are_kept(self):
+        teacher = make_user(self.tenant, self.roles['Teacher'], 'teacher')
+
+        teacher.refresh_from_db()
+        self.assertEqual(teacher.role, self.roles['Teacher'])
+
+
+class ReconcileTenantTests(TestCase):
+
+    def test_reconcile_provisions_roles_permissions_and_users(self):
+        tenant, roles = make_tenant('alpha')
+        Role.objects.filter(tenant=tenant).delete()
+        module = Module.objects.create(name='Library', slug='library')
+        user = make_user(tenant, None, 'student')
+        user.refresh_from_db()
+        self.assertIsNone(user.role)
+
+        reconcile_tenant(tenant)
+
+        user.refresh_from_db()
+        self.assertEqual(user.role.name, 'Student')
+        permissions = ModulePermission.objects.filter(module=module, role__tenant=tenant)
+        self.assertEqual(
+            sorted(permissions.values_list('role__name', 'can_view', 'can_edit', 'can_manage')),
+            [
+                ('Principal', True, True, True),
+                ('Staff', True, False, False),
+                ('Student', True, False, False),
+                ('Teacher', True, True, False),
+            ],
+        )
@@ -0,0 +1,52 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from core.plugins.registry import PluginRegistry
+
+
+PLUGIN = '''
+PLUGIN_NAME = "Library"
+SLUG = "library"
+VERSION = "{version}"
+DEFAULT_PERMISSIONS = {{
+    "Teacher": {{"can_view": True, "can_edit": True, "can_manage": False}},
+}}
+'''
+
+
+class PluginRegistryTests(SimpleTestCase):
+
+    def setUp(self):
+        self.modules_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.modules_dir)
+        (self.modules_dir / 'library').mkdir()
+        (self.modules_dir / '_template').mkdir()
+        (self.modules_dir / 'notes').mkdir()
+        (self.modules_dir / 'notes' / 'plugin.py').write_text('SLUG = "notes"\n')
+        self.write_plugin('1.0.0')
+        self.registry = PluginRegistry(self.modules_dir)
+
+    def write_plugin(self, version):
+        (self.modules_dir / 'library' / 'plugin.py').write_text(PLUGIN.format(version=version))
+
+    def test_plugins_are_read_once(self):
+        self.assertEqual(self.registry.slugs(), {'library'})
+        self.assertEqual(self.registry.get('library').version, '1.0.0')
+
+        self.write_plugin('2.0.0')
+        self.assertEqual(self.registry.get('library').version, '1.0.0')
+
+        self.registry.reload()
+        self.assertEqual(self.registry.get('library').version, '2.0.0')
+
+    def test_default_permissions_are_copies(self):
+        defaults = self.registry.get_default_permissions('library')
+        defaults['Teacher']['can_manage'] = True
+
+        self.assertFalse(self.registry.get_default_permissions('library')['Teacher']['can_manage'])
+        with self.assertRaises(TypeError):
+            self.registry.get('library').default_permissions['Teacher'] = {}
+        self.assertIsNone(self.registry.get_default_permissions('notes'))
@@ -16,6 +16,7 @@ class ModuleURLLoader:
     def __init__(self):
         self.modules_dir = Path(__file__).resolve().parent.parent.parent / 'modules'
         self.discovered_urls = []
+        self.namespaces = frozenset()
     
     def discover_module_urls(self):
         """
@@ -23,6 +24,7 @@ class ModuleURLLoader:
         Returns a list of URL patterns to include.
         """
         patterns = []
+        namespaces = set()
         
         if not self.modules_dir.exists():
             return patterns
@@ -48,10 +50,12 @@ class ModuleURLLoader:
                     patterns.append(
                         path(f'{module_name}/', include((urls_module, module_name)))
                     )
+                    namespaces.add(module_name)
                     print(f"Loaded URLs for module: {module_name}")
                 except Exception as e:
                     print(f"Error loading URLs for {module_name}: {e}")
         
+        self.namespaces = frozenset(namespaces)
         return patterns
     
     def get_module_urls(self):
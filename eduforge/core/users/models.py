@@ -87,10 +87,3 @@ class CustomUser(AbstractUser):
     def is_admin_user(self):
         """Check if user is admin or super admin."""
         return bool(self.role and self.role.name == 'Principal')
-
-    def save(self, *args, **kwargs):
-        if self.tenant and self.role is None:
-            default_role = Role.objects.filter(tenant=self.tenant, name='Student').first()
-            if default_role:
-                self.role = default_role
-        super().save(*args, **kwargs)
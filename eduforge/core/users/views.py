@@ -112,9 +112,8 @@ def register_view(request):
                     )
 
                     # Set default module permissions for this tenant
-                    from core.plugins.models import Module, ModulePermission
-                    for module in Module.objects.filter(is_active=True):
-                        ModulePermission.ensure_default_permissions(tenant, module)
+                    from core.plugins.reconcile import reconcile_tenant
+                    reconcile_tenant(tenant)
 
                 # Auto-login the admin (OUTSIDE transaction to avoid session issues)
                 if admin_user:
@@ -168,37 +167,13 @@ def dashboard(request):
     Dashboard - main application view after login.
     Shows dynamic module cards based on installed modules AND user permissions.
     """
-    from core.plugins.models import Module, TenantModule, ModulePermission
+    from core.plugins.entitlements import get_dashboard_modules
     
     tenant = request.user.tenant
     user_role = request.user.role
     
-    # Get all active modules
-    available_modules = Module.objects.filter(is_active=True)
-    
-    # Get installed modules for this tenant
-    installed_module_ids = TenantModule.objects.filter(
-        tenant=tenant,
-        is_installed=True
-    ).values_list('module_id', flat=True)
-    
-    # Sync module permissions from plugin defaults, then filter by user permissions
-    modules_data = []
-    for module in available_modules:
-        ModulePermission.ensure_default_permissions(tenant, module)
-        # Check if user has permission to view this module
-        if user_role:
-            permission = ModulePermission.objects.filter(
-                module=module,
-                role=user_role,
-                can_view=True
-            ).first()
-            
-            if permission:
-                modules_data.append({
-                    'module': module,
-                    'is_installed': module.id in installed_module_ids,
-                })
+    # Active modules the role may view, with install state (cached per tenant/role)
+    modules_data = get_dashboard_modules(request.user.tenant_id, request.user.role_id)
     
     # Determine if user is admin (Principal or superuser)
     is_admin = request.user.is_superuser or (user_role and user_role.name == 'Principal')
@@ -355,7 +330,8 @@ def install_module(request, module_slug):
     """
     Install a module for the current tenant.
     """
-    from core.plugins.models import Module, TenantModule, ModulePermission
+    from core.plugins.models import Module, TenantModule
+    from core.plugins.reconcile import reconcile_tenant
     
     try:
         # Get the module
@@ -378,12 +354,8 @@ def install_module(request, module_slug):
         else:
             messages.info(request, f'{module.name} is already installed.')
 
-        # Ensure default roles exist for this tenant
-        if tenant.roles.count() == 0:
-            Role.create_default_roles(tenant)
-
-        # Ensure default permissions exist for this module
-        ModulePermission.ensure_default_permissions(tenant, module)
+        # Ensure default roles, permissions and user roles exist for this module
+        reconcile_tenant(tenant, [module])
         
         # Redirect to the module after installation
         return redirect(f'/{module_slug}/')
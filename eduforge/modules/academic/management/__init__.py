@@ -0,0 +1 @@
+# Academic module management commands
@@ -0,0 +1,72 @@
+"""
+Management command to build the next academic session and promote its students.
+Usage: python manage.py promote_session --tenant <subdomain> --name 2026-2027 --start YYYY-MM-DD --end YYYY-MM-DD
+       [--from <session name>] [--map "KG=Grade 1"] [--map "Grade 12="] [--carry-teachers] [--activate] [--dry-run]
+"""
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from core.tenants.models import Tenant
+from modules.academic.models import AcademicSession
+from modules.academic.promotion import apply_promotion, parse_class_map, plan_promotion
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Invalid date "{value}", expected YYYY-MM-DD')
+
+
+class Command(BaseCommand):
+    help = 'Clone an academic session\'s classes and sections into a new session and promote its enrollments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', required=True, help='Tenant subdomain')
+        parser.add_argument('--from', dest='source', help='Session to promote from. Defaults to the active session.')
+        parser.add_argument('--name', required=True, help='Name of the new session, e.g. 2026-2027')
+        parser.add_argument('--start', required=True, type=parse_date, help='First day of the new session (YYYY-MM-DD)')
+        parser.add_argument('--end', required=True, type=parse_date, help='Last day of the new session (YYYY-MM-DD)')
+        parser.add_argument('--map', action='append', default=[], help='Class mapping "Old=New"; "Old=" graduates the class. Repeatable.')
+        parser.add_argument('--carry-teachers', action='store_true', help='Keep each section\'s class teacher')
+        parser.add_argument('--activate', action='store_true', help='Make the new session the active one')
+        parser.add_argument('--dry-run', action='store_true', help='Show what would be created without writing')
+
+    def handle(self, *args, **options):
+        tenant = Tenant.objects.filter(subdomain=options['tenant']).first()
+        if not tenant:
+            raise CommandError(f'Tenant "{options["tenant"]}" not found')
+
+        sessions = AcademicSession.objects.for_tenant(tenant)
+        source = sessions.filter(name=options['source']).first() if options['source'] else sessions.filter(is_active=True).first()
+        if not source:
+            raise CommandError(f'Academic session "{options["source"] or "active"}" not found')
+
+        try:
+            plan = plan_promotion(
+                source,
+                options['name'],
+                options['start'],
+                options['end'],
+                class_map=parse_class_map(options['map']),
+                carry_teachers=options['carry_teachers'],
+            )
+        except ValidationError as exc:
+            raise CommandError(' '.join(exc.messages))
+
+        self.stdout.write(f'{source.name} -> {plan.name}: {plan.class_count} class(es), {plan.section_count} section(s)')
+        for move in plan.moves:
+            self.stdout.write(f'  {move["from"]} -> {move["to"] or "graduates"}: {move["students"]} student(s)')
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(
+                f'Dry run: would promote {plan.promoted_count} and graduate {plan.graduated_count} student(s).'
+            ))
+            return
+
+        session = apply_promotion(plan, activate=options['activate'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Created session "{session.name}", promoted {plan.promoted_count} and graduated '
+            f'{plan.graduated_count} student(s).'
+        ))
@@ -0,0 +1,253 @@
+"""
+Year-end promotion.
+
+Builds the next AcademicSession from the current one in a single
+transaction: every class and section is cloned by name (optionally with
+its class teacher), and every active enrollment moves to the mapped class
+of the new session with regenerated roll numbers. Classes map to the
+class whose name has its number incremented ("Grade 5" -> "Grade 6");
+overrides can rename ("KG" -> "Grade 1") or graduate ("Grade 12" -> None)
+a class. Only an explicit graduation leaves students without a new
+enrollment: a class with students and no existing target class, or a
+target class without sections, is refused. A student keeps their section
+name when the new class has it, and goes to its first section otherwise.
+
+plan_promotion reads everything with a handful of queries and returns a
+PromotionPlan, which is the dry-run diff; apply_promotion writes it with
+bulk_create. The old session keeps running until the new one is activated
+with activate_session, which deactivates the old session's enrollments
+and moves the students' attendance profiles to their new sections.
+"""
+import re
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .models import AcademicSession, Class, Enrollment, Section
+
+
+NUMBER = re.compile(r'\d+(?!.*\d)')
+
+
+def next_class_name(name):
+    """'Grade 5' -> 'Grade 6'; None if the name holds no number."""
+    match = NUMBER.search(name)
+    if match is None:
+        return None
+    return f'{name[:match.start()]}{int(match.group()) + 1}{name[match.end():]}'
+
+
+def parse_class_map(lines):
+    """
+    Parse "Old name = New name" lines into an override mapping. An empty
+    right-hand side ("Grade 12 =") graduates the class.
+    """
+    class_map = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        if '=' not in line:
+            raise ValidationError(f'Invalid class mapping "{line}", expected "Old name = New name".')
+        old, new = (part.strip() for part in line.split('=', 1))
+        class_map[old] = new or None
+    return class_map
+
+
+class PromotionPlan:
+    """
+    What a promotion would create: the new session's classes and sections
+    and the promoted enrollments, plus per-class counts for the diff.
+    """
+
+    def __init__(self, source, name, start_date, end_date, carry_teachers):
+        self.source = source
+        self.name = name
+        self.start_date = start_date
+        self.end_date = end_date
+        self.carry_teachers = carry_teachers
+        # {class name: description}
+        self.classes = {}
+        # {class name: [(section name, class teacher id, room number)]}
+        self.sections = {}
+        # [(student id, class name, section name, roll number)]
+        self.enrollments = []
+        # [{'from', 'to', 'students'}] in class order; 'to' is None for graduates
+        self.moves = []
+
+    @property
+    def class_count(self):
+        return len(self.sections)
+
+    @property
+    def section_count(self):
+        return sum(len(sections) for sections in self.sections.values())
+
+    @property
+    def promoted_count(self):
+        return len(self.enrollments)
+
+    @property
+    def graduated_count(self):
+        return sum(move['students'] for move in self.moves if move['to'] is None)
+
+
+def plan_promotion(source, name, start_date, end_date, class_map=None, carry_teachers=False):
+    """
+    Plan promoting the ``source`` session into a new session ``name``.
+    ``class_map`` overrides the class-name increment per source class name.
+    """
+    tenant = source.tenant
+    if AcademicSession.objects.for_tenant(tenant).filter(name=name).exists():
+        raise ValidationError(f'Academic session "{name}" already exists.')
+    if start_date > end_date:
+        raise ValidationError('The session must start before it ends.')
+    class_map = class_map or {}
+
+    plan = PromotionPlan(source, name, start_date, end_date, carry_teachers)
+    sections = defaultdict(list)
+    for class_name, section_name, teacher_id, room_number in Section.objects.for_tenant(tenant).filter(
+        class_obj__academic_session=source
+    ).values_list('class_obj__name', 'name', 'class_teacher_id', 'room_number').order_by('class_obj__name', 'name'):
+        sections[class_name].append((section_name, teacher_id if carry_teachers else None, room_number))
+    plan.classes = dict(
+        Class.objects.for_tenant(tenant).filter(academic_session=source).values_list('name', 'description')
+    )
+    plan.sections = {class_name: sections.get(class_name, []) for class_name in plan.classes}
+
+    unknown = (set(class_map) | set(filter(None, class_map.values()))) - set(plan.sections)
+    if unknown:
+        raise ValidationError(f'Unknown classes in mapping: {", ".join(sorted(unknown))}.')
+
+    # Students grouped by their new section, in name order for the roll numbers
+    enrollments = Enrollment.objects.for_tenant(tenant).filter(
+        academic_session=source,
+        is_active=True,
+    ).values_list('student_id', 'section__class_obj__name', 'section__name').order_by(
+        'student__last_name', 'student__first_name', 'student__username', 'student_id'
+    )
+    targets = defaultdict(list)
+    moved = defaultdict(int)
+    unmapped = set()
+    for student_id, class_name, section_name in enrollments.iterator():
+        target = class_map[class_name] if class_name in class_map else next_class_name(class_name)
+        if target is None and class_name in class_map:
+            moved[(class_name, None)] += 1
+            continue
+        target_sections = [section[0] for section in plan.sections.get(target, ())]
+        if not target_sections:
+            unmapped.add((class_name, target))
+            continue
+        if section_name not in target_sections:
+            section_name = target_sections[0]
+        targets[(target, section_name)].append(student_id)
+        moved[(class_name, target)] += 1
+
+    if unmapped:
+        problems = [
+            f'{class_name} -> {target} has no sections' if target in plan.sections
+            else f'{class_name} has no class to move into'
+            for class_name, target in sorted(unmapped, key=lambda item: (item[0], item[1] or ''))
+        ]
+        raise ValidationError(
+            f'Cannot promote: {"; ".join(problems)}. Map these classes, '
+            f'or map them to nothing ("{sorted(unmapped)[0][0]} =") to graduate their students.'
+        )
+
+    for (class_name, section_name), student_ids in sorted(targets.items()):
+        plan.enrollments.extend(
+            (student_id, class_name, section_name, str(roll_number))
+            for roll_number, student_id in enumerate(student_ids, start=1)
+        )
+    plan.moves = [
+        {'from': class_name, 'to': target, 'students': count}
+        for (class_name, target), count in sorted(moved.items(), key=lambda item: (item[0][0], item[0][1] or ''))
+    ]
+    return plan
+
+
+def apply_promotion(plan, activate=False, batch_size=1000):
+    """
+    Create the planned session, classes, sections and enrollments in one
+    transaction and return the new session. With ``activate`` the session
+    is then activated with activate_session in the same transaction;
+    otherwise the source session keeps running until it is.
+    """
+    source = plan.source
+    tenant = source.tenant
+    with transaction.atomic():
+        session = AcademicSession.objects.create(
+            tenant=tenant,
+            name=plan.name,
+            start_date=plan.start_date,
+            end_date=plan.end_date,
+        )
+
+        Class.objects.bulk_create([
+            Class(tenant=tenant, academic_session=session, name=class_name, description=description)
+            for class_name, description in plan.classes.items()
+        ], batch_size=batch_size)
+        # Re-read: not every database returns primary keys from bulk_create
+        classes = {
+            class_obj.name: class_obj
+            for class_obj in Class.objects.filter(academic_session=session)
+        }
+
+        Section.objects.bulk_create([
+            Section(
+                tenant=tenant,
+                class_obj=classes[class_name],
+                name=section_name,
+                class_teacher_id=teacher_id,
+                room_number=room_number,
+            )
+            for class_name, sections in plan.sections.items()
+            for section_name, teacher_id, room_number in sections
+        ], batch_size=batch_size)
+        sections = {
+            (section.class_obj.name, section.name): section
+            for section in Section.objects.filter(class_obj__academic_session=session).select_related('class_obj')
+        }
+
+        Enrollment.objects.bulk_create([
+            Enrollment(
+                tenant=tenant,
+                student_id=student_id,
+                section=sections[(class_name, section_name)],
+                academic_session=session,
+                roll_number=roll_number,
+                enrollment_date=plan.start_date,
+            )
+            for student_id, class_name, section_name, roll_number in plan.enrollments
+        ], batch_size=batch_size)
+
+        if activate:
+            activate_session(session, batch_size=batch_size)
+
+    return session
+
+
+def activate_session(session, batch_size=1000):
+    """
+    Make ``session`` the tenant's active session in one transaction: the
+    enrollments of the session it replaces are deactivated and the
+    students' attendance profiles moved to their enrollments in
+    ``session``, which bulk writes do not signal.
+    """
+    tenant = session.tenant
+    with transaction.atomic():
+        Enrollment.objects.for_tenant(tenant).filter(
+            academic_session__is_active=True,
+            is_active=True,
+        ).exclude(academic_session=session).update(is_active=False)
+        session.is_active = True
+        session.save()
+        _sync_attendance_profiles(tenant, session, batch_size)
+
+
+def _sync_attendance_profiles(tenant, session, batch_size):
+    try:
+        from modules.attendance.profiles import sync_enrollment_profiles
+    except ImportError:
+        return
+    sync_enrollment_profiles(tenant=tenant, session=session, batch_size=batch_size)
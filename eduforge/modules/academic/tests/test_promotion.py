@@ -0,0 +1,165 @@
+import datetime
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from modules.academic.models import AcademicSession, Class, Enrollment, Section
+from modules.academic.promotion import (
+    activate_session, apply_promotion, next_class_name, parse_class_map, plan_promotion,
+)
+from modules.attendance.models import Student
+from modules.attendance.profiles import sync_enrollment_profiles
+from modules.attendance.tests.base import make_tenant, make_user
+
+
+START = datetime.date(2026, 6, 1)
+END = datetime.date(2027, 5, 31)
+
+
+class ClassNameTests(TestCase):
+
+    def test_next_class_name(self):
+        self.assertEqual(next_class_name('Grade 5'), 'Grade 6')
+        self.assertEqual(next_class_name('Class 9 (Science)'), 'Class 10 (Science)')
+        self.assertIsNone(next_class_name('KG'))
+
+    def test_parse_class_map(self):
+        self.assertEqual(parse_class_map(['KG = Grade 1', 'Grade 12 =', '']), {'KG': 'Grade 1', 'Grade 12': None})
+        with self.assertRaises(ValidationError):
+            parse_class_map(['Grade 1'])
+
+
+class PromotionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant, roles = make_tenant('alpha')
+        cls.teacher = make_user(cls.tenant, roles['Teacher'], 'teacher')
+        cls.session = AcademicSession.objects.create(
+            tenant=cls.tenant, name='2025-2026', start_date=datetime.date(2025, 6, 1),
+            end_date=datetime.date(2026, 5, 31), is_active=True,
+        )
+        cls.sections = {}
+        for class_name, section_names in (('KG', 'A'), ('Grade 1', 'AB'), ('Grade 2', 'A')):
+            class_obj = Class.objects.create(tenant=cls.tenant, academic_session=cls.session, name=class_name)
+            for section_name in section_names:
+                cls.sections[(class_name, section_name)] = Section.objects.create(
+                    tenant=cls.tenant, class_obj=class_obj, name=section_name, class_teacher=cls.teacher,
+                )
+
+        # Names sort in the opposite order of the old roll numbers
+        cls.students = {}
+        for key, names in (
+            (('KG', 'A'), ['kc', 'kb', 'ka']),
+            (('Grade 1', 'A'), ['ob', 'oa']),
+            (('Grade 1', 'B'), ['bb', 'ba']),
+            (('Grade 2', 'A'), ['tb', 'ta']),
+        ):
+            for roll_number, name in enumerate(names, start=1):
+                student = make_user(cls.tenant, roles['Student'], name)
+                cls.students[name] = student
+                Enrollment.objects.create(
+                    tenant=cls.tenant, student=student, section=cls.sections[key],
+                    academic_session=cls.session, roll_number=str(roll_number),
+                )
+        sync_enrollment_profiles(tenant=cls.tenant)
+
+    def plan(self, class_map=None, **kwargs):
+        class_map = {'KG': 'Grade 1', 'Grade 2': None} if class_map is None else class_map
+        return plan_promotion(self.session, '2026-2027', START, END, class_map=class_map, **kwargs)
+
+    def new_enrollments(self, session):
+        return {
+            enrollment.student.first_name: (
+                enrollment.section.class_obj.name, enrollment.section.name, enrollment.roll_number,
+            )
+            for enrollment in Enrollment.objects.filter(academic_session=session).select_related(
+                'student', 'section__class_obj'
+            )
+        }
+
+    def test_plan_maps_and_graduates(self):
+        plan = self.plan()
+
+        self.assertEqual(plan.moves, [
+            {'from': 'Grade 1', 'to': 'Grade 2', 'students': 4},
+            {'from': 'Grade 2', 'to': None, 'students': 2},
+            {'from': 'KG', 'to': 'Grade 1', 'students': 3},
+        ])
+        self.assertEqual((plan.class_count, plan.section_count), (3, 4))
+        self.assertEqual((plan.promoted_count, plan.graduated_count), (7, 2))
+        self.assertFalse(AcademicSession.objects.filter(name='2026-2027').exists())
+
+    def test_apply_promotes_enrollments(self):
+        session = apply_promotion(self.plan())
+
+        self.assertEqual(self.new_enrollments(session), {
+            # KG A -> Grade 1 A, roll numbers in name order
+            'ka': ('Grade 1', 'A', '1'),
+            'kb': ('Grade 1', 'A', '2'),
+            'kc': ('Grade 1', 'A', '3'),
+            # Grade 2 has no section B, so both sections merge into A
+            'ba': ('Grade 2', 'A', '1'),
+            'bb': ('Grade 2', 'A', '2'),
+            'oa': ('Grade 2', 'A', '3'),
+            'ob': ('Grade 2', 'A', '4'),
+        })
+        self.assertEqual(
+            sorted(Section.objects.filter(class_obj__academic_session=session).values_list('class_obj__name', 'name')),
+            [('Grade 1', 'A'), ('Grade 1', 'B'), ('Grade 2', 'A'), ('KG', 'A')],
+        )
+        self.assertFalse(Section.objects.filter(class_obj__academic_session=session, class_teacher__isnull=False).exists())
+        self.session.refresh_from_db()
+        self.assertTrue(self.session.is_active)
+        self.assertFalse(session.is_active)
+        # Nothing moves until the new session is activated
+        self.assertEqual(Enrollment.objects.filter(academic_session=self.session, is_active=True).count(), 9)
+        self.assertEqual(Student.objects.get(user=self.students['ka']).enrollment.academic_session, self.session)
+
+    def test_activating_later_retires_old_enrollments(self):
+        session = apply_promotion(self.plan())
+
+        activate_session(session)
+
+        self.assertFalse(Enrollment.objects.filter(academic_session=self.session, is_active=True).exists())
+        self.assertEqual(Student.objects.get(user=self.students['ka']).enrollment.academic_session, session)
+        self.session.refresh_from_db()
+        self.assertFalse(self.session.is_active)
+
+    def test_apply_retires_old_enrollments_and_moves_profiles(self):
+        session = apply_promotion(self.plan(), activate=True)
+
+        self.assertFalse(Enrollment.objects.filter(academic_session=self.session, is_active=True).exists())
+        self.assertEqual(Enrollment.objects.filter(academic_session=self.session).count(), 9)
+        for name in ('ka', 'oa', 'bb'):
+            profile = Student.objects.get(user=self.students[name])
+            self.assertEqual(profile.enrollment.academic_session, session)
+        # Graduates keep their last enrollment
+        profile = Student.objects.get(user=self.students['ta'])
+        self.assertEqual(profile.enrollment.academic_session, self.session)
+        self.session.refresh_from_db()
+        self.assertFalse(self.session.is_active)
+
+    def test_carry_teachers(self):
+        session = apply_promotion(self.plan(carry_teachers=True))
+
+        self.assertEqual(
+            set(Section.objects.filter(class_obj__academic_session=session).values_list('class_teacher', flat=True)),
+            {self.teacher.pk},
+        )
+
+    def test_class_without_target_is_refused(self):
+        with self.assertRaisesMessage(ValidationError, 'Grade 2 has no class to move into'):
+            self.plan({'KG': 'Grade 1'})
+
+    def test_target_without_sections_is_refused(self):
+        Class.objects.create(tenant=self.tenant, academic_session=self.session, name='Grade 3')
+
+        with self.assertRaisesMessage(ValidationError, 'Grade 2 -> Grade 3 has no sections'):
+            self.plan({'KG': 'Grade 1'})
+
+    def test_unknown_class_and_existing_session_are_refused(self):
+        with self.assertRaisesMessage(ValidationError, 'Unknown classes in mapping: Grade 9'):
+            self.plan({'KG': 'Grade 9', 'Grade 2': None})
+        with self.assertRaisesMessage(ValidationError, 'already exists'):
+            plan_promotion(self.session, '2025-2026', START, END)
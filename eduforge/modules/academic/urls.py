@@ -13,6 +13,7 @@ urlpatterns = [
     path('sessions/', views.session_list, name='session_list'),
     path('sessions/create/', views.session_create, name='session_create'),
     path('sessions/<int:pk>/edit/', views.session_edit, name='session_edit'),
+    path('sessions/<int:pk>/promote/', views.session_promote, name='session_promote'),
     
     # Classes
     path('classes/', views.class_list, name='class_list'),
@@ -5,8 +5,11 @@ Handles academic session, class, section, and enrollment management.
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.core.exceptions import ValidationError
+from django.utils.dateparse import parse_date
 from functools import wraps
 from .models import AcademicSession, Class, Section, Enrollment
+from .promotion import activate_session, apply_promotion, parse_class_map, plan_promotion
 from core.users.models import CustomUser
 
 
@@ -108,8 +111,14 @@ def session_edit(request, pk):
         session.name = request.POST.get('name')
         session.start_date = request.POST.get('start_date')
         session.end_date = request.POST.get('end_date')
-        session.is_active = request.POST.get('is_active') == 'on'
-        session.save()
+        is_active = request.POST.get('is_active') == 'on'
+        if is_active and not session.is_active:
+            # Also retires the replaced session's enrollments and moves
+            # attendance profiles to this session's
+            activate_session(session)
+        else:
+            session.is_active = is_active
+            session.save()
         
         messages.success(request, f'Academic session "{session.name}" updated successfully!')
         return redirect('academic:session_list')
@@ -121,6 +130,48 @@ def session_edit(request, pk):
     })
 
 
+@principal_required
+def session_promote(request, pk):
+    """Build the next academic session from this one and promote its students."""
+    tenant = request.user.tenant
+    source = get_object_or_404(AcademicSession, pk=pk, tenant=tenant)
+    plan = None
+    
+    if request.method == 'POST':
+        start_date = parse_date(request.POST.get('start_date') or '')
+        end_date = parse_date(request.POST.get('end_date') or '')
+        try:
+            if start_date is None or end_date is None:
+                raise ValidationError('Enter valid start and end dates.')
+            plan = plan_promotion(
+                source,
+                request.POST.get('name', '').strip(),
+                start_date,
+                end_date,
+                class_map=parse_class_map(request.POST.get('class_map', '').splitlines()),
+                carry_teachers=request.POST.get('carry_teachers') == 'on',
+            )
+        except ValidationError as exc:
+            messages.error(request, ' '.join(exc.messages))
+        else:
+            if request.POST.get('action') == 'apply':
+                session = apply_promotion(plan, activate=request.POST.get('activate') == 'on')
+                messages.success(
+                    request,
+                    f'Academic session "{session.name}" created: {plan.promoted_count} students promoted, '
+                    f'{plan.graduated_count} graduated.'
+                )
+                return redirect('academic:session_list')
+    
+    return render(request, 'modules/academic/promotion_form.html', {
+        'tenant': tenant,
+        'source': source,
+        'plan': plan,
+        'form': request.POST,
+        'module_name': 'Promote Academic Session',
+    })
+
+
 # Class Views
 @principal_required
 def class_list(request):
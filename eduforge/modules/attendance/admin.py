@@ -2,7 +2,7 @@
 Admin configuration for attendance module.
 """
 from django.contrib import admin
-from .models import Class, Student, Attendance
+from .models import Class, Student, Attendance, AttendanceDailyRollup, StudentAttendanceCounter, AttendanceSubmission, AttendanceArchiveMonth, QueuedAttendanceSubmission
 
 
 @admin.register(Class)
@@ -76,3 +76,52 @@ class AttendanceAdmin(admin.ModelAdmin):
         """Display student's name."""
         return obj.student.user.get_full_name()
     get_student_name.short_description = 'Student'
+
+
+@admin.register(AttendanceDailyRollup)
+class AttendanceDailyRollupAdmin(admin.ModelAdmin):
+    """Admin interface for AttendanceDailyRollup model."""
+    list_display = ('date', 'section', 'legacy_class', 'present_count', 'absent_count', 'late_count', 'excused_count', 'total_count', 'tenant')
+    list_filter = ('tenant', 'date')
+    date_hierarchy = 'date'
+    ordering = ('-date',)
+    readonly_fields = ('updated_at',)
+
+
+@admin.register(StudentAttendanceCounter)
+class StudentAttendanceCounterAdmin(admin.ModelAdmin):
+    """Admin interface for StudentAttendanceCounter model."""
+    list_display = ('student', 'date', 'present_total', 'absent_total', 'late_total', 'excused_total', 'days_total', 'tenant')
+    list_filter = ('tenant',)
+    date_hierarchy = 'date'
+    ordering = ('student', '-date')
+    raw_id_fields = ('student',)
+
+
+@admin.register(AttendanceSubmission)
+class AttendanceSubmissionAdmin(admin.ModelAdmin):
+    """Admin interface for AttendanceSubmission model."""
+    list_display = ('date', 'section', 'legacy_class', 'marked_by', 'present_count', 'absent_count', 'total_count', 'created_at', 'tenant')
+    list_filter = ('tenant', 'date')
+    date_hierarchy = 'date'
+    ordering = ('-created_at',)
+    readonly_fields = ('created_at',)
+
+
+@admin.register(AttendanceArchiveMonth)
+class AttendanceArchiveMonthAdmin(admin.ModelAdmin):
+    """Admin interface for AttendanceArchiveMonth model."""
+    list_display = ('student', 'month', 'tenant')
+    list_filter = ('tenant', 'month')
+    ordering = ('student', '-month')
+    raw_id_fields = ('student',)
+
+
+@admin.register(QueuedAttendanceSubmission)
+class QueuedAttendanceSubmissionAdmin(admin.ModelAdmin):
+    """Admin interface for QueuedAttendanceSubmission model."""
+    list_display = ('date', 'section', 'legacy_class', 'marked_by', 'attempts', 'created_at', 'tenant')
+    list_filter = ('tenant', 'date')
+    date_hierarchy = 'date'
+    ordering = ('created_at',)
+    readonly_fields = ('created_at',)
@@ -0,0 +1,384 @@
+"""
+Vectorized attendance analytics.
+
+Loads a tenant's, section's or legacy class's attendance for a date range
+into a students x school-days status matrix and computes absence streaks,
+chronic absenteeism, weekday patterns, late-arrival trends and section
+comparisons with NumPy array operations instead of per-row Python loops.
+
+NumPy is an optional dependency, imported when analytics are first used;
+ImproperlyConfigured is raised if it is not installed.
+"""
+from datetime import date
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+
+from .archive import STATUS_CODES, month_start
+from .models import Attendance, AttendanceArchiveMonth
+from .reports import get_roster
+from .sparse import get_implied_present, is_sparse
+
+
+NO_RECORD = -1
+ANALYTICS_CHUNK_SIZE = 10000
+PRESENT = STATUS_CODES['present']
+ABSENT = STATUS_CODES['absent']
+LATE = STATUS_CODES['late']
+EXCUSED = STATUS_CODES['excused']
+
+# Share of recorded days missed (absent or excused) that counts as chronic
+DEFAULT_CHRONIC_THRESHOLD = 0.10
+
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImproperlyConfigured('Attendance analytics require numpy. Install it with "pip install numpy".')
+    return numpy
+
+
+class AttendanceMatrix:
+    """
+    Status codes for ``students`` x ``days``; NO_RECORD where a student has
+    no attendance that day. ``days`` only holds days with at least one record.
+    """
+
+    def __init__(self, students, groups, group_labels, days, statuses):
+        self.students = students
+        self.groups = groups
+        self.group_labels = group_labels
+        self.days = days
+        self.statuses = statuses
+
+    @property
+    def shape(self):
+        return self.statuses.shape
+
+
+def _group_label(row):
+    if row['enrollment__section']:
+        return ('section', row['enrollment__section']), (
+            f"{row['enrollment__section__class_obj__name']} - {row['enrollment__section__name']}"
+        )
+    if row['class_assigned']:
+        name = row['class_assigned__name']
+        if row['class_assigned__section']:
+            name += f" - {row['class_assigned__section']}"
+        return ('class', row['class_assigned']), name
+    return ('none', None), 'Unassigned'
+
+
+def _fetch_raw(queryset, chunk_size):
+    """Yield chunks of raw database rows for a values_list() queryset."""
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        while True:
+            chunk = cursor.fetchmany(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def load_matrix(tenant, start_date, end_date, class_obj=None, section=None):
+    """
+    Load live, archived and implied attendance for a roster into an
+    AttendanceMatrix.
+    """
+    np = _numpy()
+
+    roster_students = get_roster(tenant, class_obj=class_obj, section=section)
+    roster = roster_students.values(
+        'pk', 'roll_number', 'user__first_name', 'user__last_name',
+        'enrollment__section', 'enrollment__section__name', 'enrollment__section__class_obj__name',
+        'class_assigned', 'class_assigned__name', 'class_assigned__section',
+    ).order_by('roll_number', 'pk')
+
+    students = []
+    group_index = {}
+    group_labels = []
+    groups = []
+    for row in roster:
+        key, label = _group_label(row)
+        if key not in group_index:
+            group_index[key] = len(group_labels)
+            group_labels.append(label)
+        groups.append(group_index[key])
+        students.append({
+            'id': row['pk'],
+            'roll_number': row['roll_number'],
+            'name': f"{row['user__first_name']} {row['user__last_name']}".strip(),
+            'group': label,
+        })
+    student_index = {student['id']: i for i, student in enumerate(students)}
+
+    first_ordinal = start_date.toordinal()
+    n_calendar_days = end_date.toordinal() - first_ordinal + 1
+    statuses = np.full((len(students), max(n_calendar_days, 0)), NO_RECORD, dtype=np.int8)
+
+    if students and n_calendar_days > 0:
+        # Live rows
+        rows = Attendance.objects.for_tenant(tenant).filter(
+            student__in=roster_students.values('pk'),
+            date__gte=start_date,
+            date__lte=end_date,
+        ).values_list('student_id', 'date', 'status').order_by()
+
+        # Raw driver values, mapped through small lookup tables: the ORM's
+        # per-row converters would dominate the load time for large schools
+        student_lookup = {}
+        for student_id, i in student_index.items():
+            student_lookup[student_id] = student_lookup[str(student_id)] = i
+            student_lookup[getattr(student_id, 'hex', student_id)] = i
+        day_lookup = {}
+        student_rows = []
+        day_columns = []
+        codes = []
+        for chunk in _fetch_raw(rows, ANALYTICS_CHUNK_SIZE):
+            student_rows.extend([student_lookup[row[0]] for row in chunk])
+            for row in chunk:
+                if row[1] not in day_lookup:
+                    day = date.fromisoformat(row[1]) if isinstance(row[1], str) else row[1]
+                    day_lookup[row[1]] = day.toordinal() - first_ordinal
+            day_columns.extend([day_lookup[row[1]] for row in chunk])
+            codes.extend([STATUS_CODES[row[2]] for row in chunk])
+        if codes:
+            statuses[np.array(student_rows), np.array(day_columns)] = np.array(codes, dtype=np.int8)
+
+        # Archived months, decoded for all rows at once
+        archives = list(AttendanceArchiveMonth.objects.filter(
+            student__in=roster_students.values('pk'),
+            month__gte=month_start(start_date),
+            month__lte=end_date,
+        ).values_list('student_id', 'month', 'recorded_days', 'status_bits'))
+        if archives:
+            archive_rows = np.array([student_index[a[0]] for a in archives])
+            month_offsets = np.array([a[1].toordinal() - first_ordinal for a in archives])
+            recorded = np.array([a[2] for a in archives], dtype=np.int64)
+            status_bits = np.array([a[3] for a in archives], dtype=np.int64)
+
+            day_numbers = np.arange(31)
+            is_recorded = ((recorded[:, None] >> day_numbers) & 1).astype(bool)
+            day_codes = ((status_bits[:, None] >> (2 * day_numbers)) & 3).astype(np.int8)
+            columns = month_offsets[:, None] + day_numbers
+            keep = is_recorded & (columns >= 0) & (columns < n_calendar_days)
+
+            row_ids = np.broadcast_to(archive_rows[:, None], keep.shape)
+            statuses[row_ids[keep], columns[keep]] = day_codes[keep]
+
+        # Implied presence of exceptions-only tenants
+        if is_sparse(tenant):
+            implied = get_implied_present(tenant, start_date, end_date, list(student_index))
+            cells = [
+                (student_index[student_id], day.toordinal() - first_ordinal)
+                for student_id, days in implied.items()
+                for day in days
+            ]
+            if cells:
+                cells = np.array(cells)
+                statuses[cells[:, 0], cells[:, 1]] = PRESENT
+
+    # Keep school days only: days on which anyone was recorded
+    school_days = np.flatnonzero((statuses != NO_RECORD).any(axis=0))
+    days = [
+        date.fromordinal(first_ordinal + int(column))
+        for column in school_days
+    ]
+    return AttendanceMatrix(
+        students=students,
+        groups=np.array(groups, dtype=np.int64),
+        group_labels=group_labels,
+        days=days,
+        statuses=statuses[:, school_days],
+    )
+
+
+def _rate(numerator, denominator):
+    np = _numpy()
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+
+def absence_streaks(absent):
+    """
+    Return (longest, current) runs of consecutive absent school days per
+    student, from a students x days boolean matrix.
+    """
+    np = _numpy()
+    n_students, n_days = absent.shape
+    longest = np.zeros(n_students, dtype=np.int64)
+    current = np.zeros(n_students, dtype=np.int64)
+    if n_days == 0:
+        return longest, current
+
+    edges = np.diff(np.pad(absent.astype(np.int8), ((0, 0), (1, 1))), axis=1)
+    start_rows, start_columns = np.nonzero(edges == 1)
+    _, end_columns = np.nonzero(edges == -1)
+    lengths = end_columns - start_columns
+    np.maximum.at(longest, start_rows, lengths)
+
+    ongoing = end_columns == n_days
+    current[start_rows[ongoing]] = lengths[ongoing]
+    return longest, current
+
+
+def late_trends(recorded, late):
+    """
+    Least-squares slope of each student's late indicator over school days,
+    scaled to percentage points across the whole period.
+    """
+    np = _numpy()
+    n_days = recorded.shape[1]
+    x = np.arange(n_days, dtype=float)
+    recorded = recorded.astype(float)
+    late = late.astype(float)
+
+    n = recorded.sum(axis=1)
+    sum_x = recorded @ x
+    sum_y = late.sum(axis=1)
+    sum_xx = recorded @ (x * x)
+    sum_xy = late @ x
+    slope = _rate(n * sum_xy - sum_x * sum_y, n * sum_xx - sum_x * sum_x)
+    return slope * max(n_days - 1, 1) * 100
+
+
+def analyze(matrix, chronic_threshold=DEFAULT_CHRONIC_THRESHOLD):
+    """
+    Compute analytics for an AttendanceMatrix. Returns a dict with
+    ``summary``, ``students``, ``weekdays``, ``weekly_late`` and ``groups``.
+    """
+    np = _numpy()
+    statuses = matrix.statuses
+
+    recorded = statuses != NO_RECORD
+    present = statuses == PRESENT
+    absent = statuses == ABSENT
+    late = statuses == LATE
+    excused = statuses == EXCUSED
+
+    recorded_days = recorded.sum(axis=1)
+    present_days = present.sum(axis=1)
+    absent_days = absent.sum(axis=1)
+    late_days = late.sum(axis=1)
+    excused_days = excused.sum(axis=1)
+
+    missed_rate = _rate(absent_days + excused_days, recorded_days)
+    attendance_rate = _rate(present_days, recorded_days)
+    chronic = (missed_rate >= chronic_threshold) & (recorded_days > 0)
+    longest_streak, current_streak = absence_streaks(absent)
+    late_trend = late_trends(recorded, late)
+
+    students = [
+        {
+            **student,
+            'recorded_days': int(recorded_days[i]),
+            'present_days': int(present_days[i]),
+            'absent_days': int(absent_days[i]),
+            'late_days': int(late_days[i]),
+            'excused_days': int(excused_days[i]),
+            'attendance_rate': round(float(attendance_rate[i]) * 100, 2),
+            'missed_rate': round(float(missed_rate[i]) * 100, 2),
+            'longest_absence_streak': int(longest_streak[i]),
+            'current_absence_streak': int(current_streak[i]),
+            'late_trend': round(float(late_trend[i]), 2),
+            'is_chronic': bool(chronic[i]),
+        }
+        for i, student in enumerate(matrix.students)
+    ]
+
+    # Weekday patterns over all recorded student-days
+    weekdays = np.array([day.weekday() for day in matrix.days], dtype=np.int64)
+    recorded_by_day = recorded.sum(axis=0)
+    absent_by_day = absent.sum(axis=0)
+    late_by_day = late.sum(axis=0)
+    weekday_recorded = np.bincount(weekdays, weights=recorded_by_day, minlength=7)
+    weekday_absent = np.bincount(weekdays, weights=absent_by_day, minlength=7)
+    weekday_late = np.bincount(weekdays, weights=late_by_day, minlength=7)
+    weekday_absence_rate = _rate(weekday_absent, weekday_recorded)
+    weekday_late_rate = _rate(weekday_late, weekday_recorded)
+    weekday_rows = [
+        {
+            'weekday': WEEKDAYS[weekday],
+            'recorded': int(weekday_recorded[weekday]),
+            'absence_rate': round(float(weekday_absence_rate[weekday]) * 100, 2),
+            'late_rate': round(float(weekday_late_rate[weekday]) * 100, 2),
+        }
+        for weekday in range(7)
+        if weekday_recorded[weekday] > 0
+    ]
+
+    # Late arrivals per week
+    weekly_late = []
+    if matrix.days:
+        first_monday = matrix.days[0].toordinal() - matrix.days[0].weekday()
+        weeks = np.array([(day.toordinal() - first_monday) // 7 for day in matrix.days], dtype=np.int64)
+        week_recorded = np.bincount(weeks, weights=recorded_by_day)
+        week_late_rate = _rate(np.bincount(weeks, weights=late_by_day), week_recorded)
+        weekly_late = [
+            {
+                'week_start': date.fromordinal(first_monday + 7 * week),
+                'late_rate': round(float(week_late_rate[week]) * 100, 2),
+            }
+            for week in range(len(week_recorded))
+            if week_recorded[week] > 0
+        ]
+
+    # Section / class comparison
+    n_groups = len(matrix.group_labels)
+    groups = []
+    if n_groups:
+        group_students = np.bincount(matrix.groups, minlength=n_groups)
+        group_recorded = np.bincount(matrix.groups, weights=recorded_days, minlength=n_groups)
+        group_present = np.bincount(matrix.groups, weights=present_days, minlength=n_groups)
+        group_absent = np.bincount(matrix.groups, weights=absent_days, minlength=n_groups)
+        group_late = np.bincount(matrix.groups, weights=late_days, minlength=n_groups)
+        group_chronic = np.bincount(matrix.groups, weights=chronic, minlength=n_groups)
+        group_attendance = _rate(group_present, group_recorded)
+        group_absence = _rate(group_absent, group_recorded)
+        group_late_rate = _rate(group_late, group_recorded)
+        groups = sorted(
+            (
+                {
+                    'name': label,
+                    'students': int(group_students[g]),
+                    'attendance_rate': round(float(group_attendance[g]) * 100, 2),
+                    'absence_rate': round(float(group_absence[g]) * 100, 2),
+                    'late_rate': round(float(group_late_rate[g]) * 100, 2),
+                    'chronic_count': int(group_chronic[g]),
+                }
+                for g, label in enumerate(matrix.group_labels)
+            ),
+            key=lambda group: group['attendance_rate'],
+        )
+
+    total_recorded = int(recorded_days.sum())
+    summary = {
+        'students': len(matrix.students),
+        'school_days': len(matrix.days),
+        'recorded': total_recorded,
+        'attendance_rate': round(float(_rate(present_days.sum(), total_recorded)) * 100, 2),
+        'absence_rate': round(float(_rate(absent_days.sum(), total_recorded)) * 100, 2),
+        'late_rate': round(float(_rate(late_days.sum(), total_recorded)) * 100, 2),
+        'chronic_count': int(chronic.sum()),
+        'chronic_threshold': round(chronic_threshold * 100, 2),
+    }
+
+    return {
+        'summary': summary,
+        'students': students,
+        'weekdays': weekday_rows,
+        'weekly_late': weekly_late,
+        'groups': groups,
+    }
+
+
+def build_analytics(tenant, start_date, end_date, class_obj=None, section=None,
+                    chronic_threshold=DEFAULT_CHRONIC_THRESHOLD):
+    """Load attendance for a roster and analyze it."""
+    matrix = load_matrix(tenant, start_date, end_date, class_obj=class_obj, section=section)
+    return analyze(matrix, chronic_threshold=chronic_threshold)
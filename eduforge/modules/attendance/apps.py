@@ -8,3 +8,7 @@ class AttendanceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'modules.attendance'
     verbose_name = 'Attendance'
+
+    def ready(self):
+        # Sync Student profiles when academic enrollments change
+        from modules.attendance import signals  # noqa: F401
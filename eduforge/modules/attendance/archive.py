@@ -0,0 +1,334 @@
+"""
+Compact monthly attendance archive.
+
+Attendance for closed sessions can be moved from per-day Attendance rows
+into one AttendanceArchiveMonth row per student and month: a bitmask of
+recorded days, 2 bits of status per day, the usual marker, and sparse
+notes and marker exceptions. A student-month of ~22 school days shrinks
+from 22 rows with UUIDs and timestamps to a single small row.
+
+Every (student, date) lives either in Attendance or in the archive, never
+both: compact_attendance deletes the rows it archives, restore_attendance
+clears the days it restores, and the batch writer releases an archived day
+before writing a live row for it. Readers add archived counts to live ones
+with get_archived_counts and iter_archived_days.
+
+Row ids and created/updated timestamps are not kept; restored rows get new
+ones.
+"""
+import uuid
+from collections import Counter
+from datetime import date, timedelta
+
+from django.db import transaction
+
+from .models import Attendance, AttendanceArchiveMonth
+
+
+STATUS_CODES = {
+    'present': 0,
+    'absent': 1,
+    'late': 2,
+    'excused': 3,
+}
+
+CODE_STATUSES = {code: status for status, code in STATUS_CODES.items()}
+
+ALL_DAYS = (1 << 31) - 1
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(month):
+    if month.month == 12:
+        return date(month.year + 1, 1, 1)
+    return date(month.year, month.month + 1, 1)
+
+
+def day_mask(month, start_date=None, end_date=None):
+    """Bitmask of the days of ``month`` inside start_date..end_date."""
+    first = 1
+    last = 31
+    if start_date is not None and start_date > month:
+        if start_date >= next_month(month):
+            return 0
+        first = start_date.day
+    if end_date is not None and end_date < next_month(month) - timedelta(days=1):
+        if end_date < month:
+            return 0
+        last = end_date.day
+    if first > last:
+        return 0
+    return ((1 << last) - 1) & ~((1 << (first - 1)) - 1)
+
+
+def _iter_day_numbers(days):
+    """Yield the day-of-month numbers set in a bitmask, in order."""
+    while days:
+        lowest = days & -days
+        yield lowest.bit_length()
+        days ^= lowest
+
+
+def get_day_status(archive, day_number):
+    return CODE_STATUSES[(archive.status_bits >> (2 * (day_number - 1))) & 3]
+
+
+def count_statuses(recorded_days, status_bits, mask=ALL_DAYS):
+    """Count statuses over the recorded days selected by ``mask``."""
+    counts = {status: 0 for status in STATUS_CODES}
+    for day_number in _iter_day_numbers(recorded_days & mask):
+        counts[CODE_STATUSES[(status_bits >> (2 * (day_number - 1))) & 3]] += 1
+    counts['total'] = sum(counts.values())
+    return counts
+
+
+def decode_month(archive, start_date=None, end_date=None):
+    """
+    Yield (date, status, notes, marked_by_id) for archived days in range.
+    """
+    mask = day_mask(archive.month, start_date, end_date)
+    for day_number in _iter_day_numbers(archive.recorded_days & mask):
+        key = str(day_number)
+        marked_by_id = archive.markers[key] if key in archive.markers else archive.marked_by_id
+        yield (
+            archive.month.replace(day=day_number),
+            get_day_status(archive, day_number),
+            archive.notes.get(key, ''),
+            uuid.UUID(marked_by_id) if isinstance(marked_by_id, str) else marked_by_id,
+        )
+
+
+def _set_day(archive, day_number, status, notes, marked_by_id):
+    shift = 2 * (day_number - 1)
+    archive.recorded_days |= 1 << (day_number - 1)
+    archive.status_bits = (archive.status_bits & ~(3 << shift)) | (STATUS_CODES[status] << shift)
+    key = str(day_number)
+    archive.notes.pop(key, None)
+    if notes:
+        archive.notes[key] = notes
+    archive.markers[key] = str(marked_by_id) if marked_by_id else None
+
+
+def _clear_day(archive, day_number):
+    archive.recorded_days &= ~(1 << (day_number - 1))
+    archive.status_bits &= ~(3 << (2 * (day_number - 1)))
+    archive.notes.pop(str(day_number), None)
+    archive.markers.pop(str(day_number), None)
+
+
+def _normalize_markers(archive):
+    """Keep the most common marker on the row and only the exceptions sparse."""
+    markers = {
+        str(day_number): archive.markers.get(
+            str(day_number), str(archive.marked_by_id) if archive.marked_by_id else None
+        )
+        for day_number in _iter_day_numbers(archive.recorded_days)
+    }
+    usual = Counter(markers.values()).most_common(1)
+    usual = usual[0][0] if usual else None
+    archive.marked_by_id = uuid.UUID(usual) if usual else None
+    archive.markers = {day: marker for day, marker in markers.items() if marker != usual}
+
+
+def _archives_for(student_ids, months):
+    return {
+        (archive.student_id, archive.month): archive
+        for archive in AttendanceArchiveMonth.objects.filter(student_id__in=student_ids, month__in=months)
+    }
+
+
+def _student_ids_in_range(records, batch_size):
+    student_ids = list(records.values_list('student_id', flat=True).distinct().order_by('student_id'))
+    for i in range(0, len(student_ids), batch_size):
+        yield student_ids[i:i + batch_size]
+
+
+def compact_attendance(tenant, start_date, end_date, batch_size=500):
+    """
+    Move a tenant's Attendance rows in start_date..end_date into the archive,
+    merging with months already archived. Works through students in batches.
+    Returns (rows archived, archive rows written).
+    """
+    records = Attendance.objects.for_tenant(tenant).filter(date__gte=start_date, date__lte=end_date)
+
+    archived = 0
+    written = 0
+    with transaction.atomic():
+        for student_ids in _student_ids_in_range(records, batch_size):
+            batch = records.filter(student_id__in=student_ids)
+            rows = list(batch.values_list('student_id', 'date', 'status', 'notes', 'marked_by_id'))
+            months = {month_start(row[1]) for row in rows}
+            existing = _archives_for(student_ids, months)
+
+            touched = {}
+            for student_id, day, status, notes, marked_by_id in rows:
+                key = (student_id, month_start(day))
+                archive = touched.get(key) or existing.get(key)
+                if archive is None:
+                    archive = AttendanceArchiveMonth(
+                        tenant=tenant,
+                        student_id=student_id,
+                        month=key[1],
+                        markers={},
+                        notes={},
+                    )
+                touched[key] = archive
+                _set_day(archive, day.day, status, notes, marked_by_id)
+
+            for archive in touched.values():
+                _normalize_markers(archive)
+            AttendanceArchiveMonth.objects.bulk_create(
+                [archive for archive in touched.values() if archive.pk is None]
+            )
+            AttendanceArchiveMonth.objects.bulk_update(
+                [archive for archive in touched.values() if archive.pk is not None],
+                ['recorded_days', 'status_bits', 'marked_by', 'markers', 'notes'],
+            )
+            batch.delete()
+
+            archived += len(rows)
+            written += len(touched)
+    return archived, written
+
+
+def restore_attendance(tenant, start_date, end_date, batch_size=500):
+    """
+    Recreate Attendance rows for archived days in start_date..end_date and
+    remove those days from the archive. Returns the number of rows restored.
+    """
+    archives = AttendanceArchiveMonth.objects.for_tenant(tenant).filter(
+        month__gte=month_start(start_date),
+        month__lte=end_date,
+    ).order_by('pk')
+
+    restored = 0
+    with transaction.atomic():
+        emptied = []
+        changed = []
+        records = []
+        for archive in archives.iterator(chunk_size=batch_size):
+            for day, status, notes, marked_by_id in decode_month(archive, start_date, end_date):
+                records.append(Attendance(
+                    tenant_id=archive.tenant_id,
+                    student_id=archive.student_id,
+                    date=day,
+                    status=status,
+                    notes=notes,
+                    marked_by_id=marked_by_id,
+                ))
+                _clear_day(archive, day.day)
+            if archive.recorded_days:
+                _normalize_markers(archive)
+                changed.append(archive)
+            else:
+                emptied.append(archive.pk)
+
+            if len(records) >= batch_size:
+                Attendance.objects.bulk_create(records)
+                restored += len(records)
+                records = []
+
+        Attendance.objects.bulk_create(records)
+        restored += len(records)
+        AttendanceArchiveMonth.objects.filter(pk__in=emptied).delete()
+        AttendanceArchiveMonth.objects.bulk_update(
+            changed, ['recorded_days', 'status_bits', 'marked_by', 'markers', 'notes'], batch_size=batch_size
+        )
+    return restored
+
+
+def release_archived_days(student_ids, day):
+    """
+    Remove ``day`` from the archive for the given students, so a live row can
+    be written for it. Returns {student_id: archived status}. Call inside the
+    transaction that writes the live rows.
+    """
+    bit = 1 << (day.day - 1)
+    archives = list(
+        AttendanceArchiveMonth.objects.select_for_update().filter(
+            student_id__in=student_ids,
+            month=month_start(day),
+        )
+    )
+
+    released = {}
+    changed = []
+    for archive in archives:
+        if not archive.recorded_days & bit:
+            continue
+        released[archive.student_id] = get_day_status(archive, day.day)
+        _clear_day(archive, day.day)
+        changed.append(archive)
+
+    if changed:
+        AttendanceArchiveMonth.objects.bulk_update(
+            changed, ['recorded_days', 'status_bits', 'markers', 'notes']
+        )
+    return released
+
+
+def get_archived_counts(student_ids, start_date, end_date):
+    """
+    Return {student_id: status counts} of archived days in the date range,
+    read with one query.
+    """
+    archives = AttendanceArchiveMonth.objects.filter(
+        student_id__in=student_ids,
+        month__gte=month_start(start_date),
+        month__lte=end_date,
+    ).values_list('student_id', 'month', 'recorded_days', 'status_bits')
+
+    counts = {}
+    for student_id, month, recorded_days, status_bits in archives:
+        month_counts = count_statuses(recorded_days, status_bits, day_mask(month, start_date, end_date))
+        if student_id in counts:
+            for status, value in month_counts.items():
+                counts[student_id][status] += value
+        else:
+            counts[student_id] = month_counts
+    return counts
+
+
+def get_archived_records(student, start_date, end_date):
+    """
+    Return unsaved Attendance instances for a student's archived days in
+    range, newest first, with marked_by loaded.
+    """
+    from core.users.models import CustomUser
+
+    archives = AttendanceArchiveMonth.objects.filter(
+        student=student,
+        month__gte=month_start(start_date),
+        month__lte=end_date,
+    )
+    records = [
+        Attendance(
+            tenant_id=archive.tenant_id,
+            student=student,
+            date=day,
+            status=status,
+            notes=notes,
+            marked_by_id=marked_by_id,
+        )
+        for archive in archives
+        for day, status, notes, marked_by_id in decode_month(archive, start_date, end_date)
+    ]
+
+    markers = CustomUser.objects.in_bulk({record.marked_by_id for record in records if record.marked_by_id})
+    for record in records:
+        record.marked_by = markers.get(record.marked_by_id)
+    records.sort(key=lambda record: record.date, reverse=True)
+    return records
+
+
+def iter_archived_days(archives, start_date=None, end_date=None):
+    """
+    Yield (tenant_id, student_id, date, status) for archived days, in the
+    order of ``archives``.
+    """
+    for archive in archives:
+        for day, status, _, _ in decode_month(archive, start_date, end_date):
+            yield archive.tenant_id, archive.student_id, day, status
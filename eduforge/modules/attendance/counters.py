@@ -0,0 +1,259 @@
+"""
+Per-student cumulative attendance counters.
+
+StudentAttendanceCounter keeps a prefix-sum row per student per recorded
+day. Counts for any date range are the difference between the last row on
+or before the end date and the last row before the start date, so a
+percentage costs two indexed lookups however long the history is.
+
+The batch writer keeps counters current with apply_status_changes;
+rebuild_counters and find_counter_mismatches recompute and verify them
+against raw Attendance rows, archived days and implied presence.
+"""
+import heapq
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Value, When
+
+from core.tenants.models import Tenant
+
+from .archive import count_statuses, iter_archived_days
+from .models import Attendance, AttendanceArchiveMonth, Student, StudentAttendanceCounter
+from .sparse import count_implied_present, iter_implied_present, sparse_tenant_ids
+
+
+STATUS_FIELDS = {
+    'present': 'present_total',
+    'absent': 'absent_total',
+    'late': 'late_total',
+    'excused': 'excused_total',
+}
+
+TOTAL_FIELDS = tuple(STATUS_FIELDS.values()) + ('days_total',)
+
+
+def _as_counts(row):
+    """Map a counter row (or None) to status counts."""
+    counts = {status: 0 for status in STATUS_FIELDS}
+    counts['total'] = 0
+    if row is None:
+        return counts
+    for status, field in STATUS_FIELDS.items():
+        counts[status] = getattr(row, field)
+    counts['total'] = row.days_total
+    return counts
+
+
+def get_cumulative_counts(student, date, inclusive=True):
+    """Return cumulative counts on (or, if not inclusive, before) a date."""
+    lookup = 'date__lte' if inclusive else 'date__lt'
+    row = StudentAttendanceCounter.objects.filter(
+        student=student, **{lookup: date}
+    ).order_by('-date').first()
+    return _as_counts(row)
+
+
+def get_range_counts(student, start_date, end_date):
+    """
+    Return present/absent/late/excused/total counts for an inclusive date range.
+    """
+    through_end = get_cumulative_counts(student, end_date)
+    before_start = get_cumulative_counts(student, start_date, inclusive=False)
+    return {key: through_end[key] - before_start[key] for key in through_end}
+
+
+def get_lifetime_counts(student):
+    """Return counts over the student's whole history with one lookup."""
+    row = StudentAttendanceCounter.objects.filter(student=student).order_by('-date').first()
+    return _as_counts(row)
+
+
+def apply_status_changes(tenant, date, changes):
+    """
+    Update counters after attendance for one day was written.
+
+    ``changes`` maps student id to (old_status, new_status); old_status is
+    None for a new record. Runs at most three queries, whatever the number
+    of students. Call inside the transaction that wrote the attendance.
+    """
+    changes = {
+        student_id: (old, new)
+        for student_id, (old, new) in changes.items()
+        if old != new
+    }
+    if not changes:
+        return
+
+    # Seed a row on this date for students recording it for the first time,
+    # carrying over the totals of their previous row
+    new_ids = [student_id for student_id, (old, _) in changes.items() if old is None]
+    if new_ids:
+        previous = StudentAttendanceCounter.objects.filter(
+            student=OuterRef('pk'),
+            date__lt=date,
+        ).order_by('-date')
+        seeds = Student.objects.filter(pk__in=new_ids).annotate(**{
+            f'previous_{field}': Subquery(previous.values(field)[:1]) for field in TOTAL_FIELDS
+        }).values('pk', *[f'previous_{field}' for field in TOTAL_FIELDS])
+
+        StudentAttendanceCounter.objects.bulk_create([
+            StudentAttendanceCounter(
+                tenant=tenant,
+                student_id=seed['pk'],
+                date=date,
+                **{field: seed[f'previous_{field}'] or 0 for field in TOTAL_FIELDS},
+            )
+            for seed in seeds
+        ], ignore_conflicts=True)
+
+    # Apply every delta to this day and all later rows in one UPDATE
+    increments = {field: [] for field in TOTAL_FIELDS}
+    decrements = {field: [] for field in TOTAL_FIELDS}
+    for student_id, (old, new) in changes.items():
+        if old is None:
+            increments['days_total'].append(student_id)
+        else:
+            decrements[STATUS_FIELDS[old]].append(student_id)
+        if new is not None:
+            increments[STATUS_FIELDS[new]].append(student_id)
+        else:
+            decrements['days_total'].append(student_id)
+
+    updates = {}
+    for field in TOTAL_FIELDS:
+        whens = []
+        if increments[field]:
+            whens.append(When(student_id__in=increments[field], then=Value(1)))
+        if decrements[field]:
+            whens.append(When(student_id__in=decrements[field], then=Value(-1)))
+        if whens:
+            updates[field] = F(field) + Case(*whens, default=Value(0), output_field=IntegerField())
+
+    StudentAttendanceCounter.objects.filter(
+        student_id__in=list(changes),
+        date__gte=date,
+    ).update(**updates)
+
+
+def rebuild_counters(tenant=None, student_ids=None, batch_size=5000):
+    """
+    Recompute counters from raw Attendance rows, archived days and implied
+    presence, streaming them in (student, date) order. Returns the number of counter rows written.
+    """
+    records = Attendance.objects.all()
+    counters = StudentAttendanceCounter.objects.all()
+    if tenant is not None:
+        records = records.filter(tenant=tenant)
+        counters = counters.filter(tenant=tenant)
+    if student_ids is not None:
+        records = records.filter(student_id__in=student_ids)
+        counters = counters.filter(student_id__in=student_ids)
+
+    archives = AttendanceArchiveMonth.objects.all()
+    if tenant is not None:
+        archives = archives.filter(tenant=tenant)
+    if student_ids is not None:
+        archives = archives.filter(student_id__in=student_ids)
+
+    # Live rows, archived days and implied presence, merged in (student, date) order
+    implied = []
+    for sparse_tenant in Tenant.objects.filter(pk__in=sparse_tenant_ids()):
+        if tenant is None or sparse_tenant.pk == tenant.pk:
+            implied.append(iter_implied_present(sparse_tenant, student_ids=student_ids, batch_size=batch_size))
+    rows = heapq.merge(
+        records.order_by('student_id', 'date').values_list(
+            'tenant_id', 'student_id', 'date', 'status'
+        ).iterator(chunk_size=batch_size),
+        iter_archived_days(archives.order_by('student_id', 'month').iterator(chunk_size=batch_size)),
+        *implied,
+        key=lambda row: (str(row[1]), row[2]),
+    )
+
+    written = 0
+    with transaction.atomic():
+        counters.delete()
+
+        batch = []
+        current_student = None
+        totals = {}
+        for tenant_id, student_id, date, status in rows:
+            if student_id != current_student:
+                current_student = student_id
+                totals = {field: 0 for field in TOTAL_FIELDS}
+            totals[STATUS_FIELDS[status]] += 1
+            totals['days_total'] += 1
+            batch.append(StudentAttendanceCounter(
+                tenant_id=tenant_id,
+                student_id=student_id,
+                date=date,
+                **totals,
+            ))
+            if len(batch) >= batch_size:
+                StudentAttendanceCounter.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+
+        StudentAttendanceCounter.objects.bulk_create(batch)
+        written += len(batch)
+
+    return written
+
+
+def find_counter_mismatches(tenant=None):
+    """
+    Compare every student's latest counter row with raw Attendance, archived
+    and implied counts.
+    Returns {student_id: (expected, actual)} for students that disagree.
+    """
+    records = Attendance.objects.all()
+    counters = StudentAttendanceCounter.objects.all()
+    if tenant is not None:
+        records = records.filter(tenant=tenant)
+        counters = counters.filter(tenant=tenant)
+
+    expected = {}
+    raw = records.values('student').annotate(
+        present_total=Count('id', filter=Q(status='present')),
+        absent_total=Count('id', filter=Q(status='absent')),
+        late_total=Count('id', filter=Q(status='late')),
+        excused_total=Count('id', filter=Q(status='excused')),
+        days_total=Count('id'),
+    ).order_by()
+    for row in raw.iterator():
+        expected[row['student']] = tuple(row[field] for field in TOTAL_FIELDS)
+
+    archives = AttendanceArchiveMonth.objects.all()
+    if tenant is not None:
+        archives = archives.filter(tenant=tenant)
+    for student_id, recorded_days, status_bits in archives.values_list(
+        'student_id', 'recorded_days', 'status_bits'
+    ).iterator():
+        counts = count_statuses(recorded_days, status_bits)
+        archived = tuple(counts[status] for status in STATUS_FIELDS) + (counts['total'],)
+        current = expected.get(student_id, tuple(0 for _ in TOTAL_FIELDS))
+        expected[student_id] = tuple(a + b for a, b in zip(current, archived))
+
+    for sparse_tenant in Tenant.objects.filter(pk__in=sparse_tenant_ids()):
+        if tenant is not None and sparse_tenant.pk != tenant.pk:
+            continue
+        for student_id, days in count_implied_present(sparse_tenant).items():
+            current = expected.get(student_id, tuple(0 for _ in TOTAL_FIELDS))
+            implied = tuple(days if field in ('present_total', 'days_total') else 0 for field in TOTAL_FIELDS)
+            expected[student_id] = tuple(a + b for a, b in zip(current, implied))
+
+    latest_date = StudentAttendanceCounter.objects.filter(
+        student=OuterRef('student'),
+    ).order_by('-date').values('date')[:1]
+    actual = {}
+    latest = counters.filter(date=Subquery(latest_date)).values_list('student_id', *TOTAL_FIELDS)
+    for student_id, *totals in latest.iterator():
+        actual[student_id] = tuple(totals)
+
+    empty = tuple(0 for _ in TOTAL_FIELDS)
+    mismatches = {}
+    for student_id in set(expected) | set(actual):
+        expected_totals = expected.get(student_id, empty)
+        actual_totals = actual.get(student_id, empty)
+        if expected_totals != actual_totals:
+            mismatches[student_id] = (expected_totals, actual_totals)
+    return mismatches
@@ -0,0 +1,153 @@
+"""
+Teacher attendance dashboard.
+
+Builds everything the teacher branch of the attendance home page shows
+(roster size, today's counts, absentees, class cards and recent history)
+with a handful of annotated queries plus a read of the submission log, and
+caches the result per (teacher, date). The batch writer drops a teacher's entry when one of
+their sections or classes is marked, or when they mark attendance; the
+roster signals drop it when enrollments or class teachers change.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from core.users.models import CustomUser
+
+from .models import Attendance, Class, Student
+from .sparse import count_implied_present, is_sparse
+from .submissions import get_recent_history
+
+
+CACHE_PREFIX = 'attendance:teacher_dashboard'
+CACHE_TIMEOUT = getattr(settings, 'ATTENDANCE_DASHBOARD_CACHE_TIMEOUT', 300)
+
+
+def _cache_key(teacher_id, date):
+    return f'{CACHE_PREFIX}:{teacher_id}:{date.isoformat()}'
+
+
+def _get_user_classes(legacy_classes, sections):
+    user_classes = []
+    for lc in legacy_classes:
+        user_classes.append({
+            'id': lc.id,
+            'name': lc.name,
+            'section': lc.section,
+            'student_count': lc.student_count,
+            'type': 'legacy'
+        })
+    for section in sections:
+        user_classes.append({
+            'id': section.id,
+            'name': section.class_obj.name,
+            'section': section.name,
+            'student_count': section.student_count,
+            'type': 'academic'
+        })
+    return user_classes
+
+
+def build_teacher_dashboard(tenant, teacher, date):
+    """
+    Compute the teacher dashboard context for a day.
+    """
+    legacy_classes = list(
+        Class.objects.for_tenant(tenant).filter(
+            class_teacher=teacher,
+            is_active=True
+        ).annotate(
+            student_count=Count('students', filter=Q(students__is_active=True))
+        )
+    )
+    try:
+        from modules.academic.models import Section
+        sections = list(
+            Section.objects.for_tenant(tenant).filter(
+                class_teacher=teacher
+            ).select_related('class_obj').annotate(
+                student_count=Count('enrollments', filter=Q(enrollments__is_active=True))
+            )
+        )
+    except ImportError:
+        sections = []
+
+    dashboard = {
+        'total_students': 0,
+        'present_count': 0,
+        'absent_count': 0,
+        'late_count': 0,
+        'attendance_percentage': 0,
+        'absent_students': [],
+        'user_classes': _get_user_classes(legacy_classes, sections),
+        'recent_history': get_recent_history(tenant, teacher),
+    }
+    if not legacy_classes and not sections:
+        return dashboard
+
+    # Users taught by this teacher: legacy class students and section enrollments
+    roster = Q(
+        student_profile__class_assigned__in=[lc.pk for lc in legacy_classes],
+        student_profile__is_active=True,
+    )
+    if sections:
+        roster |= Q(
+            academic_enrollments__section__in=[section.pk for section in sections],
+            academic_enrollments__is_active=True,
+        )
+    user_ids = CustomUser.objects.filter(roster).values('pk')
+
+    total_students = CustomUser.objects.filter(pk__in=user_ids).count()
+    counts = Attendance.objects.for_tenant(tenant).filter(
+        date=date,
+        student__user__in=user_ids,
+    ).aggregate(
+        present_count=Count('id', filter=Q(status='present')),
+        absent_count=Count('id', filter=Q(status='absent')),
+        late_count=Count('id', filter=Q(status='late')),
+    )
+
+    if is_sparse(tenant):
+        implied = count_implied_present(
+            tenant, date, date, list(Student.objects.filter(user__in=user_ids).values_list('pk', flat=True))
+        )
+        counts['present_count'] += sum(implied.values())
+
+    dashboard.update(counts)
+    dashboard['total_students'] = total_students
+    if total_students > 0:
+        dashboard['attendance_percentage'] = round((counts['present_count'] / total_students * 100), 2)
+    dashboard['absent_students'] = list(
+        Student.objects.filter(
+            user__in=user_ids,
+            attendance_records__date=date,
+            attendance_records__status='absent'
+        ).select_related('user', 'class_assigned')[:10]
+    )
+    return dashboard
+
+
+def get_teacher_dashboard(tenant, teacher, date):
+    """Return the cached teacher dashboard context for a day, building it if needed."""
+    key = _cache_key(teacher.pk, date)
+    dashboard = cache.get(key)
+    if dashboard is None:
+        dashboard = build_teacher_dashboard(tenant, teacher, date)
+        cache.set(key, dashboard, CACHE_TIMEOUT)
+    return dashboard
+
+
+def invalidate_teacher_dashboards(teacher_ids, date=None):
+    """
+    Drop cached dashboards for the given teachers once the current
+    transaction commits: the one for `date` and today's, whose recent
+    history lists every submission.
+    """
+    teacher_ids = {teacher_id for teacher_id in teacher_ids if teacher_id is not None}
+    if not teacher_ids:
+        return
+    dates = {timezone.now().date(), date or timezone.now().date()}
+    keys = [_cache_key(teacher_id, day) for teacher_id in teacher_ids for day in dates]
+    transaction.on_commit(lambda: cache.delete_many(keys))
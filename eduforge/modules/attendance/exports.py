@@ -0,0 +1,260 @@
+"""
+Streaming tenant-wide attendance exports.
+
+Rows are read with queryset.iterator() and written straight into a
+StreamingHttpResponse, so memory stays constant however many records a
+tenant, session or date range contains. When the range holds archived
+days, or the tenant uses exceptions-only storage, those days and implied
+presence are merged in one month of records at a time.
+"""
+import csv
+import json
+from datetime import timedelta
+
+from django.db.models import Count, F, Q
+from django.db.models.functions import Coalesce
+
+from .archive import STATUS_CODES, count_statuses, day_mask, decode_month, month_start, next_month
+from .models import Attendance, AttendanceArchiveMonth, Student
+from .sparse import count_implied_present, get_implied_present, is_sparse
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+COUNTED_STATUSES = (*STATUS_CODES, 'total')
+
+RECORD_FIELDS = (
+    'date', 'roll_number', 'admission_number', 'first_name', 'last_name',
+    'class_name', 'section', 'status', 'notes',
+)
+
+SUMMARY_FIELDS = (
+    'roll_number', 'admission_number', 'first_name', 'last_name',
+    'class_name', 'section', 'total_days', 'present_days', 'absent_days',
+    'late_days', 'excused_days', 'percentage',
+)
+
+
+class Echo:
+    """File-like object whose write() returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def get_export_queryset(tenant, start_date, end_date, section=None):
+    """
+    Attendance records for a tenant and date range, optionally one section.
+    """
+    records = Attendance.objects.for_tenant(tenant).filter(
+        date__gte=start_date,
+        date__lte=end_date,
+    )
+    if section is not None:
+        records = records.filter(
+            student__user__academic_enrollments__section=section,
+            student__user__academic_enrollments__is_active=True,
+        )
+    # Academic section when the student has one, legacy class otherwise
+    return records.annotate(
+        class_name=Coalesce(
+            F('student__enrollment__section__class_obj__name'),
+            F('student__class_assigned__name'),
+        ),
+        section_name=Coalesce(
+            F('student__enrollment__section__name'),
+            F('student__class_assigned__section'),
+        ),
+    )
+
+
+def _record_rows(tenant, start_date, end_date, section=None):
+    return get_export_queryset(tenant, start_date, end_date, section).order_by(
+        'date', 'student__roll_number'
+    ).values_list(
+        'date',
+        'student__roll_number',
+        'student__admission_number',
+        'student__user__first_name',
+        'student__user__last_name',
+        'class_name',
+        'section_name',
+        'status',
+        'notes',
+    )
+
+
+def _summary_rows(tenant, start_date, end_date, section=None):
+    return get_export_queryset(tenant, start_date, end_date, section).values(
+        'student',
+        'student__roll_number',
+        'student__admission_number',
+        'student__user__first_name',
+        'student__user__last_name',
+        'class_name',
+        'section_name',
+    ).annotate(
+        total_days=Count('id'),
+        present_days=Count('id', filter=Q(status='present')),
+        absent_days=Count('id', filter=Q(status='absent')),
+        late_days=Count('id', filter=Q(status='late')),
+        excused_days=Count('id', filter=Q(status='excused')),
+    ).order_by('student__roll_number', 'student_id')
+
+
+def _student_details(tenant, section=None):
+    """
+    {student_id: (roll_number, admission_number, first_name, last_name,
+    class_name, section)} for students who may have archived days or
+    implied presence.
+    """
+    students = Student.objects.for_tenant(tenant)
+    if section is not None:
+        students = students.filter(
+            user__academic_enrollments__section=section,
+            user__academic_enrollments__is_active=True,
+        )
+    students = students.annotate(
+        class_name=Coalesce(F('enrollment__section__class_obj__name'), F('class_assigned__name')),
+        section_name=Coalesce(F('enrollment__section__name'), F('class_assigned__section')),
+    ).values_list(
+        'pk', 'roll_number', 'admission_number', 'user__first_name', 'user__last_name',
+        'class_name', 'section_name',
+    )
+    return {row[0]: row[1:] for row in students.iterator(chunk_size=EXPORT_CHUNK_SIZE)}
+
+
+def _archives(tenant, start_date, end_date):
+    return AttendanceArchiveMonth.objects.for_tenant(tenant).filter(
+        month__gte=month_start(start_date),
+        month__lte=end_date,
+    )
+
+
+def _needs_merge(tenant, start_date, end_date):
+    """Whether live rows alone miss records: archived days or implied presence."""
+    return is_sparse(tenant) or _archives(tenant, start_date, end_date).exists()
+
+
+def _iter_merged_record_rows(tenant, start_date, end_date, section=None):
+    """
+    Live, archived and implied records, one month at a time, in (date, roll
+    number) order.
+    """
+    details = _student_details(tenant, section)
+    sparse = is_sparse(tenant)
+    month = month_start(start_date)
+    while month <= end_date:
+        chunk_start = max(start_date, month)
+        chunk_end = min(end_date, next_month(month) - timedelta(days=1))
+        rows = list(_record_rows(tenant, chunk_start, chunk_end, section))
+        for archive in _archives(tenant, chunk_start, chunk_end).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            if archive.student_id in details:
+                rows.extend(
+                    (day, *details[archive.student_id], status, notes)
+                    for day, status, notes, _ in decode_month(archive, chunk_start, chunk_end)
+                )
+        if sparse:
+            implied = get_implied_present(tenant, chunk_start, chunk_end, list(details))
+            rows.extend(
+                (day, *details[student_id], 'present', '')
+                for student_id, days in implied.items()
+                for day in days
+            )
+        rows.sort(key=lambda row: (row[0], row[1]))
+        yield from rows
+        month = next_month(month)
+
+
+def iter_records(tenant, start_date, end_date, section=None):
+    """
+    Yield one dict per daily attendance record, including archived days and,
+    for exceptions-only tenants, implied presence.
+    """
+    if _needs_merge(tenant, start_date, end_date):
+        rows = _iter_merged_record_rows(tenant, start_date, end_date, section)
+    else:
+        rows = _record_rows(tenant, start_date, end_date, section).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    for row in rows:
+        yield dict(zip(RECORD_FIELDS, row))
+
+
+def _merged_summary_rows(tenant, start_date, end_date, section=None):
+    """Summary rows with archived days and implied presence added."""
+    details = _student_details(tenant, section)
+    extra = {}
+    for archive in _archives(tenant, start_date, end_date).values_list(
+        'student_id', 'month', 'recorded_days', 'status_bits'
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        student_id, month, recorded_days, status_bits = archive
+        if student_id not in details:
+            continue
+        counts = extra.setdefault(student_id, {status: 0 for status in COUNTED_STATUSES})
+        for status, value in count_statuses(recorded_days, status_bits, day_mask(month, start_date, end_date)).items():
+            counts[status] += value
+    if is_sparse(tenant):
+        for student_id, days in count_implied_present(tenant, start_date, end_date, list(details)).items():
+            counts = extra.setdefault(student_id, {status: 0 for status in COUNTED_STATUSES})
+            counts['present'] += days
+            counts['total'] += days
+
+    stored = {row['student']: row for row in _summary_rows(tenant, start_date, end_date, section)}
+    for student_id in set(extra) - set(stored):
+        roll_number, admission_number, first_name, last_name, class_name, section_name = details[student_id]
+        stored[student_id] = {
+            'student': student_id,
+            'student__roll_number': roll_number,
+            'student__admission_number': admission_number,
+            'student__user__first_name': first_name,
+            'student__user__last_name': last_name,
+            'class_name': class_name,
+            'section_name': section_name,
+            'total_days': 0,
+            'present_days': 0,
+            'absent_days': 0,
+            'late_days': 0,
+            'excused_days': 0,
+        }
+    for student_id, counts in extra.items():
+        for status, value in counts.items():
+            stored[student_id][f'{status}_days'] += value
+    return sorted(stored.values(), key=lambda row: (row['student__roll_number'], str(row['student'])))
+
+
+def iter_summaries(tenant, start_date, end_date, section=None):
+    """Yield one dict of aggregated counts per student."""
+    if _needs_merge(tenant, start_date, end_date):
+        rows = _merged_summary_rows(tenant, start_date, end_date, section)
+    else:
+        rows = _summary_rows(tenant, start_date, end_date, section).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    for row in rows:
+        total_days = row['total_days']
+        yield {
+            'roll_number': row['student__roll_number'],
+            'admission_number': row['student__admission_number'],
+            'first_name': row['student__user__first_name'],
+            'last_name': row['student__user__last_name'],
+            'class_name': row['class_name'],
+            'section': row['section_name'],
+            'total_days': total_days,
+            'present_days': row['present_days'],
+            'absent_days': row['absent_days'],
+            'late_days': row['late_days'],
+            'excused_days': row['excused_days'],
+            'percentage': round((row['present_days'] / total_days * 100), 2) if total_days > 0 else 0,
+        }
+
+
+def stream_csv(rows, fields):
+    """Yield CSV lines for an iterable of dicts."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([row[field] for field in fields])
+
+
+def stream_jsonl(rows):
+    """Yield JSON Lines for an iterable of dicts."""
+    for row in rows:
+        yield json.dumps(row, default=str) + '\n'
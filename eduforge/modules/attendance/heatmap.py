@@ -0,0 +1,123 @@
+"""
+Monthly attendance heatmap.
+
+A sections x days matrix of present percentages for one tenant and month,
+read from the daily rollups with a single query, so the cost does not grow
+with the number of students. The result is plain JSON-ready data, cached
+per (tenant, month); the batch writer drops the month it writes to and
+rebuild_rollups drops the months it rebuilds.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .archive import month_start, next_month
+from .models import AttendanceDailyRollup, Class
+
+
+CACHE_PREFIX = 'attendance:heatmap'
+CACHE_TIMEOUT = getattr(settings, 'ATTENDANCE_HEATMAP_CACHE_TIMEOUT', 600)
+
+
+def _cache_key(tenant_id, month):
+    return f'{CACHE_PREFIX}:{tenant_id}:{month:%Y-%m}'
+
+
+def _percentage(present, total):
+    return round(present / total * 100, 1) if total else None
+
+
+def _row_names(section_ids, class_ids):
+    """Display names keyed by ('section', id) and ('class', id)."""
+    names = {}
+    if section_ids:
+        from modules.academic.models import Section
+
+        for section in Section.objects.filter(pk__in=section_ids).select_related('class_obj'):
+            names[('section', section.pk)] = section.full_name
+    for class_obj in Class.objects.filter(pk__in=class_ids):
+        name = f'{class_obj.name} - {class_obj.section}' if class_obj.section else class_obj.name
+        names[('class', class_obj.pk)] = name
+    return names
+
+
+def build_heatmap(tenant, month):
+    """
+    Return the heatmap for the month containing ``month``: the days, one row
+    per section or legacy class with attendance that month, and a daily
+    school-wide row. Cells are present percentages, or None for no data.
+    """
+    month = month_start(month)
+    days = []
+    day = month
+    while day < next_month(month):
+        days.append(day)
+        day += timedelta(days=1)
+
+    rollups = AttendanceDailyRollup.objects.for_tenant(tenant).filter(
+        date__gte=month,
+        date__lt=next_month(month),
+        total_count__gt=0,
+    ).values_list('section_id', 'legacy_class_id', 'date', 'present_count', 'total_count')
+
+    groups = {}
+    daily = [[0, 0] for _ in days]
+    for section_id, class_id, date, present, total in rollups:
+        key = ('section', section_id) if section_id is not None else ('class', class_id)
+        cells = groups.setdefault(key, [[0, 0] for _ in days])
+        cells[date.day - 1][0] += present
+        cells[date.day - 1][1] += total
+        daily[date.day - 1][0] += present
+        daily[date.day - 1][1] += total
+
+    names = _row_names(
+        [group_id for kind, group_id in groups if kind == 'section'],
+        [group_id for kind, group_id in groups if kind == 'class'],
+    )
+
+    rows = []
+    for (kind, group_id), cells in groups.items():
+        present = sum(cell[0] for cell in cells)
+        total = sum(cell[1] for cell in cells)
+        rows.append({
+            'type': kind,
+            'id': str(group_id) if kind == 'class' else group_id,
+            'name': names.get((kind, group_id), 'Unknown'),
+            'cells': [_percentage(*cell) for cell in cells],
+            'average': _percentage(present, total),
+        })
+    rows.sort(key=lambda row: row['name'])
+
+    return {
+        'month': month.strftime('%Y-%m'),
+        'days': [day.isoformat() for day in days],
+        'rows': rows,
+        'daily': [_percentage(*cell) for cell in daily],
+    }
+
+
+def get_heatmap(tenant, month):
+    """
+    Return the cached heatmap for a tenant and month, building it on a miss.
+    """
+    key = _cache_key(tenant.id, month_start(month))
+    heatmap = cache.get(key)
+    if heatmap is None:
+        heatmap = build_heatmap(tenant, month)
+        cache.set(key, heatmap, CACHE_TIMEOUT)
+    return heatmap
+
+
+def invalidate_heatmaps(tenant_id, start_date, end_date=None):
+    """
+    Drop cached heatmaps of the months in start_date..end_date once the
+    current transaction commits.
+    """
+    keys = []
+    month = month_start(start_date)
+    while month <= (end_date or start_date):
+        keys.append(_cache_key(tenant_id, month))
+        month = next_month(month)
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,341 @@
+"""
+Bulk attendance import.
+
+Streams attendance from a CSV or JSON Lines file into the Attendance table
+for one tenant. Students are resolved through a lookup map built with one
+query per import, rows are validated in Python and written in large
+batches, each in its own transaction, either with bulk_create or with
+PostgreSQL COPY into a temporary table followed by one INSERT ... ON
+CONFLICT. Without --update, rows for days a student already has are
+kept as they are and counted as skipped. Rejected rows go to a side file
+with the reason. A checkpoint
+is saved after every batch so an interrupted import can resume where it
+stopped.
+
+Each row needs ``date`` and ``status`` plus the column the students are
+matched on (``admission_number`` or ``roll_number``); ``notes`` is
+optional.
+"""
+import csv
+import io
+import json
+import os
+import uuid
+from datetime import datetime
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .archive import month_start
+from .counters import rebuild_counters
+from .models import Attendance, AttendanceArchiveMonth, Student
+from .reports import get_roster
+from .rollups import rebuild_rollups
+
+
+MATCH_FIELDS = ('admission_number', 'roll_number')
+FORMATS = ('csv', 'jsonl')
+
+STATUS_ALIASES = {
+    'present': 'present', 'p': 'present',
+    'absent': 'absent', 'a': 'absent',
+    'late': 'late', 'l': 'late',
+    'excused': 'excused', 'e': 'excused',
+}
+
+REJECT_FIELDS = ('line', 'reason', 'record')
+
+
+class RowError(Exception):
+    """A row that cannot be imported."""
+
+
+class ImportResult:
+    """Running totals of an import."""
+
+    def __init__(self, read=0, imported=0, skipped=0, rejected=0, first_date=None, last_date=None):
+        self.read = read
+        self.imported = imported
+        self.skipped = skipped
+        self.rejected = rejected
+        self.first_date = first_date
+        self.last_date = last_date
+
+    def add_dates(self, first_date, last_date):
+        if first_date is None:
+            return
+        self.first_date = min(self.first_date or first_date, first_date)
+        self.last_date = max(self.last_date or last_date, last_date)
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    return 'csv'
+
+
+def read_rows(path, file_format):
+    """Yield (line_number, row dict) from a CSV or JSON Lines file."""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        if file_format == 'jsonl':
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = {'_raw': line.rstrip('\n')}
+                yield line_number, row if isinstance(row, dict) else {'_raw': line.rstrip('\n')}
+        else:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+
+
+def build_student_lookup(tenant, match, class_obj=None, section=None):
+    """
+    Return ({match value: student id}, ambiguous values) for a tenant's
+    students, read with one query. Roll numbers repeat across classes, so
+    a value shared by several students is ambiguous unless the lookup is
+    scoped to one class or section.
+    """
+    students = get_roster(tenant, class_obj=class_obj, section=section) if (class_obj or section) else (
+        Student.objects.for_tenant(tenant)
+    )
+    lookup = {}
+    ambiguous = set()
+    for value, student_id in students.values_list(match, 'pk').iterator():
+        value = value.strip()
+        if value in lookup and lookup[value] != student_id:
+            ambiguous.add(value)
+        lookup[value] = student_id
+    return lookup, ambiguous
+
+
+def build_archived_days(tenant):
+    """Return {(student id, month): recorded day bitmask} of archived days."""
+    return {
+        (student_id, month): recorded_days
+        for student_id, month, recorded_days in AttendanceArchiveMonth.objects.for_tenant(tenant).values_list(
+            'student_id', 'month', 'recorded_days'
+        ).iterator()
+    }
+
+
+def parse_row(row, match, lookup, ambiguous, archived_days, date_format):
+    """Validate a row and return (student id, date, status, notes)."""
+    if '_raw' in row:
+        raise RowError('unparseable line')
+
+    value = (row.get(match) or '').strip()
+    if not value:
+        raise RowError(f'missing {match}')
+    if value in ambiguous:
+        raise RowError(f'ambiguous {match} "{value}"')
+    student_id = lookup.get(value)
+    if student_id is None:
+        raise RowError(f'unknown {match} "{value}"')
+
+    raw_date = (row.get('date') or '').strip()
+    try:
+        date = datetime.strptime(raw_date, date_format).date()
+    except ValueError:
+        raise RowError(f'invalid date "{raw_date}"')
+
+    status = STATUS_ALIASES.get((row.get('status') or '').strip().lower())
+    if status is None:
+        raise RowError(f'invalid status "{row.get("status")}"')
+
+    if archived_days.get((student_id, month_start(date)), 0) & (1 << (date.day - 1)):
+        raise RowError('day is archived; restore it first')
+
+    return student_id, date, status, (row.get('notes') or '').strip()
+
+
+def _write_bulk_create(tenant, records, update):
+    """Insert (or, with ``update``, upsert) records. Returns the number written."""
+    if not update:
+        # Leave out days that already have a row; conflicts are only left
+        # to concurrent writers
+        existing = set(Attendance.objects.filter(
+            student_id__in={record[0] for record in records},
+            date__gte=min(record[1] for record in records),
+            date__lte=max(record[1] for record in records),
+        ).values_list('student_id', 'date'))
+        records = [record for record in records if (record[0], record[1]) not in existing]
+
+    objects = [
+        Attendance(tenant=tenant, student_id=student_id, date=date, status=status, notes=notes)
+        for student_id, date, status, notes in records
+    ]
+    if update:
+        Attendance.objects.bulk_create(
+            objects,
+            update_conflicts=True,
+            unique_fields=['student', 'date'],
+            update_fields=['status', 'notes', 'updated_at'],
+        )
+    else:
+        Attendance.objects.bulk_create(objects, ignore_conflicts=True)
+    return len(objects)
+
+
+def _copy_text(tenant, records, now):
+    """Tab-separated COPY input for records."""
+    def escape(value):
+        return value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+    buffer = io.StringIO()
+    for student_id, date, status, notes in records:
+        buffer.write(
+            f'{uuid.uuid4()}\t{tenant.pk}\t{student_id}\t{date.isoformat()}\t{status}\t'
+            f'{escape(notes)}\t{now}\t{now}\n'
+        )
+    buffer.seek(0)
+    return buffer
+
+
+def _write_copy(tenant, records, update):
+    """
+    COPY into a temporary table, then one INSERT ... ON CONFLICT. Returns
+    the number of rows the INSERT wrote.
+    """
+    table = connection.ops.quote_name(Attendance._meta.db_table)
+    columns = 'id, tenant_id, student_id, date, status, notes, created_at, updated_at'
+    conflict = (
+        'DO UPDATE SET status = EXCLUDED.status, notes = EXCLUDED.notes, updated_at = EXCLUDED.updated_at'
+        if update else 'DO NOTHING'
+    )
+    data = _copy_text(tenant, records, timezone.now().isoformat())
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TEMPORARY TABLE attendance_import (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP'
+        )
+        copy_sql = f'COPY attendance_import ({columns}) FROM STDIN'
+        raw_cursor = cursor.cursor
+        if hasattr(raw_cursor, 'copy_expert'):
+            # psycopg2
+            raw_cursor.copy_expert(copy_sql, data)
+        else:
+            # psycopg 3
+            with raw_cursor.copy(copy_sql) as copy:
+                copy.write(data.getvalue())
+        cursor.execute(
+            f'INSERT INTO {table} ({columns}) '
+            f'SELECT {columns} FROM attendance_import '
+            f'ON CONFLICT (student_id, date) {conflict}'
+        )
+        return cursor.rowcount
+
+
+def load_checkpoint(path):
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, source, line_number, result):
+    """Atomically record how far the import has committed."""
+    state = {
+        'source': os.path.abspath(source),
+        'size': os.path.getsize(source),
+        'line': line_number,
+        'read': result.read,
+        'imported': result.imported,
+        'skipped': result.skipped,
+        'rejected': result.rejected,
+        'first_date': result.first_date.isoformat() if result.first_date else None,
+        'last_date': result.last_date.isoformat() if result.last_date else None,
+    }
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(temp_path, path)
+
+
+def import_file(tenant, path, file_format=None, match='admission_number', class_obj=None, section=None,
+                date_format='%Y-%m-%d', batch_size=5000, update=False, use_copy=False,
+                rejects=None, checkpoint_path=None, on_batch=None):
+    """
+    Import attendance rows from ``path`` for a tenant.
+
+    ``rejects`` is an optional csv.writer for rejected rows. When
+    ``checkpoint_path`` exists and names the same file, lines up to its
+    saved position are skipped. ``on_batch`` is called with the running
+    ImportResult after every committed batch. Returns the ImportResult.
+    """
+    file_format = file_format or detect_format(path)
+    if use_copy and connection.vendor != 'postgresql':
+        use_copy = False
+    write_batch = _write_copy if use_copy else _write_bulk_create
+
+    lookup, ambiguous = build_student_lookup(tenant, match, class_obj=class_obj, section=section)
+    archived_days = build_archived_days(tenant)
+
+    result = ImportResult()
+    resume_line = 0
+    checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint and checkpoint['source'] == os.path.abspath(path) and checkpoint['size'] == os.path.getsize(path):
+        resume_line = checkpoint['line']
+        result.read = checkpoint['read']
+        result.imported = checkpoint['imported']
+        result.skipped = checkpoint.get('skipped', 0)
+        result.rejected = checkpoint['rejected']
+        if checkpoint['first_date']:
+            result.add_dates(
+                datetime.strptime(checkpoint['first_date'], '%Y-%m-%d').date(),
+                datetime.strptime(checkpoint['last_date'], '%Y-%m-%d').date(),
+            )
+
+    def flush(batch, line_number):
+        # Last row per (student, date) wins within a batch
+        records = list({(record[0], record[1]): record for record in batch}.values())
+        with transaction.atomic():
+            written = write_batch(tenant, records, update)
+        result.imported += written
+        result.skipped += len(records) - written
+        result.add_dates(min(record[1] for record in records), max(record[1] for record in records))
+        if checkpoint_path:
+            save_checkpoint(checkpoint_path, path, line_number, result)
+        if on_batch:
+            on_batch(result)
+
+    batch = []
+    line_number = resume_line
+    for line_number, row in read_rows(path, file_format):
+        if line_number <= resume_line:
+            continue
+        result.read += 1
+        try:
+            batch.append(parse_row(row, match, lookup, ambiguous, archived_days, date_format))
+        except RowError as e:
+            result.rejected += 1
+            if rejects is not None:
+                rejects.writerow([line_number, str(e), json.dumps(row, default=str)])
+            continue
+        if len(batch) >= batch_size:
+            flush(batch, line_number)
+            batch = []
+
+    if batch:
+        flush(batch, line_number)
+    elif checkpoint_path:
+        save_checkpoint(checkpoint_path, path, line_number, result)
+    return result
+
+
+def rebuild_derived(tenant, start_date, end_date):
+    """
+    Rebuild counters for students with attendance in the imported range and
+    rollups for the range. Returns (counter rows, rollup rows) written.
+    """
+    student_ids = list(
+        Attendance.objects.for_tenant(tenant).filter(date__gte=start_date, date__lte=end_date)
+        .values_list('student_id', flat=True).distinct()
+    )
+    counters = rebuild_counters(tenant, student_ids=student_ids)
+    rollups = rebuild_rollups(tenant, start_date, end_date)
+    return counters, rollups
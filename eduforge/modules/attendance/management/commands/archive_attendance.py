@@ -0,0 +1,63 @@
+"""
+Management command to compact attendance into the monthly archive, or restore it.
+Usage: python manage.py archive_attendance --session <id> [--restore] [--force]
+       python manage.py archive_attendance --tenant <subdomain> --start YYYY-MM-DD --end YYYY-MM-DD [--restore]
+"""
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from core.tenants.models import Tenant
+from modules.attendance.archive import compact_attendance, restore_attendance
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Invalid date "{value}", expected YYYY-MM-DD')
+
+
+class Command(BaseCommand):
+    help = 'Compact Attendance rows of a closed session into monthly bitmaps, or restore them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--session', type=int, help='Academic session id; its tenant and dates are used')
+        parser.add_argument('--tenant', help='Tenant subdomain, with --start and --end')
+        parser.add_argument('--start', type=parse_date, help='First date (YYYY-MM-DD)')
+        parser.add_argument('--end', type=parse_date, help='Last date (YYYY-MM-DD)')
+        parser.add_argument('--restore', action='store_true', help='Restore archived days to Attendance rows')
+        parser.add_argument('--force', action='store_true', help='Allow compacting the active session')
+        parser.add_argument('--batch-size', type=int, default=500, help='Students per batch (default: 500)')
+
+    def handle(self, *args, **options):
+        if options['session']:
+            try:
+                from modules.academic.models import AcademicSession
+            except ImportError:
+                raise CommandError('The academic module is not available; use --tenant, --start and --end')
+            session = AcademicSession.objects.select_related('tenant').filter(pk=options['session']).first()
+            if not session:
+                raise CommandError(f'Academic session {options["session"]} not found')
+            if session.is_active and not options['restore'] and not options['force']:
+                raise CommandError(f'Session "{session.name}" is still active. Use --force to compact it anyway.')
+            tenant, start_date, end_date = session.tenant, session.start_date, session.end_date
+        else:
+            if not (options['tenant'] and options['start'] and options['end']):
+                raise CommandError('Pass --session, or --tenant with --start and --end')
+            tenant = Tenant.objects.filter(subdomain=options['tenant']).first()
+            if not tenant:
+                raise CommandError(f'Tenant "{options["tenant"]}" not found')
+            start_date, end_date = options['start'], options['end']
+
+        if options['restore']:
+            restored = restore_attendance(tenant, start_date, end_date, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ Restored {restored} attendance record(s) for {tenant.subdomain} ({start_date} to {end_date}).'
+            ))
+            return
+
+        archived, written = compact_attendance(tenant, start_date, end_date, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Archived {archived} attendance record(s) into {written} student-month row(s) '
+            f'for {tenant.subdomain} ({start_date} to {end_date}).'
+        ))
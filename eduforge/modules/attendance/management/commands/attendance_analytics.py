@@ -0,0 +1,92 @@
+"""
+Management command to print attendance analytics for a tenant or section.
+Usage: python manage.py attendance_analytics --tenant <subdomain> [--start YYYY-MM-DD] [--end YYYY-MM-DD]
+           [--section <id>] [--threshold <percent>] [--json]
+"""
+import json
+from datetime import datetime
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.tenants.models import Tenant
+from modules.attendance.analytics import DEFAULT_CHRONIC_THRESHOLD, build_analytics
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Invalid date "{value}", expected YYYY-MM-DD')
+
+
+class Command(BaseCommand):
+    help = 'Compute absence streaks, chronic absenteeism, weekday patterns, late trends and section comparisons'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', required=True, help='Tenant subdomain')
+        parser.add_argument('--start', type=parse_date, help='First date (YYYY-MM-DD). Defaults to the start of the month.')
+        parser.add_argument('--end', type=parse_date, help='Last date (YYYY-MM-DD). Defaults to today.')
+        parser.add_argument('--section', type=int, help='Academic section id. Defaults to the whole school.')
+        parser.add_argument('--threshold', type=float, default=DEFAULT_CHRONIC_THRESHOLD * 100,
+                            help='Missed-days percentage that counts as chronic absenteeism (default: 10)')
+        parser.add_argument('--json', action='store_true', help='Print the full result as JSON')
+
+    def handle(self, *args, **options):
+        tenant = Tenant.objects.filter(subdomain=options['tenant']).first()
+        if not tenant:
+            raise CommandError(f'Tenant "{options["tenant"]}" not found')
+
+        end_date = options['end'] or timezone.now().date()
+        start_date = options['start'] or end_date.replace(day=1)
+
+        section = None
+        if options['section']:
+            try:
+                from modules.academic.models import Section
+            except ImportError:
+                raise CommandError('The academic module is not available')
+            section = Section.objects.for_tenant(tenant).filter(pk=options['section']).first()
+            if not section:
+                raise CommandError(f'Section {options["section"]} not found')
+
+        try:
+            analytics = build_analytics(
+                tenant, start_date, end_date, section=section,
+                chronic_threshold=options['threshold'] / 100,
+            )
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
+
+        if options['json']:
+            self.stdout.write(json.dumps(analytics, default=str, indent=2))
+            return
+
+        summary = analytics['summary']
+        self.stdout.write(
+            f"{summary['students']} students, {summary['school_days']} school days: "
+            f"{summary['attendance_rate']}% present, {summary['absence_rate']}% absent, "
+            f"{summary['late_rate']}% late"
+        )
+
+        self.stdout.write('\nSections:')
+        for group in analytics['groups']:
+            self.stdout.write(
+                f"  {group['name']}: {group['attendance_rate']}% present, "
+                f"{group['late_rate']}% late, {group['chronic_count']} chronic"
+            )
+
+        self.stdout.write('\nWeekdays:')
+        for weekday in analytics['weekdays']:
+            self.stdout.write(f"  {weekday['weekday']}: {weekday['absence_rate']}% absent, {weekday['late_rate']}% late")
+
+        chronic = [student for student in analytics['students'] if student['is_chronic']]
+        self.stdout.write(f"\nChronically absent ({summary['chronic_threshold']}%+ missed):")
+        for student in sorted(chronic, key=lambda student: -student['missed_rate']):
+            self.stdout.write(
+                f"  {student['roll_number']} {student['name']} ({student['group']}): "
+                f"{student['missed_rate']}% missed, longest streak {student['longest_absence_streak']}"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Analyzed {summary["recorded"]} attendance record(s).'))
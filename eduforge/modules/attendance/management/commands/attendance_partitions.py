@@ -0,0 +1,74 @@
+"""
+Management command to maintain date partitions of the attendance table.
+Usage: python manage.py attendance_partitions [--convert] [--ahead N]
+           [--detach-before YYYY-MM-DD [--archive-schema <schema> | --drop]]
+"""
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from modules.attendance import partitions
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Invalid date "{value}", expected YYYY-MM-DD')
+
+
+class Command(BaseCommand):
+    help = 'Create future attendance partitions and detach, archive or drop old ones (PostgreSQL only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--convert', action='store_true', help='Convert the attendance table to a partitioned table first')
+        parser.add_argument('--interval', choices=partitions.INTERVALS, help='Partition width. Defaults to ATTENDANCE_PARTITION_INTERVAL.')
+        parser.add_argument('--ahead', type=int, default=3, help='Number of future partitions to pre-create (default: 3)')
+        parser.add_argument('--detach-before', type=parse_date, help='Detach partitions ending on or before this date')
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument('--archive-schema', help='Move detached partitions into this schema')
+        group.add_argument('--drop', action='store_true', help='Drop detached partitions')
+
+    def handle(self, *args, **options):
+        if not partitions.is_supported():
+            self.stdout.write(self.style.WARNING('Attendance partitioning requires PostgreSQL; nothing to do.'))
+            return
+
+        interval = options['interval'] or partitions.get_interval()
+
+        with transaction.atomic():
+            if options['convert']:
+                if partitions.convert_to_partitioned(interval):
+                    self.stdout.write(self.style.SUCCESS('✓ Converted the attendance table to date partitions.'))
+
+            if not partitions.is_partitioned():
+                raise CommandError('The attendance table is not partitioned. Run with --convert first.')
+
+            today = timezone.now().date()
+            last_day = partitions.period_start(today, interval)
+            for _ in range(options['ahead']):
+                last_day = partitions.next_period(last_day, interval)
+            created = partitions.create_partitions(today, last_day, interval)
+            for name in created:
+                self.stdout.write(self.style.SUCCESS(f'✓ Created partition {name}'))
+
+            if options['detach_before']:
+                detached = partitions.detach_partitions(options['detach_before'])
+                for name in detached:
+                    self.stdout.write(self.style.SUCCESS(f'✓ Detached partition {name}'))
+                if options['archive_schema']:
+                    partitions.archive_tables(detached, options['archive_schema'])
+                    self.stdout.write(self.style.SUCCESS(
+                        f'✓ Archived {len(detached)} partition(s) to schema "{options["archive_schema"]}"'
+                    ))
+                elif options['drop']:
+                    partitions.drop_tables(detached)
+                    self.stdout.write(self.style.SUCCESS(f'✓ Dropped {len(detached)} partition(s)'))
+
+        for name, start, end in partitions.list_partitions():
+            if start is None:
+                self.stdout.write(f'  {name}: DEFAULT')
+            else:
+                self.stdout.write(f'  {name}: {start} to {end}')
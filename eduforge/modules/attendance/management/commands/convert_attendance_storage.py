@@ -0,0 +1,44 @@
+"""
+Management command to switch a tenant between dense and exceptions-only attendance storage.
+Usage: python manage.py convert_attendance_storage --tenant <subdomain> --to sparse|dense [--batch-size N]
+"""
+from django.core.management.base import BaseCommand, CommandError
+from core.plugins.models import TenantModule
+from core.tenants.models import Tenant
+from modules.attendance.rollups import rebuild_rollups
+from modules.attendance.sparse import SPARSE, STORAGE_MODES, convert_to_dense, convert_to_sparse, get_storage_mode
+
+
+class Command(BaseCommand):
+    help = 'Convert a tenant to exceptions-only (sparse) or one-row-per-student (dense) attendance storage'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', required=True, help='Tenant subdomain')
+        parser.add_argument('--to', required=True, choices=STORAGE_MODES, help='Target storage mode')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Students or rows per batch (default: 1000)')
+
+    def handle(self, *args, **options):
+        tenant = Tenant.objects.filter(subdomain=options['tenant']).first()
+        if not tenant:
+            raise CommandError(f'Tenant "{options["tenant"]}" not found')
+        if not TenantModule.objects.filter(tenant=tenant, module__slug='attendance').exists():
+            raise CommandError(f'Attendance module is not installed for tenant "{tenant.subdomain}"')
+
+        mode = options['to']
+        if get_storage_mode(tenant) == mode:
+            self.stdout.write(f'Tenant "{tenant.subdomain}" already uses {mode} storage.')
+            return
+
+        if mode == SPARSE:
+            # Every day with rows needs its taken marker before presence can be implied
+            rebuilt = rebuild_rollups(tenant=tenant)
+            self.stdout.write(f'Rebuilt {rebuilt} daily attendance rollup(s).')
+            deleted = convert_to_sparse(tenant, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ Switched to sparse storage, removed {deleted} implied present record(s).'
+            ))
+        else:
+            created = convert_to_dense(tenant, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ Switched to dense storage, stored {created} present record(s).'
+            ))
@@ -0,0 +1,20 @@
+"""
+Management command to flush the write-behind attendance queue, e.g. on deploy.
+Usage: python manage.py drain_attendance_queue [--batch-size N]
+"""
+from django.core.management.base import BaseCommand, CommandError
+from modules.attendance.queue import QUEUE_BATCH_SIZE, drain_queue
+
+
+class Command(BaseCommand):
+    help = 'Write every queued attendance submission and report what is left'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=QUEUE_BATCH_SIZE, help=f'Submissions per batch (default: {QUEUE_BATCH_SIZE})')
+
+    def handle(self, *args, **options):
+        written, left = drain_queue(options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Wrote {written} queued attendance submission(s).'))
+        if left:
+            raise CommandError(f'{left} submission(s) are still queued; see Queued Attendance Submissions in the admin.')
@@ -0,0 +1,123 @@
+"""
+Management command to import historical attendance from a CSV or JSON Lines file.
+Usage: python manage.py import_attendance <file> --tenant <subdomain> [--match admission_number|roll_number]
+           [--class <id> | --section <id>] [--format csv|jsonl] [--date-format <fmt>] [--batch-size N]
+           [--update] [--copy] [--rejects <file>] [--resume] [--skip-rebuild]
+"""
+import csv
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.tenants.models import Tenant
+from modules.attendance.importer import (
+    FORMATS, MATCH_FIELDS, REJECT_FIELDS, import_file, load_checkpoint, rebuild_derived,
+)
+from modules.attendance.models import Class
+
+
+class Command(BaseCommand):
+    help = 'Stream attendance rows from a CSV or JSONL file into a tenant, in batches, with rejects and checkpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='CSV or JSONL file with date, status and a student column')
+        parser.add_argument('--tenant', required=True, help='Tenant subdomain')
+        parser.add_argument('--match', choices=MATCH_FIELDS, default='admission_number',
+                            help='Student column to match on (default: admission_number)')
+        parser.add_argument('--class', dest='class_id', help='Legacy class id to scope roll numbers to')
+        parser.add_argument('--section', type=int, help='Academic section id to scope roll numbers to')
+        parser.add_argument('--format', choices=FORMATS, help='File format. Defaults to the file extension.')
+        parser.add_argument('--date-format', default='%Y-%m-%d', help='strptime format of the date column')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per transaction (default: 5000)')
+        parser.add_argument('--update', action='store_true',
+                            help='Overwrite existing records instead of keeping them')
+        parser.add_argument('--copy', action='store_true', help='Load batches with COPY (PostgreSQL only)')
+        parser.add_argument('--rejects', help='Rejected rows file (default: <file>.rejects.csv)')
+        parser.add_argument('--resume', action='store_true', help='Continue from the last checkpoint')
+        parser.add_argument('--skip-rebuild', action='store_true',
+                            help='Do not rebuild counters and rollups for the imported range')
+
+    def handle(self, *args, **options):
+        tenant = Tenant.objects.filter(subdomain=options['tenant']).first()
+        if not tenant:
+            raise CommandError(f'Tenant "{options["tenant"]}" not found')
+
+        class_obj = None
+        section = None
+        if options['class_id']:
+            class_obj = Class.objects.for_tenant(tenant).filter(pk=options['class_id']).first()
+            if not class_obj:
+                raise CommandError(f'Class {options["class_id"]} not found')
+        elif options['section']:
+            try:
+                from modules.academic.models import Section
+            except ImportError:
+                raise CommandError('The academic module is not available')
+            section = Section.objects.for_tenant(tenant).filter(pk=options['section']).first()
+            if not section:
+                raise CommandError(f'Section {options["section"]} not found')
+
+        if options['copy'] and connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING('COPY needs PostgreSQL; using bulk inserts instead.'))
+
+        path = options['file']
+        checkpoint_path = f'{path}.checkpoint'
+        rejects_path = options['rejects'] or f'{path}.rejects.csv'
+        checkpoint = None
+        if options['resume']:
+            checkpoint = load_checkpoint(checkpoint_path)
+            if not checkpoint:
+                self.stdout.write(self.style.WARNING('No checkpoint found; starting from the beginning.'))
+        elif os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+        started = time.monotonic()
+
+        def report(result):
+            elapsed = time.monotonic() - started
+            self.stdout.write(f'  {result.read} read, {result.imported} imported, {result.skipped} skipped, '
+                              f'{result.rejected} rejected ({elapsed:.1f}s)')
+
+        try:
+            with open(rejects_path, 'a' if checkpoint else 'w', newline='') as f:
+                rejects = csv.writer(f)
+                if not checkpoint:
+                    rejects.writerow(REJECT_FIELDS)
+                result = import_file(
+                    tenant,
+                    path,
+                    file_format=options['format'],
+                    match=options['match'],
+                    class_obj=class_obj,
+                    section=section,
+                    date_format=options['date_format'],
+                    batch_size=options['batch_size'],
+                    update=options['update'],
+                    use_copy=options['copy'],
+                    rejects=rejects,
+                    checkpoint_path=checkpoint_path,
+                    on_batch=report,
+                )
+        except OSError as e:
+            raise CommandError(str(e))
+        os.remove(checkpoint_path)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Imported {result.imported} attendance record(s) for {tenant.subdomain} '
+            f'from {result.read} row(s) in {elapsed:.1f}s.'
+        ))
+        if result.skipped:
+            self.stdout.write(f'{result.skipped} row(s) skipped: the student already has attendance for the day '
+                              f'(use --update to overwrite).')
+        if result.rejected:
+            self.stdout.write(self.style.WARNING(f'{result.rejected} row(s) rejected; see {rejects_path}'))
+
+        if result.first_date and not options['skip_rebuild']:
+            counters, rollups = rebuild_derived(tenant, result.first_date, result.last_date)
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ Rebuilt {counters} counter row(s) and {rollups} rollup row(s) '
+                f'({result.first_date} to {result.last_date}).'
+            ))
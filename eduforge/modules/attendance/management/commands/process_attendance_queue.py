@@ -0,0 +1,29 @@
+"""
+Management command to run a write-behind attendance queue worker.
+Usage: python manage.py process_attendance_queue [--once] [--interval SECONDS] [--batch-size N]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from modules.attendance.queue import QUEUE_BATCH_SIZE, process_queue
+
+
+class Command(BaseCommand):
+    help = 'Write queued attendance submissions in coalesced batches. Run several for a worker pool.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Process one batch and exit')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds to sleep when the queue is empty (default: 1)')
+        parser.add_argument('--batch-size', type=int, default=QUEUE_BATCH_SIZE, help=f'Submissions per batch (default: {QUEUE_BATCH_SIZE})')
+
+    def handle(self, *args, **options):
+        while True:
+            claimed, written, failed = process_queue(options['batch_size'])
+            if claimed:
+                self.stdout.write(f'Wrote {written} and failed {failed} of {claimed} queued submission(s).')
+            if options['once']:
+                break
+            if not (written or failed):
+                time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS('✓ Attendance queue worker finished.'))
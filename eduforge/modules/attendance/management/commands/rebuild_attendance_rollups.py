@@ -0,0 +1,36 @@
+"""
+Management command to rebuild daily attendance rollups from raw records.
+Usage: python manage.py rebuild_attendance_rollups [--tenant <subdomain>] [--start YYYY-MM-DD] [--end YYYY-MM-DD]
+"""
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from core.tenants.models import Tenant
+from modules.attendance.rollups import rebuild_rollups
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Invalid date "{value}", expected YYYY-MM-DD')
+
+
+class Command(BaseCommand):
+    help = 'Recompute AttendanceDailyRollup rows from raw Attendance records'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', help='Tenant subdomain. Defaults to all tenants.')
+        parser.add_argument('--start', type=parse_date, help='First date to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end', type=parse_date, help='Last date to rebuild (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        tenant = None
+        if options['tenant']:
+            tenant = Tenant.objects.filter(subdomain=options['tenant']).first()
+            if not tenant:
+                raise CommandError(f'Tenant "{options["tenant"]}" not found')
+
+        count = rebuild_rollups(tenant=tenant, start_date=options['start'], end_date=options['end'])
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Rebuilt {count} daily attendance rollup(s).'))
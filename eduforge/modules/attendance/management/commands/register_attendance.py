@@ -2,9 +2,9 @@
 Management command to register and install the attendance module.
 """
 from django.core.management.base import BaseCommand
-from core.plugins.models import Module, TenantModule, ModulePermission
+from core.plugins.models import Module, TenantModule
+from core.plugins.reconcile import reconcile_tenant
 from core.tenants.models import Tenant
-from core.users.models import Role
 
 
 class Command(BaseCommand):
@@ -48,7 +48,7 @@ class Command(BaseCommand):
                     self.stdout.write(f'  - Already installed for tenant: {tenant.school_name}')
             
             # Ensure permissions exist
-            ModulePermission.ensure_default_permissions(tenant, module)
+            reconcile_tenant(tenant, [module])
             self.stdout.write(f'  ✓ Permissions configured for: {tenant.school_name}')
         
         self.stdout.write(self.style.SUCCESS('\n✅ Attendance module registration complete!'))
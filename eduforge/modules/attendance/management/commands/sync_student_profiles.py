@@ -0,0 +1,39 @@
+"""
+Management command to create or update attendance Student profiles for active academic enrollments.
+Usage: python manage.py sync_student_profiles [--tenant <subdomain>] [--session <id>] [--batch-size N]
+"""
+from django.core.management.base import BaseCommand, CommandError
+from core.tenants.models import Tenant
+from modules.attendance.profiles import sync_enrollment_profiles
+
+
+class Command(BaseCommand):
+    help = 'Create or update attendance Student profiles for active academic enrollments, in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', help='Tenant subdomain. Defaults to all tenants.')
+        parser.add_argument('--session', type=int, help='Academic session id. Defaults to all sessions.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Students per batch (default: 1000)')
+
+    def handle(self, *args, **options):
+        try:
+            from modules.academic.models import AcademicSession
+        except ImportError:
+            raise CommandError('The academic module is not available')
+
+        tenant = None
+        if options['tenant']:
+            tenant = Tenant.objects.filter(subdomain=options['tenant']).first()
+            if not tenant:
+                raise CommandError(f'Tenant "{options["tenant"]}" not found')
+
+        session = None
+        if options['session']:
+            session = AcademicSession.objects.filter(pk=options['session']).first()
+            if not session or (tenant and session.tenant_id != tenant.id):
+                raise CommandError(f'Academic session {options["session"]} not found')
+
+        created, updated = sync_enrollment_profiles(tenant=tenant, session=session, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Created {created} and updated {updated} student profile(s).'
+        ))
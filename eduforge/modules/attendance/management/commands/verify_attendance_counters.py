@@ -0,0 +1,49 @@
+"""
+Management command to verify per-student attendance counters against raw records.
+Usage: python manage.py verify_attendance_counters [--tenant <subdomain>] [--fix]
+"""
+from django.core.management.base import BaseCommand, CommandError
+from core.tenants.models import Tenant
+from modules.attendance.counters import find_counter_mismatches, rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Compare StudentAttendanceCounter totals with raw Attendance records'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', help='Tenant subdomain. Defaults to all tenants.')
+        parser.add_argument('--fix', action='store_true', help='Rebuild counters for students that disagree')
+        parser.add_argument('--rebuild', action='store_true', help='Rebuild all counters in scope without verifying')
+
+    def handle(self, *args, **options):
+        tenant = None
+        if options['tenant']:
+            tenant = Tenant.objects.filter(subdomain=options['tenant']).first()
+            if not tenant:
+                raise CommandError(f'Tenant "{options["tenant"]}" not found')
+
+        if options['rebuild']:
+            count = rebuild_counters(tenant=tenant)
+            self.stdout.write(self.style.SUCCESS(f'✓ Rebuilt {count} attendance counter row(s).'))
+            return
+
+        mismatches = find_counter_mismatches(tenant=tenant)
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS('✓ All attendance counters match raw records.'))
+            return
+
+        for student_id, (expected, actual) in sorted(mismatches.items()):
+            self.stdout.write(self.style.WARNING(
+                f'  Student {student_id}: expected {expected}, counters have {actual}'
+            ))
+
+        if not options['fix']:
+            self.stdout.write(self.style.ERROR(
+                f'✗ {len(mismatches)} student(s) have drifted counters. Re-run with --fix to rebuild them.'
+            ))
+            return
+
+        count = rebuild_counters(tenant=tenant, student_ids=list(mismatches))
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Rebuilt {count} counter row(s) for {len(mismatches)} student(s).'
+        ))
@@ -0,0 +1,102 @@
+# Generated by Django 4.2.8 on 2026-10-17 07:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    Roll up existing attendance like rebuild_rollups: students with an
+    active enrollment whose session covers the day count towards that
+    section, everyone else towards their legacy class.
+    """
+    from django.db.models import Count, F, Q
+
+    Attendance = apps.get_model('attendance', 'Attendance')
+    AttendanceDailyRollup = apps.get_model('attendance', 'AttendanceDailyRollup')
+
+    counts = {
+        'present_count': Count('id', filter=Q(status='present')),
+        'absent_count': Count('id', filter=Q(status='absent')),
+        'late_count': Count('id', filter=Q(status='late')),
+        'excused_count': Count('id', filter=Q(status='excused')),
+        'total_count': Count('id'),
+    }
+    in_session = Q(
+        student__user__academic_enrollments__is_active=True,
+        student__user__academic_enrollments__academic_session__start_date__lte=F('date'),
+        student__user__academic_enrollments__academic_session__end_date__gte=F('date'),
+    )
+    section_field = 'student__user__academic_enrollments__section'
+
+    section_rows = Attendance.objects.filter(in_session).values(
+        'tenant', section_field, 'date'
+    ).annotate(**counts).order_by()
+    class_rows = Attendance.objects.exclude(
+        pk__in=Attendance.objects.filter(in_session).values('pk')
+    ).filter(student__class_assigned__isnull=False).values(
+        'tenant', 'student__class_assigned', 'date'
+    ).annotate(**counts).order_by()
+
+    rollups = [
+        AttendanceDailyRollup(
+            tenant_id=row['tenant'],
+            section_id=row[section_field],
+            date=row['date'],
+            **{field: row[field] for field in counts},
+        )
+        for row in section_rows.iterator()
+    ]
+    rollups.extend(
+        AttendanceDailyRollup(
+            tenant_id=row['tenant'],
+            legacy_class_id=row['student__class_assigned'],
+            date=row['date'],
+            **{field: row[field] for field in counts},
+        )
+        for row in class_rows.iterator()
+    )
+    AttendanceDailyRollup.objects.bulk_create(rollups, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0001_initial'),
+        ('academic', '0002_subject'),
+        ('attendance', '0002_class_academic_section_student_enrollment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('present_count', models.PositiveIntegerField(default=0)),
+                ('absent_count', models.PositiveIntegerField(default=0)),
+                ('late_count', models.PositiveIntegerField(default=0)),
+                ('excused_count', models.PositiveIntegerField(default=0)),
+                ('total_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('legacy_class', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='attendance.class')),
+                ('section', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='academic.section')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='tenants.tenant')),
+            ],
+            options={
+                'verbose_name': 'Attendance Daily Rollup',
+                'verbose_name_plural': 'Attendance Daily Rollups',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['tenant', 'date'], name='attendance__tenant__b013ab_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='attendancedailyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('section__isnull', False)), fields=('section', 'date'), name='unique_rollup_section_date'),
+        ),
+        migrations.AddConstraint(
+            model_name='attendancedailyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('legacy_class__isnull', False)), fields=('legacy_class', 'date'), name='unique_rollup_class_date'),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 4.2.8 on 2026-10-17 07:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_counters(apps, schema_editor):
+    """
+    Build the prefix-sum counters from existing attendance like
+    rebuild_counters: one row per student per recorded day, streamed in
+    (student, date) order.
+    """
+    Attendance = apps.get_model('attendance', 'Attendance')
+    StudentAttendanceCounter = apps.get_model('attendance', 'StudentAttendanceCounter')
+
+    status_fields = {
+        'present': 'present_total',
+        'absent': 'absent_total',
+        'late': 'late_total',
+        'excused': 'excused_total',
+    }
+    rows = Attendance.objects.order_by('student_id', 'date').values_list(
+        'tenant_id', 'student_id', 'date', 'status'
+    )
+
+    batch = []
+    current_student = None
+    totals = {}
+    for tenant_id, student_id, date, status in rows.iterator(chunk_size=5000):
+        if student_id != current_student:
+            current_student = student_id
+            totals = {field: 0 for field in status_fields.values()}
+            totals['days_total'] = 0
+        totals[status_fields[status]] += 1
+        totals['days_total'] += 1
+        batch.append(StudentAttendanceCounter(tenant_id=tenant_id, student_id=student_id, date=date, **totals))
+        if len(batch) >= 5000:
+            StudentAttendanceCounter.objects.bulk_create(batch)
+            batch = []
+    StudentAttendanceCounter.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0001_initial'),
+        ('attendance', '0003_attendancedailyrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentAttendanceCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('present_total', models.IntegerField(default=0)),
+                ('absent_total', models.IntegerField(default=0)),
+                ('late_total', models.IntegerField(default=0)),
+                ('excused_total', models.IntegerField(default=0)),
+                ('days_total', models.IntegerField(default=0)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_counters', to='attendance.student')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_counters', to='tenants.tenant')),
+            ],
+            options={
+                'verbose_name': 'Student Attendance Counter',
+                'verbose_name_plural': 'Student Attendance Counters',
+                'ordering': ['student', 'date'],
+                'unique_together': {('student', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 4.2.8 on 2026-10-17 07:14
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def backfill_submissions(apps, schema_editor):
+    """
+    Derive one submission per (marker, date, section or class) from existing
+    attendance rows, timestamped with the latest update in the group.
+    """
+    from django.db.models import Count, Max, Q
+
+    Attendance = apps.get_model('attendance', 'Attendance')
+    AttendanceSubmission = apps.get_model('attendance', 'AttendanceSubmission')
+
+    groups = Attendance.objects.values(
+        'tenant', 'marked_by', 'date', 'student__enrollment__section', 'student__class_assigned',
+    ).annotate(
+        present_count=Count('id', filter=Q(status='present')),
+        absent_count=Count('id', filter=Q(status='absent')),
+        late_count=Count('id', filter=Q(status='late')),
+        excused_count=Count('id', filter=Q(status='excused')),
+        total_count=Count('id'),
+        created_at=Max('updated_at'),
+    ).order_by()
+
+    count_fields = ('present_count', 'absent_count', 'late_count', 'excused_count', 'total_count')
+    submissions = {}
+    for group in groups.iterator():
+        section_id = group['student__enrollment__section']
+        class_id = None if section_id else group['student__class_assigned']
+        if not section_id and not class_id:
+            continue
+        key = (group['tenant'], group['marked_by'], group['date'], section_id, class_id)
+        submission = submissions.get(key)
+        if submission is None:
+            submissions[key] = AttendanceSubmission(
+                tenant_id=group['tenant'],
+                marked_by_id=group['marked_by'],
+                date=group['date'],
+                section_id=section_id,
+                legacy_class_id=class_id,
+                created_at=group['created_at'],
+                **{field: group[field] for field in count_fields},
+            )
+        else:
+            for field in count_fields:
+                setattr(submission, field, getattr(submission, field) + group[field])
+            submission.created_at = max(submission.created_at, group['created_at'])
+
+    AttendanceSubmission.objects.bulk_create(submissions.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0002_subject'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tenants', '0001_initial'),
+        ('attendance', '0004_studentattendancecounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('present_count', models.PositiveIntegerField(default=0)),
+                ('absent_count', models.PositiveIntegerField(default=0)),
+                ('late_count', models.PositiveIntegerField(default=0)),
+                ('excused_count', models.PositiveIntegerField(default=0)),
+                ('total_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('legacy_class', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_submissions', to='attendance.class')),
+                ('marked_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attendance_submissions', to=settings.AUTH_USER_MODEL)),
+                ('section', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_submissions', to='academic.section')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_submissions', to='tenants.tenant')),
+            ],
+            options={
+                'verbose_name': 'Attendance Submission',
+                'verbose_name_plural': 'Attendance Submissions',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['marked_by', '-created_at'], name='attendance__marked__7e107a_idx'), models.Index(fields=['tenant', 'date'], name='attendance__tenant__31b74f_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_submissions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def partition_attendance(apps, schema_editor):
+    """
+    Convert the attendance table to date range partitions when
+    ATTENDANCE_PARTITIONING is enabled on PostgreSQL. No-op elsewhere;
+    `manage.py attendance_partitions --convert` can do it later.
+    """
+    if not getattr(settings, 'ATTENDANCE_PARTITIONING', False):
+        return
+    from modules.attendance.partitions import convert_to_partitioned
+    convert_to_partitioned(connection=schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0005_attendancesubmission'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_attendance, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.8 on 2026-10-17 07:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('attendance', '0006_partition_attendance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceArchiveMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the archived month')),
+                ('recorded_days', models.IntegerField(default=0)),
+                ('status_bits', models.BigIntegerField(default=0)),
+                ('markers', models.JSONField(blank=True, default=dict, help_text='Day of month to marker id, where it differs')),
+                ('notes', models.JSONField(blank=True, default=dict, help_text='Day of month to note')),
+                ('marked_by', models.ForeignKey(blank=True, help_text='Marker of most days in the month', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_archives', to='attendance.student')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_archives', to='tenants.tenant')),
+            ],
+            options={
+                'verbose_name': 'Attendance Archive Month',
+                'verbose_name_plural': 'Attendance Archive Months',
+                'ordering': ['student', 'month'],
+                'indexes': [models.Index(fields=['tenant', 'month'], name='attendance__tenant__06ddc5_idx')],
+                'unique_together': {('student', 'month')},
+            },
+        ),
+    ]
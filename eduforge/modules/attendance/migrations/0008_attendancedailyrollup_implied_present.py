@@ -0,0 +1,18 @@
+# Generated by Django 4.2.8 on 2026-10-17 07:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0007_attendancearchivemonth'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendancedailyrollup',
+            name='implied_present',
+            field=models.JSONField(blank=True, default=list, help_text='Students recorded present without a row, for exceptions-only storage'),
+        ),
+    ]
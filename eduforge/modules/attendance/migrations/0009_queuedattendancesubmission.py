@@ -0,0 +1,40 @@
+# Generated by Django 4.2.8 on 2026-10-17 07:50
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0002_subject'),
+        ('tenants', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('attendance', '0008_attendancedailyrollup_implied_present'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedAttendanceSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('statuses', models.JSONField(default=dict)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('legacy_class', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='queued_attendance_submissions', to='attendance.class')),
+                ('marked_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='queued_attendance_submissions', to=settings.AUTH_USER_MODEL)),
+                ('section', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='queued_attendance_submissions', to='academic.section')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='queued_attendance_submissions', to='tenants.tenant')),
+            ],
+            options={
+                'verbose_name': 'Queued Attendance Submission',
+                'verbose_name_plural': 'Queued Attendance Submissions',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['tenant', 'date'], name='attendance__tenant__c9a4be_idx'), models.Index(fields=['attempts', 'created_at'], name='attendance__attempt_99099d_idx')],
+            },
+        ),
+    ]
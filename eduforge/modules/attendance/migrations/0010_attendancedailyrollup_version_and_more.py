@@ -0,0 +1,23 @@
+# Generated by Django 4.2.8 on 2026-10-17 07:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0009_queuedattendancesubmission'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendancedailyrollup',
+            name='version',
+            field=models.PositiveIntegerField(default=0, help_text='Bumped by every write of the day, for optimistic concurrency'),
+        ),
+        migrations.AddField(
+            model_name='queuedattendancesubmission',
+            name='expected_version',
+            field=models.PositiveIntegerField(blank=True, help_text='Rollup version the submission was based on, if it was checked', null=True),
+        ),
+    ]
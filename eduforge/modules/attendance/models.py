@@ -142,29 +142,21 @@ class Student(models.Model):
     
     def get_attendance_percentage(self, start_date=None, end_date=None):
         """Calculate attendance percentage for a date range."""
+        from .counters import get_range_counts
+        
         if end_date is None:
             end_date = timezone.now().date()
         if start_date is None:
             # Default to current month
             start_date = end_date.replace(day=1)
         
-        total_days = Attendance.objects.filter(
-            student=self,
-            date__gte=start_date,
-            date__lte=end_date
-        ).count()
+        counts = get_range_counts(self, start_date, end_date)
+        total_days = counts['total']
         
         if total_days == 0:
             return 0
         
-        present_days = Attendance.objects.filter(
-            student=self,
-            date__gte=start_date,
-            date__lte=end_date,
-            status='present'
-        ).count()
-        
-        return round((present_days / total_days) * 100, 2)
+        return round((counts['present'] / total_days) * 100, 2)
     
     def clean(self):
         """Validate that user and tenant match."""
@@ -233,3 +225,271 @@ class Attendance(models.Model):
         """Override save to run validation."""
         self.full_clean()
         super().save(*args, **kwargs)
+
+
+class AttendanceDailyRollup(models.Model):
+    """
+    Per-day status counts for one academic section or legacy class.
+    Maintained by the batch attendance writer in the same transaction as the
+    raw rows, and rebuilt from them by rebuild_attendance_rollups. For
+    exceptions-only storage the row is also the day's taken marker and
+    ``implied_present`` lists the present students it stands for; see
+    modules/attendance/sparse.py. ``version`` stamps the section-day for
+    concurrent edits.
+    """
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='attendance_rollups')
+    section = models.ForeignKey(
+        'academic.Section',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='attendance_rollups'
+    )
+    legacy_class = models.ForeignKey(
+        Class,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='attendance_rollups'
+    )
+    date = models.DateField()
+    
+    present_count = models.PositiveIntegerField(default=0)
+    absent_count = models.PositiveIntegerField(default=0)
+    late_count = models.PositiveIntegerField(default=0)
+    excused_count = models.PositiveIntegerField(default=0)
+    total_count = models.PositiveIntegerField(default=0)
+    
+    implied_present = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Students recorded present without a row, for exceptions-only storage"
+    )
+    version = models.PositiveIntegerField(default=0, help_text="Bumped by every write of the day, for optimistic concurrency")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    objects = TenantScopedManager()
+    
+    class Meta:
+        verbose_name = 'Attendance Daily Rollup'
+        verbose_name_plural = 'Attendance Daily Rollups'
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['section', 'date'],
+                condition=models.Q(section__isnull=False),
+                name='unique_rollup_section_date',
+            ),
+            models.UniqueConstraint(
+                fields=['legacy_class', 'date'],
+                condition=models.Q(legacy_class__isnull=False),
+                name='unique_rollup_class_date',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['tenant', 'date']),
+        ]
+    
+    def __str__(self):
+        target = self.section or self.legacy_class
+        return f"{target} - {self.date}: {self.present_count}/{self.total_count} present"
+    
+    @property
+    def attendance_percentage(self):
+        """Present percentage for the day."""
+        if self.total_count == 0:
+            return 0
+        return round((self.present_count / self.total_count) * 100, 2)
+
+
+class StudentAttendanceCounter(models.Model):
+    """
+    Running attendance totals for a student, one row per day with a record.
+    Each row holds cumulative counts up to and including its date, so any
+    date range is answered by subtracting two rows.
+    """
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='attendance_counters')
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='attendance_counters')
+    date = models.DateField()
+    
+    present_total = models.IntegerField(default=0)
+    absent_total = models.IntegerField(default=0)
+    late_total = models.IntegerField(default=0)
+    excused_total = models.IntegerField(default=0)
+    days_total = models.IntegerField(default=0)
+    
+    objects = TenantScopedManager()
+    
+    class Meta:
+        verbose_name = 'Student Attendance Counter'
+        verbose_name_plural = 'Student Attendance Counters'
+        unique_together = ('student', 'date')
+        ordering = ['student', 'date']
+    
+    def __str__(self):
+        return f"{self.student_id} through {self.date}: {self.present_total}/{self.days_total} present"
+
+
+class AttendanceSubmission(models.Model):
+    """
+    One row per attendance submission for a section-day or class-day.
+    Serves the teacher's recent history, "not submitted today" lists and the
+    audit trail without reading raw attendance rows.
+    """
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='attendance_submissions')
+    section = models.ForeignKey(
+        'academic.Section',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='attendance_submissions'
+    )
+    legacy_class = models.ForeignKey(
+        Class,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='attendance_submissions'
+    )
+    date = models.DateField()
+    marked_by = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='attendance_submissions'
+    )
+    
+    present_count = models.PositiveIntegerField(default=0)
+    absent_count = models.PositiveIntegerField(default=0)
+    late_count = models.PositiveIntegerField(default=0)
+    excused_count = models.PositiveIntegerField(default=0)
+    total_count = models.PositiveIntegerField(default=0)
+    
+    # Not auto_now_add so backfills and imports can keep the original time
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    objects = TenantScopedManager()
+    
+    class Meta:
+        verbose_name = 'Attendance Submission'
+        verbose_name_plural = 'Attendance Submissions'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['marked_by', '-created_at']),
+            models.Index(fields=['tenant', 'date']),
+        ]
+    
+    def __str__(self):
+        target = self.section or self.legacy_class
+        return f"{target} - {self.date} by {self.marked_by}"
+    
+    @property
+    def target_name(self):
+        """Display name of the submitted section or legacy class."""
+        if self.section_id:
+            return self.section.full_name
+        if self.legacy_class_id:
+            name = self.legacy_class.name
+            if self.legacy_class.section:
+                name += f" - {self.legacy_class.section}"
+            return name
+        return "Unknown Class"
+
+
+class AttendanceArchiveMonth(models.Model):
+    """
+    Compacted attendance for one student and calendar month.
+
+    ``recorded_days`` has bit (day - 1) set for every day with a record and
+    ``status_bits`` holds a 2-bit status code per day at bits 2 * (day - 1).
+    Notes and markers other than the month's usual marker are stored
+    sparsely, keyed by day of month. See modules/attendance/archive.py.
+    """
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='attendance_archives')
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='attendance_archives')
+    month = models.DateField(help_text="First day of the archived month")
+    
+    recorded_days = models.IntegerField(default=0)
+    status_bits = models.BigIntegerField(default=0)
+    
+    marked_by = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        help_text="Marker of most days in the month"
+    )
+    markers = models.JSONField(default=dict, blank=True, help_text="Day of month to marker id, where it differs")
+    notes = models.JSONField(default=dict, blank=True, help_text="Day of month to note")
+    
+    objects = TenantScopedManager()
+    
+    class Meta:
+        verbose_name = 'Attendance Archive Month'
+        verbose_name_plural = 'Attendance Archive Months'
+        unique_together = ('student', 'month')
+        ordering = ['student', 'month']
+        indexes = [
+            models.Index(fields=['tenant', 'month']),
+        ]
+    
+    def __str__(self):
+        return f"{self.student_id} - {self.month:%Y-%m}"
+
+
+class QueuedAttendanceSubmission(models.Model):
+    """
+    A validated section-day or class-day submission waiting for the
+    write-behind workers. ``statuses`` maps Student ids to statuses. Rows are
+    deleted once written; failed and stale rows keep their error and attempt
+    count.
+    See modules/attendance/queue.py.
+    """
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='queued_attendance_submissions')
+    section = models.ForeignKey(
+        'academic.Section',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='queued_attendance_submissions'
+    )
+    legacy_class = models.ForeignKey(
+        Class,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='queued_attendance_submissions'
+    )
+    date = models.DateField()
+    marked_by = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='queued_attendance_submissions'
+    )
+    statuses = models.JSONField(default=dict)
+    expected_version = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Rollup version the submission was based on, if it was checked"
+    )
+    
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    objects = TenantScopedManager()
+    
+    class Meta:
+        verbose_name = 'Queued Attendance Submission'
+        verbose_name_plural = 'Queued Attendance Submissions'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['tenant', 'date']),
+            models.Index(fields=['attempts', 'created_at']),
+        ]
+    
+    def __str__(self):
+        target = self.section or self.legacy_class
+        return f"{target} - {self.date} queued by {self.marked_by}"
@@ -0,0 +1,279 @@
+"""
+Date range partitioning of the Attendance table (PostgreSQL only).
+
+When ATTENDANCE_PARTITIONING is enabled, the attendance table is converted
+into a table partitioned by RANGE (date), with one partition per calendar
+month or year and a DEFAULT partition for anything outside them. Range
+queries on (tenant, date) then only scan the matching partitions, and an
+old period can be detached or dropped without a bulk DELETE.
+
+PostgreSQL requires unique constraints on a partitioned table to include
+the partition key, so the primary key becomes (id, date). Django still
+treats ``id`` as the primary key. On other databases, SQLite included,
+every function here is a no-op.
+"""
+import re
+from datetime import date
+
+from django.conf import settings
+from django.db import connection as default_connection
+
+from .models import Attendance
+
+
+TABLE = Attendance._meta.db_table
+UNPARTITIONED_TABLE = f'{TABLE}_unpartitioned'
+DEFAULT_PARTITION = f'{TABLE}_default'
+
+INTERVAL_MONTH = 'month'
+INTERVAL_YEAR = 'year'
+INTERVALS = (INTERVAL_MONTH, INTERVAL_YEAR)
+
+_BOUND_RE = re.compile(r"FROM \('(?P<start>[\d-]+)'\) TO \('(?P<end>[\d-]+)'\)")
+
+
+def get_interval():
+    """Partition width configured by ATTENDANCE_PARTITION_INTERVAL."""
+    interval = getattr(settings, 'ATTENDANCE_PARTITION_INTERVAL', INTERVAL_MONTH)
+    if interval not in INTERVALS:
+        raise ValueError(f'ATTENDANCE_PARTITION_INTERVAL must be one of {INTERVALS}, not "{interval}"')
+    return interval
+
+
+def is_supported(connection=default_connection):
+    """Whether the database can partition the attendance table."""
+    return connection.vendor == 'postgresql'
+
+
+def is_partitioned(connection=default_connection):
+    """Whether the attendance table already is a partitioned table."""
+    if not is_supported(connection):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relkind FROM pg_class c "
+            "WHERE c.oid = to_regclass(%s)",
+            [TABLE],
+        )
+        row = cursor.fetchone()
+    return row is not None and row[0] == 'p'
+
+
+def period_start(day, interval):
+    """First day of the partition containing ``day``."""
+    if interval == INTERVAL_YEAR:
+        return date(day.year, 1, 1)
+    return date(day.year, day.month, 1)
+
+
+def next_period(start, interval):
+    """First day of the partition after the one starting on ``start``."""
+    if interval == INTERVAL_YEAR:
+        return date(start.year + 1, 1, 1)
+    if start.month == 12:
+        return date(start.year + 1, 1, 1)
+    return date(start.year, start.month + 1, 1)
+
+
+def partition_name(start, interval):
+    if interval == INTERVAL_YEAR:
+        return f'{TABLE}_p{start.year}'
+    return f'{TABLE}_p{start.year}_{start.month:02d}'
+
+
+def iter_periods(first_day, last_day, interval):
+    """Yield (start, end) bounds of every partition covering the date range."""
+    start = period_start(first_day, interval)
+    while start <= last_day:
+        end = next_period(start, interval)
+        yield start, end
+        start = end
+
+
+def list_partitions(connection=default_connection):
+    """
+    Return [(name, start, end)] for attached partitions, ordered by start.
+    The DEFAULT partition is returned last with start and end of None.
+    """
+    if not is_partitioned(connection):
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s)",
+            [TABLE],
+        )
+        rows = cursor.fetchall()
+
+    partitions = []
+    default = []
+    for name, bound in rows:
+        match = _BOUND_RE.search(bound or '')
+        if match:
+            partitions.append((
+                name,
+                date.fromisoformat(match.group('start')),
+                date.fromisoformat(match.group('end')),
+            ))
+        else:
+            default.append((name, None, None))
+    partitions.sort(key=lambda partition: partition[1])
+    return partitions + default
+
+
+def _default_holds(cursor, quote, start, end):
+    """Whether the DEFAULT partition holds rows dated start..end (exclusive)."""
+    cursor.execute(
+        f'SELECT EXISTS (SELECT 1 FROM {quote(DEFAULT_PARTITION)} WHERE date >= %s AND date < %s)',
+        [start, end],
+    )
+    return cursor.fetchone()[0]
+
+
+def create_partitions(first_day, last_day, interval=None, connection=default_connection):
+    """
+    Create any missing partitions covering first_day..last_day.
+    Returns the names of the partitions created.
+
+    PostgreSQL refuses to create a partition while the DEFAULT partition
+    holds rows in its range, so when it does, the DEFAULT partition is
+    detached, the new partitions are created, its matching rows are moved
+    into them and it is attached again. Detaching locks the attendance
+    table until the transaction ends; run inside one.
+    """
+    if not is_partitioned(connection):
+        return []
+    interval = interval or get_interval()
+    quote = connection.ops.quote_name
+    partitions = list_partitions(connection)
+    existing = {name for name, _, _ in partitions}
+    has_default = DEFAULT_PARTITION in existing
+
+    missing = [
+        (partition_name(start, interval), start, end)
+        for start, end in iter_periods(first_day, last_day, interval)
+        if partition_name(start, interval) not in existing
+    ]
+    if not missing:
+        return []
+
+    with connection.cursor() as cursor:
+        moving = [
+            (start, end) for _, start, end in missing
+            if has_default and _default_holds(cursor, quote, start, end)
+        ]
+        if moving:
+            cursor.execute(f'ALTER TABLE {quote(TABLE)} DETACH PARTITION {quote(DEFAULT_PARTITION)}')
+
+        for name, start, end in missing:
+            cursor.execute(
+                f'CREATE TABLE {quote(name)} '
+                f'PARTITION OF {quote(TABLE)} '
+                f'FOR VALUES FROM (%s) TO (%s)',
+                [start, end],
+            )
+
+        if moving:
+            for start, end in moving:
+                cursor.execute(
+                    f'INSERT INTO {quote(TABLE)} SELECT * FROM {quote(DEFAULT_PARTITION)} '
+                    f'WHERE date >= %s AND date < %s',
+                    [start, end],
+                )
+                cursor.execute(
+                    f'DELETE FROM {quote(DEFAULT_PARTITION)} WHERE date >= %s AND date < %s',
+                    [start, end],
+                )
+            cursor.execute(f'ALTER TABLE {quote(TABLE)} ATTACH PARTITION {quote(DEFAULT_PARTITION)} DEFAULT')
+    return [name for name, _, _ in missing]
+
+
+def detach_partitions(before, connection=default_connection):
+    """
+    Detach every dated partition that ends on or before ``before``.
+    The detached tables keep their rows. Returns their names.
+    """
+    detached = []
+    with connection.cursor() as cursor:
+        for name, _, end in list_partitions(connection):
+            if end is None or end > before:
+                continue
+            cursor.execute(
+                f'ALTER TABLE {connection.ops.quote_name(TABLE)} '
+                f'DETACH PARTITION {connection.ops.quote_name(name)}'
+            )
+            detached.append(name)
+    return detached
+
+
+def archive_tables(names, schema, connection=default_connection):
+    """Move detached partition tables into another schema."""
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f'CREATE SCHEMA IF NOT EXISTS {quote(schema)}')
+        for name in names:
+            cursor.execute(f'ALTER TABLE {quote(name)} SET SCHEMA {quote(schema)}')
+
+
+def drop_tables(names, connection=default_connection):
+    """Drop detached partition tables."""
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for name in names:
+            cursor.execute(f'DROP TABLE {quote(name)}')
+
+
+def convert_to_partitioned(interval=None, connection=default_connection):
+    """
+    Rebuild the attendance table as a partitioned table, keeping its rows,
+    indexes and constraints. Run inside a transaction. Returns False if the
+    database does not support partitioning or the table already is one.
+    """
+    if not is_supported(connection) or is_partitioned(connection):
+        return False
+    interval = interval or get_interval()
+    quote = connection.ops.quote_name
+
+    with connection.cursor() as cursor:
+        # Definitions are read before the rename so they name the final table
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = %s "
+            "AND indexname NOT IN ("
+            "  SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s)"
+            ")",
+            [TABLE, TABLE],
+        )
+        index_definitions = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype IN ('p', 'u', 'f', 'c')",
+            [TABLE],
+        )
+        constraints = cursor.fetchall()
+        cursor.execute(f'SELECT MIN(date), MAX(date) FROM {quote(TABLE)}')
+        first_day, last_day = cursor.fetchone()
+
+        cursor.execute(f'ALTER TABLE {quote(TABLE)} RENAME TO {quote(UNPARTITIONED_TABLE)}')
+        cursor.execute(
+            f'CREATE TABLE {quote(TABLE)} '
+            f'(LIKE {quote(UNPARTITIONED_TABLE)} INCLUDING DEFAULTS) '
+            f'PARTITION BY RANGE (date)'
+        )
+
+    today = date.today()
+    create_partitions(first_day or today, max(last_day or today, today), interval, connection)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE {quote(DEFAULT_PARTITION)} PARTITION OF {quote(TABLE)} DEFAULT')
+        cursor.execute(f'INSERT INTO {quote(TABLE)} SELECT * FROM {quote(UNPARTITIONED_TABLE)}')
+        cursor.execute(f'DROP TABLE {quote(UNPARTITIONED_TABLE)}')
+
+        for name, kind, definition in constraints:
+            if kind == 'p':
+                definition = 'PRIMARY KEY (id, date)'
+            cursor.execute(f'ALTER TABLE {quote(TABLE)} ADD CONSTRAINT {quote(name)} {definition}')
+        for definition in index_definitions:
+            cursor.execute(definition)
+    return True
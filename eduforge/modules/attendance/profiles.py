@@ -0,0 +1,88 @@
+"""
+Attendance Student profiles for academic enrollments.
+
+Academic sections enroll users directly, but attendance rows belong to an
+attendance Student profile. Profiles are created and kept in step with
+active enrollments in bulk: by the sync_student_profiles command, by a
+post_save signal on Enrollment, and as a fallback when a section is
+marked. A profile links to its enrollment and, unless it still belongs to
+a legacy class, carries the enrollment's roll number.
+"""
+from .models import Student
+
+
+def _profile_from(enrollment):
+    return Student(
+        tenant_id=enrollment.tenant_id,
+        user_id=enrollment.student_id,
+        roll_number=enrollment.roll_number,
+        admission_number=f"ADM-{enrollment.student_id}",
+        enrollment=enrollment,
+    )
+
+
+def sync_profiles(enrollments):
+    """
+    Create or update the Student profiles of ``enrollments`` with a constant
+    number of queries. When a user appears more than once, the last
+    enrollment wins. Profiles of another tenant are left alone.
+    Returns ({user_id: Student}, created, updated).
+    """
+    latest = {enrollment.student_id: enrollment for enrollment in enrollments}
+
+    profiles = {
+        student.user_id: student
+        for student in Student.objects.filter(user_id__in=list(latest))
+    }
+
+    missing = [_profile_from(enrollment) for user_id, enrollment in latest.items() if user_id not in profiles]
+    if missing:
+        Student.objects.bulk_create(missing, ignore_conflicts=True)
+        # Re-read: ignore_conflicts leaves primary keys unset on some databases
+        profiles.update({
+            student.user_id: student
+            for student in Student.objects.filter(user_id__in=[s.user_id for s in missing])
+        })
+
+    changed = []
+    for user_id, enrollment in latest.items():
+        student = profiles.get(user_id)
+        if student is None or student.tenant_id != enrollment.tenant_id:
+            continue
+        # Roll numbers are unique within a legacy class, so keep those as they are
+        roll_number = enrollment.roll_number if student.class_assigned_id is None else student.roll_number
+        if student.enrollment_id != enrollment.pk or student.roll_number != roll_number:
+            student.enrollment = enrollment
+            student.roll_number = roll_number
+            changed.append(student)
+    if changed:
+        Student.objects.bulk_update(changed, ['enrollment', 'roll_number'])
+
+    return profiles, len(missing), len(changed)
+
+
+def sync_enrollment_profiles(tenant=None, session=None, batch_size=1000):
+    """
+    Sync profiles for every active enrollment, optionally of one tenant or
+    academic session, in batches of users. Enrollments of an active session
+    take precedence over older ones. Returns (created, updated).
+    """
+    from modules.academic.models import Enrollment
+
+    enrollments = Enrollment.objects.filter(is_active=True)
+    if tenant is not None:
+        enrollments = enrollments.filter(tenant=tenant)
+    if session is not None:
+        enrollments = enrollments.filter(academic_session=session)
+
+    user_ids = list(enrollments.values_list('student_id', flat=True).distinct().order_by('student_id'))
+    created = 0
+    updated = 0
+    for i in range(0, len(user_ids), batch_size):
+        batch = enrollments.filter(student_id__in=user_ids[i:i + batch_size]).order_by(
+            'academic_session__is_active', 'academic_session__start_date', 'pk'
+        )
+        _, batch_created, batch_updated = sync_profiles(batch)
+        created += batch_created
+        updated += batch_updated
+    return created, updated
@@ -0,0 +1,259 @@
+"""
+Write-behind attendance submissions.
+
+With ATTENDANCE_WRITE_BEHIND enabled, marking a section or legacy class
+validates the submission and appends it to the QueuedAttendanceSubmission
+outbox instead of writing it, so the morning peak costs one insert per
+request. Workers (the process_attendance_queue command, run as many
+processes as needed) take the oldest queued section-days and, one short
+transaction per section-day, claim its rows with SKIP LOCKED, merge
+consecutive submissions by the same marker with later ones winning, and
+write them through the batch writer. Submissions carry the day's version
+they were based on; stale ones are refused when queued, or left with
+their error if the day moves on before they are written.
+A written row is deleted in the same transaction as the write, so readers see every submission exactly once:
+either still queued or written. Section-day reads overlay queued statuses
+with overlay_queued_statuses. drain_attendance_queue flushes the queue,
+e.g. on deploy.
+"""
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+
+from .models import QueuedAttendanceSubmission, Student
+from .rollups import AttendanceConflict, get_rollup_version
+from .writer import VALID_STATUSES, write_attendance
+
+
+QUEUE_BATCH_SIZE = 500
+# Failed submissions are retried this many times before they are left for an admin
+MAX_ATTEMPTS = 5
+
+
+def write_behind_enabled():
+    return getattr(settings, 'ATTENDANCE_WRITE_BEHIND', False)
+
+
+def _is_taken_by_other(entries, marked_by_id, expected_version):
+    """Whether another marker's queued submission is already based on ``expected_version``."""
+    return any(
+        entry_version == expected_version and entry_marker != marked_by_id
+        for entry_marker, entry_version in entries
+    )
+
+
+def enqueue_attendance(tenant, marked_by, date, statuses, section=None, class_obj=None, expected_version=None):
+    """
+    Validate a section-day or class-day submission like write_attendance
+    and queue it. ``statuses`` is an iterable of (Student, status) pairs;
+    invalid statuses are skipped. Returns the number of records queued.
+
+    ``expected_version`` is the day's rollup version the submission was
+    based on. Queued submissions do not bump it, so AttendanceConflict is
+    raised when the day has moved past it or another marker's queued
+    submission is already based on it; the worker checks again before
+    writing.
+    """
+    if section is None and class_obj is None:
+        raise ValidationError("Queued attendance needs a section or class.")
+    if marked_by is not None and marked_by.tenant_id != tenant.id:
+        raise ValidationError("Marker must belong to the same tenant.")
+
+    records = {}
+    for student, status in statuses:
+        if status not in VALID_STATUSES:
+            continue
+        if student.tenant_id != tenant.id:
+            raise ValidationError("Student must belong to the same tenant.")
+        records[str(student.pk)] = status
+
+    if not records:
+        return 0
+
+    if expected_version is not None:
+        current = get_rollup_version(tenant, date, section=section, class_obj=class_obj)
+        queued = QueuedAttendanceSubmission.objects.for_tenant(tenant).filter(
+            section=section,
+            legacy_class=class_obj,
+            date=date,
+            expected_version=expected_version,
+            attempts__lt=MAX_ATTEMPTS,
+        ).values_list('marked_by_id', 'expected_version')
+        if expected_version != current or _is_taken_by_other(queued, getattr(marked_by, 'pk', None), expected_version):
+            raise AttendanceConflict(current)
+
+    QueuedAttendanceSubmission.objects.create(
+        tenant=tenant,
+        section=section,
+        legacy_class=class_obj,
+        date=date,
+        marked_by=marked_by,
+        statuses=records,
+        expected_version=expected_version,
+    )
+    return len(records)
+
+
+def overlay_queued_statuses(tenant, date, statuses, student_ids, section=None, class_obj=None):
+    """
+    Apply the submissions still queued for a section-day or class-day,
+    oldest first, on top of ``statuses`` ({student_id: status}, updated in place).
+    """
+    queued = QueuedAttendanceSubmission.objects.for_tenant(tenant).filter(
+        section=section,
+        legacy_class=class_obj,
+        date=date,
+        attempts__lt=MAX_ATTEMPTS,
+    ).order_by('created_at', 'pk').values_list('statuses', flat=True)
+
+    by_key = {str(student_id): student_id for student_id in student_ids}
+    for queued_statuses in queued:
+        for key, status in queued_statuses.items():
+            if key in by_key:
+                statuses[by_key[key]] = status
+    return statuses
+
+
+def _group_filter(key):
+    tenant_id, section_id, legacy_class_id, date = key
+    return {'tenant_id': tenant_id, 'section_id': section_id, 'legacy_class_id': legacy_class_id, 'date': date}
+
+
+def _pending_groups(batch_size):
+    """
+    Section-days of the oldest ``batch_size`` queued submissions, oldest
+    first. Read without locks; each group is claimed when it is written.
+    """
+    keys = QueuedAttendanceSubmission.objects.filter(attempts__lt=MAX_ATTEMPTS).order_by(
+        'created_at', 'pk'
+    ).values_list('tenant_id', 'section_id', 'legacy_class_id', 'date')[:batch_size]
+    return list(dict.fromkeys(keys))
+
+
+def _has_older_entries(key, entries):
+    """Whether another worker still holds older submissions for the section-day."""
+    return QueuedAttendanceSubmission.objects.filter(
+        **_group_filter(key),
+        created_at__lte=entries[0].created_at,
+        attempts__lt=MAX_ATTEMPTS,
+    ).exclude(pk__in=[entry.pk for entry in entries]).exists()
+
+
+def _split_entries(entries, version):
+    """
+    Split a section-day's queued submissions, in queue order, into runs of
+    consecutive submissions by the same marker, and the stale ones: those
+    based on a version the day has moved past, or on the same version as an
+    earlier submission by another marker. Returns (runs, stale).
+    """
+    runs = []
+    stale = []
+    versioned = []
+    for entry in entries:
+        if entry.expected_version is not None:
+            if entry.expected_version != version or _is_taken_by_other(
+                versioned, entry.marked_by_id, entry.expected_version
+            ):
+                stale.append(entry)
+                continue
+            versioned.append((entry.marked_by_id, entry.expected_version))
+        if runs and runs[-1][-1].marked_by_id == entry.marked_by_id:
+            runs[-1].append(entry)
+        else:
+            runs.append([entry])
+    return runs, stale
+
+
+def _process_group(key):
+    """
+    Claim the queued submissions of one section-day and write them in one
+    short transaction, merging consecutive submissions by the same marker
+    in queue order. Stale submissions are left for an admin. Returns
+    (claimed, written, failed) counts of submissions.
+    """
+    with transaction.atomic():
+        entries = list(
+            QueuedAttendanceSubmission.objects.select_for_update(skip_locked=True, of=('self',)).filter(
+                **_group_filter(key),
+                attempts__lt=MAX_ATTEMPTS,
+            ).select_related('tenant', 'section', 'legacy_class', 'marked_by').order_by('created_at', 'pk')
+        )
+        if not entries or _has_older_entries(key, entries):
+            return len(entries), 0, 0
+
+        first = entries[0]
+        version = get_rollup_version(first.tenant, first.date, section=first.section, class_obj=first.legacy_class)
+        runs, stale = _split_entries(entries, version)
+        for entry in stale:
+            entry.attempts = MAX_ATTEMPTS
+            entry.last_error = str(AttendanceConflict(version))
+
+        student_ids = {student_id for entry in entries for student_id in entry.statuses}
+        students = {str(pk): student for pk, student in Student.objects.in_bulk(list(student_ids)).items()}
+        fresh = [entry for run in runs for entry in run]
+        # Only the first write checks the version; it then holds the day
+        expected_version = version if any(entry.expected_version is not None for entry in fresh) else None
+        try:
+            with transaction.atomic():
+                for run in runs:
+                    statuses = {}
+                    for entry in run:
+                        statuses.update(entry.statuses)
+                    write_attendance(
+                        first.tenant,
+                        run[-1].marked_by,
+                        first.date,
+                        [
+                            (students[student_id], status)
+                            for student_id, status in statuses.items()
+                            if student_id in students
+                        ],
+                        section=first.section,
+                        class_obj=first.legacy_class,
+                        expected_version=expected_version,
+                    )
+                    expected_version = None
+        except (ValidationError, DatabaseError, AttendanceConflict) as exc:
+            for entry in fresh:
+                entry.attempts += 1
+                entry.last_error = str(exc)
+            QueuedAttendanceSubmission.objects.bulk_update(entries, ['attempts', 'last_error'])
+            return len(entries), 0, len(entries)
+
+        QueuedAttendanceSubmission.objects.bulk_update(stale, ['attempts', 'last_error'])
+        QueuedAttendanceSubmission.objects.filter(pk__in=[entry.pk for entry in fresh]).delete()
+        return len(entries), len(fresh), len(stale)
+
+
+def process_queue(batch_size=QUEUE_BATCH_SIZE):
+    """
+    Write the section-days of up to ``batch_size`` queued submissions, each
+    claimed and written in its own transaction so no lock outlives one
+    section-day write. Rows locked by another worker are skipped, and so
+    are section-days with older submissions still held by one, so a newer
+    submission never lands first. Returns (claimed, written, failed) counts
+    of submissions.
+    """
+    claimed = 0
+    written = 0
+    failed = 0
+    for key in _pending_groups(batch_size):
+        group_claimed, group_written, group_failed = _process_group(key)
+        claimed += group_claimed
+        written += group_written
+        failed += group_failed
+    return claimed, written, failed
+
+
+def drain_queue(batch_size=QUEUE_BATCH_SIZE):
+    """
+    Process the queue until a pass makes no progress. Submissions that keep
+    failing stop being retried after MAX_ATTEMPTS. Returns (written, left),
+    where ``left`` counts the submissions still queued.
+    """
+    written = 0
+    while True:
+        claimed, batch_written, batch_failed = process_queue(batch_size)
+        written += batch_written
+        if not claimed or not (batch_written or batch_failed):
+            return written, QueuedAttendanceSubmission.objects.count()
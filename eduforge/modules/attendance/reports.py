@@ -0,0 +1,73 @@
+"""
+Attendance report engine.
+
+Computes every student's attendance counts and percentage for a date range
+with one grouped query, for either a legacy attendance Class roster or an
+academic Section's enrollments, plus one read of archived months and, for
+exceptions-only tenants, of implied presence. Shared by the HTML report and
+CSV export.
+"""
+from django.db.models import Count, Q
+
+from .archive import get_archived_counts
+from .models import Student
+from .sparse import count_implied_present, is_sparse
+
+
+NO_ARCHIVED_DAYS = {'present': 0, 'absent': 0, 'late': 0, 'excused': 0, 'total': 0}
+
+
+def get_roster(tenant, class_obj=None, section=None):
+    """
+    Return the active Student queryset for a legacy class or academic section.
+    """
+    students = Student.objects.for_tenant(tenant).filter(is_active=True)
+    if class_obj is not None:
+        return students.filter(class_assigned=class_obj)
+    if section is not None:
+        return students.filter(
+            user__academic_enrollments__section=section,
+            user__academic_enrollments__is_active=True,
+        )
+    return students
+
+
+def build_student_report(tenant, start_date, end_date, class_obj=None, section=None):
+    """
+    Return one row per student with total/present/absent/late/excused day
+    counts and attendance percentage, ordered by roll number.
+    """
+    in_range = Q(
+        attendance_records__date__gte=start_date,
+        attendance_records__date__lte=end_date,
+    )
+
+    students = get_roster(tenant, class_obj=class_obj, section=section).annotate(
+        total_days=Count('attendance_records', filter=in_range),
+        present_days=Count('attendance_records', filter=in_range & Q(attendance_records__status='present')),
+        absent_days=Count('attendance_records', filter=in_range & Q(attendance_records__status='absent')),
+        late_days=Count('attendance_records', filter=in_range & Q(attendance_records__status='late')),
+        excused_days=Count('attendance_records', filter=in_range & Q(attendance_records__status='excused')),
+    ).select_related('user').order_by('roll_number')
+
+    students = list(students)
+    archived = get_archived_counts([student.pk for student in students], start_date, end_date)
+    implied = {}
+    if is_sparse(tenant):
+        implied = count_implied_present(tenant, start_date, end_date, [student.pk for student in students])
+
+    rows = []
+    for student in students:
+        extra = archived.get(student.pk, NO_ARCHIVED_DAYS)
+        total_days = student.total_days + extra['total'] + implied.get(student.pk, 0)
+        present_days = student.present_days + extra['present'] + implied.get(student.pk, 0)
+        rows.append({
+            'student': student,
+            'total_days': total_days,
+            'present_days': present_days,
+            'absent_days': student.absent_days + extra['absent'],
+            'late_days': student.late_days + extra['late'],
+            'excused_days': student.excused_days + extra['excused'],
+            'percentage': round((present_days / total_days * 100), 2) if total_days > 0 else 0,
+        })
+    return rows
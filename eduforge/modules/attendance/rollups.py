@@ -0,0 +1,282 @@
+"""
+Daily attendance rollups.
+
+AttendanceDailyRollup stores status counts per (section or legacy class, day)
+so dashboards cost O(sections) instead of O(students). The batch writer
+claims the affected row first and refreshes it in the same transaction; rebuild_rollups
+recomputes them from raw Attendance rows and the monthly archive, and
+drops the cached heatmaps of the months it rebuilds.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from core.tenants.models import Tenant
+
+from .archive import count_statuses, day_mask, iter_archived_days, month_start
+from .heatmap import invalidate_heatmaps
+from .models import Attendance, AttendanceArchiveMonth, AttendanceDailyRollup, Student
+from .reports import get_roster
+from .sparse import count_implied_by_group, sparse_tenant_ids
+
+
+STATUS_COUNTS = {
+    'present_count': Count('id', filter=Q(status='present')),
+    'absent_count': Count('id', filter=Q(status='absent')),
+    'late_count': Count('id', filter=Q(status='late')),
+    'excused_count': Count('id', filter=Q(status='excused')),
+    'total_count': Count('id'),
+}
+
+COUNT_FIELDS = tuple(STATUS_COUNTS)
+
+
+class AttendanceConflict(Exception):
+    """
+    A section-day was written by someone else since the writer's version
+    was read. ``current_version`` is the version now stored.
+    """
+
+    def __init__(self, current_version):
+        super().__init__(f"Attendance was changed by someone else (now at version {current_version}).")
+        self.current_version = current_version
+
+
+def claim_daily_rollup(tenant, date, section=None, class_obj=None, expected_version=None):
+    """
+    Bump the version of a section-day or class-day before it is written, as
+    the first statement of the writer's transaction. The UPDATE locks the
+    rollup row, so writers of the same day queue on it rather than on the
+    attendance rows, and it is conditional on ``expected_version`` (0 for a
+    day not written yet) when that is given: a stale writer gets
+    AttendanceConflict before doing any other work. A day not written yet
+    gets an empty row, filled in by refresh_daily_rollup.
+
+    Returns (new version, whether the day had a row before).
+    """
+    rollups = AttendanceDailyRollup.objects.filter(tenant=tenant, section=section, legacy_class=class_obj, date=date)
+    current = rollups if expected_version is None else rollups.filter(version=expected_version)
+    if current.update(version=F('version') + 1, updated_at=timezone.now()):
+        if expected_version is not None:
+            return expected_version + 1, True
+        return rollups.values_list('version', flat=True).get(), True
+
+    if expected_version not in (None, 0):
+        raise AttendanceConflict(rollups.values_list('version', flat=True).first() or 0)
+    try:
+        with transaction.atomic():
+            AttendanceDailyRollup.objects.create(
+                tenant=tenant, section=section, legacy_class=class_obj, date=date, version=1
+            )
+            return 1, False
+    except IntegrityError:
+        # Another writer created the day first
+        if expected_version is not None:
+            raise AttendanceConflict(rollups.values_list('version', flat=True).first() or 0)
+        rollups.update(version=F('version') + 1, updated_at=timezone.now())
+        return rollups.values_list('version', flat=True).get(), True
+
+
+def refresh_daily_rollup(tenant, date, section=None, class_obj=None, implied=None):
+    """
+    Recompute the counts of a section-day or class-day claimed with
+    claim_daily_rollup from raw rows. For exceptions-only storage,
+    ``implied`` is the set of student ids the day's taken marker records as
+    present; it is saved on the row and counted too. Call inside the
+    transaction that claimed the day and wrote the attendance.
+    """
+    if section is None and class_obj is None:
+        return
+
+    roster = get_roster(tenant, class_obj=class_obj, section=section)
+    counts = Attendance.objects.filter(
+        tenant=tenant,
+        date=date,
+        student__in=roster.values('pk'),
+    ).aggregate(**STATUS_COUNTS)
+
+    # Students whose day is still archived
+    archived = AttendanceArchiveMonth.objects.filter(
+        student__in=roster.values('pk'),
+        month=month_start(date),
+    ).values_list('recorded_days', 'status_bits')
+    for recorded_days, status_bits in archived:
+        for status, value in count_statuses(recorded_days, status_bits, day_mask(month_start(date), date, date)).items():
+            counts[f'{status}_count'] += value
+
+    if implied is not None:
+        counts['implied_present'] = sorted(str(student_id) for student_id in implied)
+        counts['present_count'] += len(implied)
+        counts['total_count'] += len(implied)
+
+    AttendanceDailyRollup.objects.filter(
+        tenant=tenant, section=section, legacy_class=class_obj, date=date
+    ).update(**counts, updated_at=timezone.now())
+
+
+def get_rollup_version(tenant, date, section=None, class_obj=None):
+    """Current version of a section-day or class-day; 0 if not written yet."""
+    return AttendanceDailyRollup.objects.for_tenant(tenant).filter(
+        section=section,
+        legacy_class=class_obj,
+        date=date,
+    ).values_list('version', flat=True).first() or 0
+
+
+def get_daily_totals(tenant, date):
+    """
+    Return tenant-wide status counts for a day, summed over its rollups.
+    """
+    totals = AttendanceDailyRollup.objects.for_tenant(tenant).filter(date=date).aggregate(
+        **{field: Sum(field) for field in COUNT_FIELDS}
+    )
+    return {field: value or 0 for field, value in totals.items()}
+
+
+def _grouped_counts(records, group_field):
+    return records.values('tenant', group_field, 'date').annotate(**STATUS_COUNTS).order_by()
+
+
+def _add_archived_counts(rollup_counts, tenant, start_date, end_date):
+    """
+    Add archived days to rollup counts keyed by (tenant, section, class, date),
+    attributing them the same way as live rows.
+    """
+    archives = AttendanceArchiveMonth.objects.all()
+    if tenant is not None:
+        archives = archives.filter(tenant=tenant)
+    if start_date:
+        archives = archives.filter(month__gte=month_start(start_date))
+    if end_date:
+        archives = archives.filter(month__lte=end_date)
+    archives = list(archives)
+    if not archives:
+        return
+
+    student_ids = {archive.student_id for archive in archives}
+    legacy_classes = dict(
+        Student.objects.filter(pk__in=student_ids).values_list('pk', 'class_assigned')
+    )
+    enrollments = {}
+    for student_id, section_id, session_start, session_end in Student.objects.filter(
+        pk__in=student_ids,
+        user__academic_enrollments__is_active=True,
+    ).values_list(
+        'pk',
+        'user__academic_enrollments__section',
+        'user__academic_enrollments__academic_session__start_date',
+        'user__academic_enrollments__academic_session__end_date',
+    ):
+        enrollments.setdefault(student_id, []).append((section_id, session_start, session_end))
+
+    for tenant_id, student_id, date, status in iter_archived_days(archives, start_date, end_date):
+        keys = [
+            (tenant_id, section_id, None, date)
+            for section_id, session_start, session_end in enrollments.get(student_id, ())
+            if session_start <= date <= session_end
+        ]
+        if not keys and legacy_classes.get(student_id):
+            keys = [(tenant_id, None, legacy_classes[student_id], date)]
+        for key in keys:
+            counts = rollup_counts.setdefault(key, {field: 0 for field in COUNT_FIELDS})
+            counts[f'{status}_count'] += 1
+            counts['total_count'] += 1
+
+
+def _add_implied_counts(rollup_counts, rollups, start_date, end_date):
+    """
+    Keep the taken markers of sparse tenants and add the presence they
+    record. Their rollup rows cannot be rebuilt from raw rows alone, since a
+    day on which everyone was present has no rows at all.
+    """
+    for tenant_id in sparse_tenant_ids():
+        for section_id, class_id, date in rollups.filter(tenant_id=tenant_id).values_list(
+            'section_id', 'legacy_class_id', 'date'
+        ):
+            rollup_counts.setdefault((tenant_id, section_id, class_id, date), {field: 0 for field in COUNT_FIELDS})
+        tenant = Tenant.objects.get(pk=tenant_id)
+        for (section_id, class_id, date), implied in count_implied_by_group(tenant, start_date, end_date).items():
+            counts = rollup_counts.setdefault(
+                (tenant_id, section_id, class_id, date), {field: 0 for field in COUNT_FIELDS}
+            )
+            counts['present_count'] += implied
+            counts['total_count'] += implied
+
+
+def rebuild_rollups(tenant=None, start_date=None, end_date=None, batch_size=1000):
+    """
+    Delete and recompute rollups from raw Attendance rows and archived days.
+
+    Students with an active academic enrollment whose session covers the day
+    count towards that section; everyone else towards their legacy class.
+    Returns the number of rollup rows written.
+    """
+    records = Attendance.objects.all()
+    rollups = AttendanceDailyRollup.objects.all()
+    if tenant is not None:
+        records = records.filter(tenant=tenant)
+        rollups = rollups.filter(tenant=tenant)
+    if start_date:
+        records = records.filter(date__gte=start_date)
+        rollups = rollups.filter(date__gte=start_date)
+    if end_date:
+        records = records.filter(date__lte=end_date)
+        rollups = rollups.filter(date__lte=end_date)
+
+    in_session = Q(
+        student__user__academic_enrollments__is_active=True,
+        student__user__academic_enrollments__academic_session__start_date__lte=F('date'),
+        student__user__academic_enrollments__academic_session__end_date__gte=F('date'),
+    )
+    section_field = 'student__user__academic_enrollments__section'
+
+    section_rows = _grouped_counts(records.filter(in_session), section_field)
+    class_rows = _grouped_counts(
+        records.exclude(pk__in=records.filter(in_session).values('pk')).filter(
+            student__class_assigned__isnull=False
+        ),
+        'student__class_assigned',
+    )
+
+    rollup_counts = {}
+    for row in section_rows.iterator():
+        key = (row['tenant'], row[section_field], None, row['date'])
+        rollup_counts[key] = {field: row[field] for field in COUNT_FIELDS}
+    for row in class_rows.iterator():
+        key = (row['tenant'], None, row['student__class_assigned'], row['date'])
+        rollup_counts[key] = {field: row[field] for field in COUNT_FIELDS}
+    _add_archived_counts(rollup_counts, tenant, start_date, end_date)
+    _add_implied_counts(rollup_counts, rollups, start_date, end_date)
+
+    # Rebuilt days keep their versions so open edit forms stay valid, and
+    # their recorded presence, which raw rows cannot give back
+    kept = {
+        (tenant_id, section_id, class_id, date): (version, implied)
+        for tenant_id, section_id, class_id, date, version, implied in rollups.values_list(
+            'tenant_id', 'section_id', 'legacy_class_id', 'date', 'version', 'implied_present'
+        ).iterator()
+    }
+    new_rollups = []
+    for (tenant_id, section_id, class_id, date), counts in rollup_counts.items():
+        version, implied = kept.get((tenant_id, section_id, class_id, date), (0, []))
+        new_rollups.append(AttendanceDailyRollup(
+            tenant_id=tenant_id,
+            section_id=section_id,
+            legacy_class_id=class_id,
+            date=date,
+            version=version,
+            implied_present=implied,
+            **counts,
+        ))
+
+    # Months whose rollups change, for the heatmap cache
+    months = set(rollups.annotate(month=TruncMonth('date')).values_list('tenant_id', 'month').distinct())
+    months.update((rollup.tenant_id, month_start(rollup.date)) for rollup in new_rollups)
+
+    with transaction.atomic():
+        rollups.delete()
+        AttendanceDailyRollup.objects.bulk_create(new_rollups, batch_size=batch_size)
+        for tenant_id, month in months:
+            invalidate_heatmaps(tenant_id, month)
+    return len(new_rollups)
@@ -0,0 +1,126 @@
+"""
+Day rosters for marking attendance.
+
+A day roster is the ordered list of students of an academic section or
+legacy class with their status for one day, keyed by attendance Student
+id for both kinds of group. It is read with one joined query (statuses
+come from a correlated subquery on the (student, date) unique index),
+then completed with implied presence for sparse tenants and queued
+write-behind submissions, and cached per (section or class, date,
+version). Every write of the day bumps its rollup version, so writes never
+serve a stale entry; queueing a submission or saving an enrollment drops
+the entry explicitly, and other roster changes show up when it expires.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from .models import Attendance, Student
+from .profiles import sync_profiles
+from .queue import overlay_queued_statuses
+from .rollups import get_rollup_version
+from .sparse import fill_implied_statuses, is_sparse
+
+
+CACHE_PREFIX = 'attendance:roster'
+CACHE_TIMEOUT = getattr(settings, 'ATTENDANCE_ROSTER_CACHE_TIMEOUT', 300)
+
+ROSTER_FIELDS = ('id', 'user_id', 'roll_number', 'first_name', 'last_name', 'username', 'status')
+
+
+def _cache_key(tenant_id, section_id, class_id, date, version):
+    group = f'section:{section_id}' if section_id is not None else f'class:{class_id}'
+    return f'{CACHE_PREFIX}:{tenant_id}:{group}:{date.isoformat()}:{version}'
+
+
+def _status_on(date, student_ref):
+    return Subquery(
+        Attendance.objects.filter(student=OuterRef(student_ref), date=date).values('status')[:1]
+    )
+
+
+def _section_rows(tenant, date, section):
+    from modules.academic.models import Enrollment
+
+    enrollments = Enrollment.objects.for_tenant(tenant).filter(section=section, is_active=True)
+    rows = enrollments.annotate(
+        status=_status_on(date, 'student__student_profile')
+    ).values_list(
+        'student__student_profile', 'student_id', 'roll_number',
+        'student__first_name', 'student__last_name', 'student__username', 'status',
+    ).order_by('roll_number')
+
+    # Create any profiles the enrollment sync has not caught up with, then re-read
+    missing = [row[1] for row in rows if row[0] is None]
+    if missing:
+        sync_profiles(enrollments.filter(student_id__in=missing))
+    return [row for row in rows.all() if row[0] is not None] if missing else list(rows)
+
+
+def _class_rows(tenant, date, class_obj):
+    return list(
+        Student.objects.for_tenant(tenant).filter(
+            class_assigned=class_obj,
+            is_active=True
+        ).annotate(
+            status=_status_on(date, 'pk')
+        ).values_list(
+            'pk', 'user_id', 'roll_number', 'user__first_name', 'user__last_name', 'user__username', 'status',
+        ).order_by('roll_number')
+    )
+
+
+def build_day_roster(tenant, date, section=None, class_obj=None, version=None):
+    """
+    Return {'students': [...], 'version': n} for a section-day or class-day.
+    Each student is a dict with the attendance Student ``id``, ``user_id``,
+    ``roll_number``, ``name`` and ``status`` (None if not marked), in roll
+    number order; ``version`` is the day's rollup version.
+    """
+    if section is not None:
+        rows = _section_rows(tenant, date, section)
+    else:
+        rows = _class_rows(tenant, date, class_obj)
+
+    students = [dict(zip(ROSTER_FIELDS, row)) for row in rows]
+    statuses = {student['id']: student['status'] for student in students if student['status']}
+    student_ids = [student['id'] for student in students]
+    if is_sparse(tenant):
+        fill_implied_statuses(tenant, date, statuses, student_ids, section=section, class_obj=class_obj)
+    overlay_queued_statuses(tenant, date, statuses, student_ids, section=section, class_obj=class_obj)
+
+    for student in students:
+        first_name = student.pop('first_name')
+        last_name = student.pop('last_name')
+        username = student.pop('username')
+        student['name'] = f'{first_name} {last_name}'.strip() or username
+        student['status'] = statuses.get(student['id'])
+
+    if version is None:
+        version = get_rollup_version(tenant, date, section=section, class_obj=class_obj)
+    return {'students': students, 'version': version}
+
+
+def get_day_roster(tenant, date, section=None, class_obj=None):
+    """
+    Return the cached day roster for a section or legacy class, building it
+    on a miss. Costs one query on a hit: the day's version.
+    """
+    version = get_rollup_version(tenant, date, section=section, class_obj=class_obj)
+    key = _cache_key(tenant.id, getattr(section, 'pk', None), getattr(class_obj, 'pk', None), date, version)
+    roster = cache.get(key)
+    if roster is None:
+        roster = build_day_roster(tenant, date, section=section, class_obj=class_obj, version=version)
+        cache.set(key, roster, CACHE_TIMEOUT)
+    return roster
+
+
+def invalidate_day_roster(tenant, date, section=None, class_obj=None):
+    """
+    Drop the cached roster of a section-day or class-day once the current
+    transaction commits.
+    """
+    version = get_rollup_version(tenant, date, section=section, class_obj=class_obj)
+    key = _cache_key(tenant.id, getattr(section, 'pk', None), getattr(class_obj, 'pk', None), date, version)
+    transaction.on_commit(lambda: cache.delete(key))
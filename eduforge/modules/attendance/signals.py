@@ -0,0 +1,73 @@
+"""
+Signal handlers that keep attendance Student profiles, cached day rosters
+and teacher dashboards in step with academic enrollments and class
+assignments, and the cached storage mode in step with the attendance config.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .dashboard import invalidate_teacher_dashboards
+from .models import Class, Student
+from .profiles import sync_profiles
+from .roster import invalidate_day_roster
+from .sparse import invalidate_storage_mode
+
+
+@receiver(post_save, sender='academic.Enrollment')
+def enrollment_saved(sender, instance, **kwargs):
+    """
+    Create or update the student's profile once the enrollment is committed,
+    and drop today's cached roster and teacher dashboard of the section.
+    Bulk-created enrollments skip this; run sync_student_profiles after them.
+    """
+    if instance.is_active:
+        transaction.on_commit(lambda: sync_profiles([instance]))
+    invalidate_day_roster(instance.tenant, timezone.now().date(), section=instance.section)
+    invalidate_teacher_dashboards([instance.section.class_teacher_id])
+
+
+@receiver(pre_save, sender='academic.Section')
+@receiver(pre_save, sender=Class)
+def class_teacher_changing(sender, instance, **kwargs):
+    """Remember the previous class teacher so both dashboards get dropped."""
+    instance._previous_class_teacher_id = sender._base_manager.filter(
+        pk=instance.pk
+    ).values_list('class_teacher_id', flat=True).first()
+
+
+@receiver(post_save, sender='academic.Section')
+@receiver(post_save, sender=Class)
+@receiver(post_delete, sender='academic.Section')
+@receiver(post_delete, sender=Class)
+def class_teacher_changed(sender, instance, **kwargs):
+    invalidate_teacher_dashboards([
+        instance.class_teacher_id,
+        getattr(instance, '_previous_class_teacher_id', None),
+    ])
+
+
+@receiver(pre_save, sender=Student)
+def student_class_changing(sender, instance, **kwargs):
+    """Remember the previous legacy class so both teachers' dashboards get dropped."""
+    instance._previous_class_id = sender._base_manager.filter(
+        pk=instance.pk
+    ).values_list('class_assigned_id', flat=True).first()
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def student_class_changed(sender, instance, **kwargs):
+    class_ids = {instance.class_assigned_id, getattr(instance, '_previous_class_id', None)} - {None}
+    if class_ids:
+        invalidate_teacher_dashboards(
+            Class._base_manager.filter(pk__in=class_ids).values_list('class_teacher_id', flat=True)
+        )
+
+
+@receiver(post_save, sender='plugins.TenantModule')
+@receiver(post_delete, sender='plugins.TenantModule')
+def tenant_module_changed(sender, instance, **kwargs):
+    """The storage mode lives in the attendance TenantModule's config."""
+    invalidate_storage_mode(instance.tenant_id)
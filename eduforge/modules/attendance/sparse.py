@@ -0,0 +1,368 @@
+"""
+Exceptions-only attendance storage.
+
+A tenant can opt into sparse storage via the attendance TenantModule's
+config ({"storage": "sparse"}). Marking a section or legacy class then
+stores its daily rollup as a "taken" marker plus Attendance rows only for
+absent, late and excused students. The marker records the present
+students it stands for in ``implied_present``: the writer fills it with
+the group's active members, enrolled or admitted by that day, who were
+marked present. A student is present on a day when a marker records them
+and no Attendance row or archived day is stored for them on that day.
+
+Presence is fixed when the day is written, so later enrollments, moves and
+bulk updates to memberships do not change it, just as they do not change
+the rollups and counters written at the same time. Stored rows always win,
+so a tenant can hold a mix of stored and implied presence and convert in
+either direction with convert_to_sparse and convert_to_dense. Readers of
+raw rows add implied presence through get_implied_present,
+count_implied_present and iter_implied_present; rollups, counters and the
+submission log already carry full counts.
+
+The storage mode is read on every attendance read path, so it is cached
+per tenant and dropped when the attendance TenantModule is saved.
+"""
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .archive import iter_archived_days, month_start
+from .models import Attendance, AttendanceArchiveMonth, AttendanceDailyRollup, Student
+
+
+DENSE = 'dense'
+SPARSE = 'sparse'
+STORAGE_MODES = (DENSE, SPARSE)
+CONFIG_KEY = 'storage'
+
+CACHE_PREFIX = 'attendance:storage'
+CACHE_TIMEOUT = getattr(settings, 'ATTENDANCE_STORAGE_CACHE_TIMEOUT', 300)
+
+
+def _attendance_installations():
+    from core.plugins.models import TenantModule
+
+    return TenantModule.objects.filter(module__slug='attendance')
+
+
+def _cache_key(tenant_id):
+    return f'{CACHE_PREFIX}:{tenant_id}'
+
+
+def get_storage_mode(tenant):
+    """The tenant's storage mode, cached until its attendance config changes."""
+    key = _cache_key(tenant.id)
+    mode = cache.get(key)
+    if mode is None:
+        config = _attendance_installations().filter(tenant=tenant).values_list('config', flat=True).first()
+        mode = (config or {}).get(CONFIG_KEY, DENSE)
+        cache.set(key, mode, CACHE_TIMEOUT)
+    return mode
+
+
+def is_sparse(tenant):
+    return get_storage_mode(tenant) == SPARSE
+
+
+def invalidate_storage_mode(tenant_id):
+    """
+    Drop the cached storage mode of a tenant now and again once the current
+    transaction commits, so no reader caches the old mode in between.
+    """
+    key = _cache_key(tenant_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def sparse_tenant_ids():
+    """Ids of tenants using exceptions-only storage."""
+    return {
+        tenant_id
+        for tenant_id, config in _attendance_installations().values_list('tenant_id', 'config')
+        if (config or {}).get(CONFIG_KEY) == SPARSE
+    }
+
+
+def set_storage_mode(tenant, mode):
+    """
+    Record the storage mode in the tenant's attendance config. Does not move
+    any data; use convert_to_sparse or convert_to_dense for that.
+    """
+    installation = _attendance_installations().select_for_update().get(tenant=tenant)
+    installation.config = dict(installation.config or {}, **{CONFIG_KEY: mode})
+    installation.save(update_fields=['config'])
+    invalidate_storage_mode(tenant.id)
+
+
+def group_key(section_id, class_id):
+    return ('section', section_id) if section_id is not None else ('class', class_id)
+
+
+def _load_markers(tenant, start_date=None, end_date=None, student_ids=None):
+    """
+    {student_id: [(group, day)]} of the presence taken markers record,
+    optionally of some students.
+    """
+    rollups = AttendanceDailyRollup.objects.for_tenant(tenant)
+    if start_date is not None:
+        rollups = rollups.filter(date__gte=start_date)
+    if end_date is not None:
+        rollups = rollups.filter(date__lte=end_date)
+    wanted = None if student_ids is None else {str(student_id) for student_id in student_ids}
+
+    recorded = defaultdict(list)
+    for section_id, class_id, date, implied in rollups.values_list(
+        'section_id', 'legacy_class_id', 'date', 'implied_present'
+    ).iterator():
+        for student_id in implied or ():
+            if wanted is None or student_id in wanted:
+                recorded[uuid.UUID(student_id)].append((group_key(section_id, class_id), date))
+    return recorded
+
+
+def _load_members(tenant, student_ids=None):
+    """{group: [(student_id, first day counted)]} for active students."""
+    students = Student.objects.for_tenant(tenant).filter(is_active=True)
+    if student_ids is not None:
+        students = students.filter(pk__in=student_ids)
+
+    members = defaultdict(list)
+    for student_id, class_id, admission_date in students.filter(
+        class_assigned__isnull=False
+    ).values_list('pk', 'class_assigned_id', 'admission_date').iterator():
+        members[('class', class_id)].append((student_id, admission_date))
+
+    try:
+        from modules.academic.models import Enrollment  # noqa: F401
+    except ImportError:
+        return members
+    for student_id, section_id, enrollment_date in students.filter(
+        user__academic_enrollments__is_active=True
+    ).values_list(
+        'pk', 'user__academic_enrollments__section_id', 'user__academic_enrollments__enrollment_date'
+    ).iterator():
+        members[('section', section_id)].append((student_id, enrollment_date))
+    return members
+
+
+def _stored_days(student_ids, start_date=None, end_date=None):
+    """{(student_id, date)} with a live row or an archived day."""
+    records = Attendance.objects.filter(student_id__in=student_ids)
+    archives = AttendanceArchiveMonth.objects.filter(student_id__in=student_ids)
+    if start_date is not None:
+        records = records.filter(date__gte=start_date)
+        archives = archives.filter(month__gte=month_start(start_date))
+    if end_date is not None:
+        records = records.filter(date__lte=end_date)
+        archives = archives.filter(month__lte=end_date)
+
+    stored = set(records.values_list('student_id', 'date'))
+    stored.update(
+        (student_id, day)
+        for _, student_id, day, _ in iter_archived_days(archives, start_date, end_date)
+    )
+    return stored
+
+
+def _iter_implied(tenant, start_date=None, end_date=None, student_ids=None, batch_size=1000):
+    """
+    Yield (student_id, group, day) for implied presence, one student batch
+    at a time so stored days are read in bounded chunks. Students come in
+    the order of str(student_id).
+    """
+    recorded = _load_markers(tenant, start_date, end_date, student_ids)
+    ordered = sorted(recorded, key=str)
+    for i in range(0, len(ordered), batch_size):
+        batch = ordered[i:i + batch_size]
+        stored = _stored_days(batch, start_date, end_date)
+        for student_id in batch:
+            for group, day in recorded[student_id]:
+                if (student_id, day) not in stored:
+                    yield student_id, group, day
+
+
+def get_implied_present(tenant, start_date=None, end_date=None, student_ids=None):
+    """Return {student_id: set of dates} of implied presence."""
+    present = defaultdict(set)
+    for student_id, _, day in _iter_implied(tenant, start_date, end_date, student_ids):
+        present[student_id].add(day)
+    return present
+
+
+def count_implied_present(tenant, start_date=None, end_date=None, student_ids=None):
+    """Return {student_id: number of implied present days}."""
+    return {
+        student_id: len(days)
+        for student_id, days in get_implied_present(tenant, start_date, end_date, student_ids).items()
+    }
+
+
+def count_implied_by_group(tenant, start_date=None, end_date=None):
+    """
+    Return {(section_id, legacy_class_id, date): implied present count} of
+    the tenant's taken markers.
+    """
+    counts = defaultdict(int)
+    for _, (kind, group_id), day in _iter_implied(tenant, start_date, end_date):
+        counts[(group_id, None, day) if kind == 'section' else (None, group_id, day)] += 1
+    return counts
+
+
+def iter_implied_present(tenant, start_date=None, end_date=None, student_ids=None, batch_size=1000):
+    """
+    Yield (tenant_id, student_id, date, 'present') for implied presence,
+    ordered by (str(student_id), date) like the counter rebuild streams.
+    """
+    return _iter_implied_rows(
+        _iter_implied(tenant, start_date, end_date, student_ids, batch_size=batch_size), tenant.id
+    )
+
+
+def _iter_implied_rows(implied, tenant_id):
+    """Turn _iter_implied output into one present row per student-day."""
+    days = []
+    current = None
+    for student_id, _, day in implied:
+        if student_id != current:
+            yield from ((tenant_id, current, d, 'present') for d in sorted(set(days)))
+            current = student_id
+            days = []
+        days.append(day)
+    yield from ((tenant_id, current, d, 'present') for d in sorted(set(days)))
+
+
+def get_implied_records(student, start_date, end_date):
+    """
+    Return unsaved present Attendance instances for a student's implied days
+    in range, newest first.
+    """
+    days = get_implied_present(student.tenant, start_date, end_date, [student.pk]).get(student.pk, ())
+    return [
+        Attendance(tenant_id=student.tenant_id, student=student, date=day, status='present')
+        for day in sorted(days, reverse=True)
+    ]
+
+
+def implied_members(tenant, date, student_ids, section=None, class_obj=None):
+    """
+    Return the ids among ``student_ids`` whose presence the section-day or
+    class-day marker can imply: active members enrolled or admitted by
+    ``date``.
+    """
+    group = group_key(getattr(section, 'pk', None), getattr(class_obj, 'pk', None))
+    members = _load_members(tenant, student_ids).get(group, ())
+    return {student_id for student_id, since in members if since is None or since <= date}
+
+
+def get_recorded_present(tenant, date, section=None, class_obj=None):
+    """
+    Return the ids of the students a section-day or class-day marker records
+    as present; empty if the day has not been taken.
+    """
+    implied = AttendanceDailyRollup.objects.for_tenant(tenant).filter(
+        section=section,
+        legacy_class=class_obj,
+        date=date,
+    ).values_list('implied_present', flat=True).first()
+    return {uuid.UUID(student_id) for student_id in implied or ()}
+
+
+def fill_implied_statuses(tenant, date, statuses, student_ids, section=None, class_obj=None, recorded=None):
+    """
+    For a sparse tenant, mark students without a stored status as present
+    when the section-day or class-day marker records their presence.
+    ``statuses`` maps student ids to stored statuses and is updated in
+    place. ``recorded`` is the marker's get_recorded_present, when the
+    caller already has it.
+    """
+    if recorded is None:
+        recorded = get_recorded_present(tenant, date, section=section, class_obj=class_obj)
+    for student_id in student_ids:
+        if student_id in recorded:
+            statuses.setdefault(student_id, 'present')
+    return statuses
+
+
+def _candidate_days(tenant, markers):
+    """
+    {student_id: [(group, day)]} of the {group: [dates]} markers a student
+    counts towards by current membership.
+    """
+    members = _load_members(tenant)
+    candidates = defaultdict(list)
+    for group, days in markers.items():
+        for student_id, since in members.get(group, ()):
+            candidates[student_id].extend((group, day) for day in days if since is None or day >= since)
+    return candidates
+
+
+def convert_to_sparse(tenant, batch_size=1000):
+    """
+    Switch a tenant to exceptions-only storage: delete the present rows
+    without notes of current group members on taken days, and record those
+    students on the day's marker. Run rebuild_rollups first so every day
+    with rows has a marker. Returns the number of rows deleted.
+    """
+    deleted = 0
+    with transaction.atomic():
+        set_storage_mode(tenant, SPARSE)
+        rollups = AttendanceDailyRollup.objects.for_tenant(tenant)
+        marker_ids = {}
+        markers = defaultdict(list)
+        for pk, section_id, class_id, day in rollups.values_list('pk', 'section_id', 'legacy_class_id', 'date'):
+            marker_ids[(group_key(section_id, class_id), day)] = pk
+            markers[group_key(section_id, class_id)].append(day)
+
+        candidates = _candidate_days(tenant, markers)
+        recorded = defaultdict(list)
+        student_ids = list(candidates)
+        for i in range(0, len(student_ids), batch_size):
+            batch = student_ids[i:i + batch_size]
+            implied = {}
+            for student_id in batch:
+                for group, day in candidates[student_id]:
+                    implied.setdefault((student_id, day), group)
+            # Rows with notes keep information a marker cannot hold
+            rows = Attendance.objects.filter(student_id__in=batch, status='present', notes='').values_list(
+                'pk', 'student_id', 'date'
+            )
+            pks = []
+            for pk, student_id, day in rows:
+                if (student_id, day) in implied:
+                    pks.append(pk)
+                    recorded[marker_ids[(implied[(student_id, day)], day)]].append(str(student_id))
+            for j in range(0, len(pks), batch_size):
+                Attendance.objects.filter(pk__in=pks[j:j + batch_size]).delete()
+            deleted += len(pks)
+
+        AttendanceDailyRollup.objects.bulk_update(
+            [AttendanceDailyRollup(pk=pk, implied_present=sorted(ids)) for pk, ids in recorded.items()],
+            ['implied_present'],
+            batch_size=batch_size,
+        )
+    return deleted
+
+
+def convert_to_dense(tenant, batch_size=1000):
+    """
+    Store a row for every implied present day, clear the markers and switch
+    the tenant back to one row per student per day. Returns the number of
+    rows created.
+    """
+    created = 0
+    with transaction.atomic():
+        batch = []
+        for tenant_id, student_id, day, status in iter_implied_present(tenant, batch_size=batch_size):
+            batch.append(Attendance(tenant_id=tenant_id, student_id=student_id, date=day, status=status))
+            if len(batch) >= batch_size:
+                Attendance.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        Attendance.objects.bulk_create(batch)
+        created += len(batch)
+        AttendanceDailyRollup.objects.for_tenant(tenant).update(implied_present=[])
+        set_storage_mode(tenant, DENSE)
+    return created
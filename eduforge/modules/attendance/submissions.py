@@ -0,0 +1,116 @@
+"""
+Attendance submission log.
+
+The batch writer records one AttendanceSubmission per section-day or
+class-day submission. Recent history, the "not submitted today" list and
+audit views read this table through its (marked_by, -created_at) and
+(tenant, date) indexes instead of grouping raw attendance rows.
+"""
+from collections import Counter
+
+from django.db.models import Exists, OuterRef
+
+from .models import AttendanceSubmission, Class, QueuedAttendanceSubmission
+
+
+RECENT_HISTORY_SIZE = 5
+# Submissions read to fill recent history after dropping re-submissions
+RECENT_SUBMISSION_SCAN = 50
+
+
+def record_submission(tenant, marked_by, date, statuses, section=None, class_obj=None):
+    """
+    Log a submission of ``statuses`` (an iterable of status strings) for a
+    section or legacy class. Call inside the transaction that wrote them.
+    """
+    if section is None and class_obj is None:
+        return None
+
+    counts = Counter(statuses)
+    return AttendanceSubmission.objects.create(
+        tenant=tenant,
+        section=section,
+        legacy_class=class_obj,
+        date=date,
+        marked_by=marked_by,
+        present_count=counts['present'],
+        absent_count=counts['absent'],
+        late_count=counts['late'],
+        excused_count=counts['excused'],
+        total_count=sum(counts.values()),
+    )
+
+
+def get_recent_history(tenant, marked_by, limit=RECENT_HISTORY_SIZE):
+    """
+    Return the latest distinct (date, section/class) submissions by a user.
+    """
+    submissions = AttendanceSubmission.objects.for_tenant(tenant).filter(
+        marked_by=marked_by
+    ).select_related(
+        'section__class_obj', 'legacy_class'
+    ).order_by('-created_at')[:RECENT_SUBMISSION_SCAN]
+
+    recent_history = []
+    seen_groups = set()
+    for submission in submissions:
+        group_key = (submission.date, submission.section_id, submission.legacy_class_id)
+        if group_key in seen_groups:
+            continue
+        seen_groups.add(group_key)
+        recent_history.append({
+            'class_name': submission.target_name,
+            'date': submission.date,
+            'id': submission.section_id or submission.legacy_class_id,
+            'is_academic': submission.section_id is not None,
+        })
+        if len(recent_history) >= limit:
+            break
+    return recent_history
+
+
+def get_pending_submissions(tenant, date):
+    """
+    Return active legacy classes and current-session sections that have no
+    submission for the date, written or queued, with their class teacher.
+    """
+    pending = []
+
+    submitted_classes = AttendanceSubmission.objects.filter(legacy_class=OuterRef('pk'), date=date)
+    queued_classes = QueuedAttendanceSubmission.objects.filter(legacy_class=OuterRef('pk'), date=date)
+    classes = Class.objects.for_tenant(tenant).filter(is_active=True).annotate(
+        submitted=Exists(submitted_classes),
+        queued=Exists(queued_classes),
+    ).filter(submitted=False, queued=False).select_related('class_teacher').order_by('name', 'section')
+    for class_obj in classes:
+        name = class_obj.name
+        if class_obj.section:
+            name += f" - {class_obj.section}"
+        pending.append({
+            'id': class_obj.id,
+            'name': name,
+            'class_teacher': class_obj.class_teacher,
+            'type': 'legacy',
+        })
+
+    try:
+        from modules.academic.models import Section
+    except ImportError:
+        return pending
+
+    submitted_sections = AttendanceSubmission.objects.filter(section=OuterRef('pk'), date=date)
+    queued_sections = QueuedAttendanceSubmission.objects.filter(section=OuterRef('pk'), date=date)
+    sections = Section.objects.for_tenant(tenant).filter(
+        class_obj__academic_session__is_active=True
+    ).annotate(
+        submitted=Exists(submitted_sections),
+        queued=Exists(queued_sections),
+    ).filter(submitted=False, queued=False).select_related('class_obj', 'class_teacher').order_by('class_obj__name', 'name')
+    for section in sections:
+        pending.append({
+            'id': section.id,
+            'name': section.full_name,
+            'class_teacher': section.class_teacher,
+            'type': 'academic',
+        })
+    return pending
@@ -0,0 +1,119 @@
+"""
+Shared fixtures for attendance tests: a tenant with the attendance module
+installed, an academic section and a legacy class, all of whose students
+joined before the test days.
+"""
+import datetime
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from core.plugins.models import Module, ModulePermission, TenantModule
+from core.plugins.tests.base import make_tenant, make_user
+from modules.academic.models import AcademicSession, Class as AcademicClass, Enrollment, Section
+from modules.attendance.exports import iter_records, iter_summaries
+from modules.attendance.models import Class, Student
+from modules.attendance.reports import build_student_report
+from modules.attendance.writer import ensure_student_profiles, write_attendance
+
+
+JOINED = datetime.date(2025, 6, 1)
+DAYS = [datetime.date(2026, 4, day) for day in range(1, 6)]
+STATUS_CYCLE = ('present', 'present', 'absent', 'present', 'late', 'excused', 'present')
+
+
+class AttendanceTestCase(TestCase):
+    """Base class with a section of six students and a legacy class of four."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant, cls.roles = make_tenant('alpha')
+        cls.module, _ = Module.objects.get_or_create(slug='attendance', defaults={'name': 'Attendance'})
+        TenantModule.objects.create(tenant=cls.tenant, module=cls.module)
+        ModulePermission.objects.create(
+            module=cls.module, role=cls.roles['Teacher'], can_view=True, can_edit=True,
+        )
+        cls.teacher = make_user(cls.tenant, cls.roles['Teacher'], 'teacher')
+
+        cls.session = AcademicSession.objects.create(
+            tenant=cls.tenant,
+            name='2025-2026',
+            start_date=JOINED,
+            end_date=datetime.date(2026, 5, 31),
+            is_active=True,
+        )
+        class_obj = AcademicClass.objects.create(tenant=cls.tenant, academic_session=cls.session, name='Grade 5')
+        cls.section = Section.objects.create(tenant=cls.tenant, class_obj=class_obj, name='A', class_teacher=cls.teacher)
+        for i in range(6):
+            cls.enroll(f'section{i}')
+        cls.section_students = cls.sync_section()
+
+        cls.legacy_class = Class.objects.create(tenant=cls.tenant, name='Grade 3', section='A', class_teacher=cls.teacher)
+        cls.class_students = [
+            Student.objects.create(
+                tenant=cls.tenant,
+                user=make_user(cls.tenant, cls.roles['Student'], f'legacy{i}'),
+                roll_number=str(i + 1),
+                admission_number=f'L{i + 1}',
+                class_assigned=cls.legacy_class,
+                admission_date=JOINED,
+            )
+            for i in range(4)
+        ]
+
+    @classmethod
+    def enroll(cls, name):
+        return Enrollment.objects.create(
+            tenant=cls.tenant,
+            student=make_user(cls.tenant, cls.roles['Student'], name),
+            section=cls.section,
+            academic_session=cls.session,
+            roll_number=str(Enrollment.objects.filter(section=cls.section).count() + 1),
+            enrollment_date=JOINED,
+        )
+
+    @classmethod
+    def sync_section(cls):
+        """Create the section's Student profiles, ordered by roll number."""
+        ensure_student_profiles(cls.tenant, Enrollment.objects.filter(section=cls.section))
+        return list(
+            Student.objects.filter(enrollment__section=cls.section).order_by('enrollment__roll_number')
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def mark_days(self, days=DAYS):
+        """Write a mix of statuses for both groups on each day."""
+        for offset, day in enumerate(days):
+            write_attendance(self.tenant, self.teacher, day, [
+                (student, STATUS_CYCLE[(i + offset) % len(STATUS_CYCLE)])
+                for i, student in enumerate(self.section_students)
+            ], section=self.section)
+            write_attendance(self.tenant, self.teacher, day, [
+                (student, STATUS_CYCLE[(i + offset + 3) % len(STATUS_CYCLE)])
+                for i, student in enumerate(self.class_students)
+            ], class_obj=self.legacy_class)
+
+    def snapshot(self, start_date=DAYS[0], end_date=DAYS[-1]):
+        """
+        What the reports and the tenant exports show for a range, comparable
+        across storage layouts.
+        """
+        def report(**group):
+            return [
+                (row['student'].pk, row['present_days'], row['absent_days'], row['late_days'],
+                 row['excused_days'], row['total_days'])
+                for row in build_student_report(self.tenant, start_date, end_date, **group)
+            ]
+
+        return {
+            'section': report(section=self.section),
+            'class': report(class_obj=self.legacy_class),
+            'records': sorted(
+                (tuple(record.values()) for record in iter_records(self.tenant, start_date, end_date)), key=str
+            ),
+            'summaries': sorted(
+                (tuple(summary.values()) for summary in iter_summaries(self.tenant, start_date, end_date)), key=str
+            ),
+        }
@@ -0,0 +1,68 @@
+from importlib.util import find_spec
+from unittest import skipUnless
+
+from django.test import SimpleTestCase
+
+from modules.attendance.analytics import absence_streaks, build_analytics
+from modules.attendance.archive import compact_attendance
+from modules.attendance.reports import build_student_report
+
+from .base import DAYS, AttendanceTestCase
+
+
+@skipUnless(find_spec('numpy'), 'Attendance analytics require numpy')
+class AbsenceStreakTests(SimpleTestCase):
+
+    def test_longest_and_current_streaks(self):
+        import numpy
+
+        absent = numpy.array([
+            [False, True, True, False, True, True, True],
+            [True, True, False, False, False, False, False],
+            [False] * 7,
+        ])
+
+        longest, current = absence_streaks(absent)
+
+        self.assertEqual(longest.tolist(), [3, 2, 0])
+        self.assertEqual(current.tolist(), [3, 0, 0])
+
+
+@skipUnless(find_spec('numpy'), 'Attendance analytics require numpy')
+class AnalyticsTests(AttendanceTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.mark_days()
+
+    def analytics(self):
+        return build_analytics(self.tenant, DAYS[0], DAYS[-1], section=self.section)
+
+    def test_counts_agree_with_the_report(self):
+        analytics = self.analytics()
+
+        report = build_student_report(self.tenant, DAYS[0], DAYS[-1], section=self.section)
+        self.assertEqual(
+            [(row['id'], row['recorded_days'], row['present_days'], row['absent_days'], row['late_days'])
+             for row in analytics['students']],
+            [(row['student'].pk, row['total_days'], row['present_days'], row['absent_days'], row['late_days'])
+             for row in report],
+        )
+        self.assertEqual(analytics['summary']['school_days'], len(DAYS))
+        self.assertEqual([group['name'] for group in analytics['groups']], ['Grade 5 - A'])
+
+    def test_chronic_absence_and_streaks(self):
+        students = {row['id']: row for row in self.analytics()['students']}
+
+        # Every five days of the status cycle hold an absence or an excused day
+        self.assertTrue(all(row['is_chronic'] for row in students.values()))
+        # present, present, absent, present, late
+        first = students[self.section_students[0].pk]
+        self.assertEqual((first['longest_absence_streak'], first['current_absence_streak']), (1, 0))
+
+    def test_archived_months_give_the_same_result(self):
+        before = self.analytics()
+
+        compact_attendance(self.tenant, DAYS[0], DAYS[-1])
+
+        self.assertEqual(self.analytics(), before)
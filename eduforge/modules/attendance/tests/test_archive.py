@@ -0,0 +1,76 @@
+import json
+
+from django.urls import reverse
+
+from core.plugins.models import ModulePermission
+from modules.attendance.archive import compact_attendance, restore_attendance
+from modules.attendance.counters import find_counter_mismatches
+from modules.attendance.models import Attendance, AttendanceArchiveMonth
+
+from .base import DAYS, AttendanceTestCase, make_user
+
+
+class ArchiveRoundTripTests(AttendanceTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.mark_days()
+        Attendance.objects.filter(student=self.class_students[0], date=DAYS[1]).update(notes='Doctor visit')
+
+    def rows(self):
+        return sorted(
+            Attendance.objects.values_list('student_id', 'date', 'status', 'notes', 'marked_by_id'), key=str
+        )
+
+    def test_compact_keeps_reports(self):
+        before = self.snapshot()
+
+        archived, written = compact_attendance(self.tenant, DAYS[0], DAYS[-1])
+
+        self.assertEqual(archived, 50)
+        self.assertEqual(written, 10)
+        self.assertFalse(Attendance.objects.exists())
+        self.assertEqual(self.snapshot(), before)
+        self.assertEqual(find_counter_mismatches(self.tenant), {})
+
+    def test_compact_then_restore_gives_back_the_rows(self):
+        before = self.rows()
+        compact_attendance(self.tenant, DAYS[0], DAYS[-1])
+
+        restored = restore_attendance(self.tenant, DAYS[0], DAYS[-1])
+
+        self.assertEqual(restored, 50)
+        self.assertEqual(self.rows(), before)
+        self.assertFalse(AttendanceArchiveMonth.objects.exists())
+
+    def test_partial_restore_leaves_the_rest_archived(self):
+        before = self.snapshot()
+        compact_attendance(self.tenant, DAYS[0], DAYS[-1])
+
+        restore_attendance(self.tenant, DAYS[1], DAYS[1])
+
+        self.assertEqual(set(Attendance.objects.values_list('date', flat=True)), {DAYS[1]})
+        self.assertEqual(self.snapshot(), before)
+
+    def test_export_of_a_compacted_session(self):
+        principal = make_user(self.tenant, self.roles['Principal'], 'principal')
+        ModulePermission.objects.create(role=principal.role, module=self.module, can_view=True)
+        self.client.force_login(principal)
+        session = self.session
+
+        def export(kind):
+            response = self.client.get(reverse('attendance:export_tenant'), {
+                'kind': kind, 'format': 'jsonl', 'session': session.pk,
+            })
+            self.assertEqual(response.status_code, 200)
+            return [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+        records = export('records')
+        summaries = export('summary')
+        compact_attendance(self.tenant, session.start_date, session.end_date)
+
+        self.assertFalse(Attendance.objects.exists())
+        self.assertEqual(len(records), 50)
+        self.assertEqual(export('records'), records)
+        self.assertEqual(export('summary'), summaries)
+
@@ -0,0 +1,53 @@
+from modules.attendance.counters import (
+    find_counter_mismatches, get_lifetime_counts, get_range_counts, rebuild_counters,
+)
+from modules.attendance.models import StudentAttendanceCounter
+from modules.attendance.reports import build_student_report
+from modules.attendance.writer import write_attendance
+
+from .base import DAYS, AttendanceTestCase
+
+
+class CumulativeCounterTests(AttendanceTestCase):
+
+    def report_counts(self, start_date, end_date):
+        return {
+            row['student'].pk: {
+                'present': row['present_days'], 'absent': row['absent_days'], 'late': row['late_days'],
+                'excused': row['excused_days'], 'total': row['total_days'],
+            }
+            for row in build_student_report(self.tenant, start_date, end_date, section=self.section)
+        }
+
+    def test_range_counts_match_the_raw_rows(self):
+        self.mark_days(DAYS[2:])
+        # A backdated day and an edit of a day in the middle of the history
+        self.mark_days(DAYS[:1])
+        write_attendance(self.tenant, self.teacher, DAYS[3], [
+            (student, 'absent') for student in self.section_students
+        ], section=self.section)
+
+        self.assertEqual(find_counter_mismatches(self.tenant), {})
+        expected = self.report_counts(DAYS[1], DAYS[3])
+        for student in self.section_students:
+            self.assertEqual(get_range_counts(student, DAYS[1], DAYS[3]), expected[student.pk])
+        self.assertEqual(get_lifetime_counts(self.section_students[0])['total'], 4)
+
+    def test_range_is_two_lookups(self):
+        self.mark_days()
+
+        with self.assertNumQueries(2):
+            counts = get_range_counts(self.section_students[0], DAYS[1], DAYS[-2])
+        self.assertEqual(counts['total'], len(DAYS) - 2)
+
+    def test_rebuild_matches_the_incremental_counters(self):
+        self.mark_days()
+        written = sorted(StudentAttendanceCounter.objects.values_list(
+            'student_id', 'date', 'present_total', 'absent_total', 'late_total', 'excused_total', 'days_total',
+        ), key=str)
+
+        rebuild_counters(self.tenant)
+
+        self.assertEqual(sorted(StudentAttendanceCounter.objects.values_list(
+            'student_id', 'date', 'present_total', 'absent_total', 'late_total', 'excused_total', 'days_total',
+        ), key=str), written)
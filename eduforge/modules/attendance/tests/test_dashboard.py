@@ -0,0 +1,60 @@
+from django.utils import timezone
+
+from modules.attendance.dashboard import get_teacher_dashboard
+from modules.attendance.writer import write_attendance
+
+from .base import DAYS, AttendanceTestCase, make_user
+
+
+class TeacherDashboardCacheTests(AttendanceTestCase):
+
+    def dashboard(self, teacher=None, date=None):
+        return get_teacher_dashboard(self.tenant, teacher or self.teacher, date or timezone.now().date())
+
+    def test_dashboard_is_cached(self):
+        self.dashboard()
+        with self.assertNumQueries(0):
+            self.dashboard()
+
+    def test_marking_a_past_day_drops_that_day_and_today(self):
+        today = self.dashboard()
+        past = self.dashboard(date=DAYS[0])
+        self.assertEqual(past['present_count'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            write_attendance(self.tenant, self.teacher, DAYS[0], [
+                (student, 'present') for student in self.section_students
+            ], section=self.section)
+
+        self.assertEqual(self.dashboard(date=DAYS[0])['present_count'], len(self.section_students))
+        self.assertEqual(len(self.dashboard()['recent_history']), len(today['recent_history']) + 1)
+
+    def test_enrollment_drops_the_section_teachers_dashboard(self):
+        before = self.dashboard()['total_students']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.enroll('newcomer')
+
+        self.assertEqual(self.dashboard()['total_students'], before + 1)
+
+    def test_class_teacher_change_drops_both_dashboards(self):
+        other = make_user(self.tenant, self.teacher.role, 'other')
+        self.dashboard()
+        self.assertEqual(self.dashboard(teacher=other)['user_classes'], [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.legacy_class.class_teacher = other
+            self.legacy_class.save()
+
+        self.assertEqual([c['type'] for c in self.dashboard()['user_classes']], ['academic'])
+        self.assertEqual([c['type'] for c in self.dashboard(teacher=other)['user_classes']], ['legacy'])
+
+    def test_moving_a_student_drops_the_class_teachers_dashboard(self):
+        before = self.dashboard()['total_students']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            student = self.class_students[0]
+            student.class_assigned = None
+            student.save()
+
+        self.assertEqual(self.dashboard()['total_students'], before - 1)
@@ -0,0 +1,56 @@
+import json
+
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+
+from core.plugins.models import ModulePermission
+
+from .base import DAYS, AttendanceTestCase, make_user
+
+
+class TenantExportTests(AttendanceTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        ModulePermission.objects.create(
+            module=cls.module, role=cls.roles['Principal'], can_view=True, can_edit=True, can_manage=True,
+        )
+        cls.principal = make_user(cls.tenant, cls.roles['Principal'], 'principal')
+
+    def export(self, user=None, **params):
+        self.client.force_login(user or self.principal)
+        return self.client.get(reverse('attendance:export_tenant'), params)
+
+    def lines(self, response):
+        self.assertIsInstance(response, StreamingHttpResponse)
+        return b''.join(response.streaming_content).decode().splitlines()
+
+    def test_records_csv(self):
+        self.mark_days()
+
+        lines = self.lines(self.export(start_date=DAYS[1], end_date=DAYS[-1]))
+
+        self.assertEqual(lines[0], 'date,roll_number,admission_number,first_name,last_name,class_name,section,status,notes')
+        self.assertEqual(len(lines), 1 + (len(DAYS) - 1) * (len(self.section_students) + len(self.class_students)))
+        self.assertTrue(all(line.startswith(str(DAYS[1])) for line in lines[1:11]))
+
+    def test_section_summary_jsonl(self):
+        self.mark_days()
+
+        rows = [json.loads(line) for line in self.lines(self.export(
+            kind='summary', format='jsonl', session=self.session.pk, section=self.section.pk,
+        ))]
+
+        self.assertEqual([row['first_name'] for row in rows], [f'section{i}' for i in range(6)])
+        self.assertEqual({row['class_name'] for row in rows}, {'Grade 5'})
+        self.assertTrue(all(row['total_days'] == len(DAYS) for row in rows))
+        # present, present, absent, present, late
+        self.assertEqual((rows[0]['present_days'], rows[0]['absent_days'], rows[0]['late_days']), (3, 1, 1))
+        self.assertEqual(rows[0]['percentage'], 60.0)
+
+    def test_principals_only(self):
+        response = self.export(user=self.teacher)
+
+        self.assertRedirects(response, reverse('attendance:index'), fetch_redirect_response=False)
+        self.assertEqual(self.export(kind='everything').status_code, 400)
@@ -0,0 +1,68 @@
+from django.urls import reverse
+
+from core.plugins.models import ModulePermission
+from modules.attendance.heatmap import get_heatmap
+from modules.attendance.models import Attendance
+from modules.attendance.writer import write_attendance
+
+from .base import DAYS, AttendanceTestCase, make_user
+
+
+class HeatmapTests(AttendanceTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        ModulePermission.objects.create(module=cls.module, role=cls.roles['Principal'], can_view=True)
+        cls.principal = make_user(cls.tenant, cls.roles['Principal'], 'principal')
+
+    def expected_cells(self, **group):
+        """Present percentages per day of April, read from the rows."""
+        cells = []
+        for day in range(1, 31):
+            statuses = list(Attendance.objects.filter(date__day=day, **group).values_list('status', flat=True))
+            cells.append(round(statuses.count('present') / len(statuses) * 100, 1) if statuses else None)
+        return cells
+
+    def test_cells_match_the_rows(self):
+        self.mark_days()
+
+        with self.assertNumQueries(3):
+            heatmap = get_heatmap(self.tenant, DAYS[0])
+
+        self.assertEqual(len(heatmap['days']), 30)
+        self.assertEqual(
+            [(row['type'], row['cells']) for row in heatmap['rows']],
+            [
+                ('class', self.expected_cells(student__class_assigned=self.legacy_class)),
+                ('section', self.expected_cells(student__enrollment__section=self.section)),
+            ],
+        )
+        self.assertEqual(heatmap['daily'], self.expected_cells())
+
+    def test_heatmap_is_cached_until_a_write(self):
+        self.mark_days()
+        get_heatmap(self.tenant, DAYS[0])
+        with self.assertNumQueries(0):
+            get_heatmap(self.tenant, DAYS[-1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            write_attendance(self.tenant, self.teacher, DAYS[0], [
+                (student, 'present') for student in self.section_students
+            ], section=self.section)
+
+        section_row = get_heatmap(self.tenant, DAYS[0])['rows'][1]
+        self.assertEqual(section_row['cells'][0], 100.0)
+
+    def test_principals_only(self):
+        self.mark_days()
+
+        self.client.force_login(self.teacher)
+        self.assertEqual(self.client.get(reverse('attendance:heatmap_data')).status_code, 403)
+
+        self.client.force_login(self.principal)
+        response = self.client.get(reverse('attendance:heatmap_data'), {'month': '2026-04'})
+        self.assertEqual(response.json(), get_heatmap(self.tenant, DAYS[0]))
+        response = self.client.get(reverse('attendance:heatmap'), {'month': '2026-04'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Grade 5')
@@ -0,0 +1,80 @@
+import csv
+import io
+import os
+import shutil
+import tempfile
+
+from modules.attendance.importer import import_file
+from modules.attendance.models import Attendance
+
+from .base import DAYS, AttendanceTestCase
+
+
+class ImporterTests(AttendanceTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write_file(self, rows, name='attendance.csv'):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['admission_number', 'date', 'status'])
+            writer.writerows(rows)
+        return path
+
+    def rows(self, status='P'):
+        return [
+            (student.admission_number, day.isoformat(), status)
+            for day in DAYS[:3]
+            for student in self.class_students
+        ]
+
+    def statuses(self):
+        return set(Attendance.objects.for_tenant(self.tenant).values_list('status', flat=True))
+
+    def test_import_and_rejects(self):
+        path = self.write_file(self.rows() + [
+            ('L99', DAYS[0].isoformat(), 'P'),
+            ('L1', '2026-13-01', 'P'),
+            ('L1', DAYS[0].isoformat(), 'maybe'),
+        ])
+        rejects = io.StringIO()
+
+        result = import_file(self.tenant, path, rejects=csv.writer(rejects))
+
+        self.assertEqual((result.read, result.imported, result.skipped, result.rejected), (15, 12, 0, 3))
+        self.assertEqual((result.first_date, result.last_date), (DAYS[0], DAYS[2]))
+        self.assertEqual(Attendance.objects.for_tenant(self.tenant).count(), 12)
+        reasons = [row[1] for row in csv.reader(io.StringIO(rejects.getvalue()))]
+        self.assertEqual(reasons, ['unknown admission_number "L99"', 'invalid date "2026-13-01"', 'invalid status "maybe"'])
+
+    def test_existing_days_are_skipped_unless_updating(self):
+        import_file(self.tenant, self.write_file(self.rows()))
+
+        path = self.write_file(self.rows('A'), name='again.csv')
+        result = import_file(self.tenant, path)
+        self.assertEqual((result.imported, result.skipped), (0, 12))
+        self.assertEqual(self.statuses(), {'present'})
+
+        result = import_file(self.tenant, path, update=True)
+        self.assertEqual((result.imported, result.skipped), (12, 0))
+        self.assertEqual(self.statuses(), {'absent'})
+
+    def test_interrupted_import_resumes_from_checkpoint(self):
+        path = self.write_file(self.rows())
+        checkpoint_path = f'{path}.checkpoint'
+
+        def interrupt(result):
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            import_file(self.tenant, path, batch_size=5, checkpoint_path=checkpoint_path, on_batch=interrupt)
+        self.assertEqual(Attendance.objects.for_tenant(self.tenant).count(), 5)
+
+        result = import_file(self.tenant, path, batch_size=5, checkpoint_path=checkpoint_path)
+
+        self.assertEqual((result.read, result.imported, result.skipped), (12, 12, 0))
+        self.assertEqual(Attendance.objects.for_tenant(self.tenant).count(), 12)
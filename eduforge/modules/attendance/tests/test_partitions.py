@@ -0,0 +1,66 @@
+from datetime import date
+from unittest import skipIf, skipUnless
+
+from django.db import connection
+
+from django.test import SimpleTestCase
+
+from modules.attendance.partitions import (
+    DEFAULT_PARTITION, INTERVAL_MONTH, INTERVAL_YEAR, TABLE, convert_to_partitioned, create_partitions,
+    iter_periods, list_partitions, partition_name,
+)
+
+from .base import AttendanceTestCase
+
+
+class PeriodTests(SimpleTestCase):
+
+    def test_monthly_periods(self):
+        periods = list(iter_periods(date(2025, 11, 20), date(2026, 1, 5), INTERVAL_MONTH))
+
+        self.assertEqual(periods, [
+            (date(2025, 11, 1), date(2025, 12, 1)),
+            (date(2025, 12, 1), date(2026, 1, 1)),
+            (date(2026, 1, 1), date(2026, 2, 1)),
+        ])
+        self.assertEqual(partition_name(periods[1][0], INTERVAL_MONTH), f'{TABLE}_p2025_12')
+
+    def test_yearly_periods(self):
+        periods = list(iter_periods(date(2025, 6, 1), date(2026, 6, 1), INTERVAL_YEAR))
+
+        self.assertEqual(periods, [(date(2025, 1, 1), date(2026, 1, 1)), (date(2026, 1, 1), date(2027, 1, 1))])
+        self.assertEqual(partition_name(periods[0][0], INTERVAL_YEAR), f'{TABLE}_p2025')
+
+
+@skipIf(connection.vendor == 'postgresql', 'Covered by PartitionTests')
+class UnsupportedDatabaseTests(AttendanceTestCase):
+
+    def test_functions_are_noops(self):
+        self.assertFalse(convert_to_partitioned(INTERVAL_MONTH))
+        self.assertEqual(create_partitions(date(2026, 1, 1), date(2026, 12, 31), INTERVAL_MONTH), [])
+        self.assertEqual(list_partitions(), [])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Attendance partitioning requires PostgreSQL')
+class PartitionTests(AttendanceTestCase):
+
+    def partition_counts(self, day):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT tableoid::regclass::text, COUNT(*) FROM {TABLE} WHERE date = %s GROUP BY 1',
+                [day],
+            )
+            return cursor.fetchall()
+
+    def test_rows_in_the_default_partition_move_to_a_new_partition(self):
+        self.assertTrue(convert_to_partitioned(INTERVAL_MONTH))
+        # Past the partitions the conversion created, so kept by the DEFAULT partition
+        later = date(date.today().year + 2, 1, 15)
+        self.mark_days([later])
+        self.assertEqual(self.partition_counts(later), [(DEFAULT_PARTITION, 10)])
+
+        created = create_partitions(later, later, INTERVAL_MONTH)
+
+        self.assertEqual(created, [partition_name(later.replace(day=1), INTERVAL_MONTH)])
+        self.assertEqual(self.partition_counts(later), [(created[0], 10)])
+        self.assertEqual(list_partitions()[-1][0], DEFAULT_PARTITION)
@@ -0,0 +1,63 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from modules.academic.models import Enrollment
+from modules.attendance.models import Student
+from modules.attendance.profiles import sync_enrollment_profiles
+
+from .base import AttendanceTestCase
+
+
+class ProfileSyncTests(AttendanceTestCase):
+
+    def sync(self):
+        with CaptureQueriesContext(connection) as queries:
+            result = sync_enrollment_profiles(tenant=self.tenant)
+        return result, len(queries)
+
+    def test_missing_profiles_are_created_in_bulk(self):
+        for i in range(2):
+            self.enroll(f'new{i}')
+        result, small = self.sync()
+        self.assertEqual(result, (2, 0))
+
+        for i in range(6):
+            self.enroll(f'later{i}')
+        result, large = self.sync()
+        self.assertEqual(result, (6, 0))
+        self.assertEqual(large, small)
+
+        self.assertEqual(
+            Student.objects.filter(enrollment__section=self.section).count(),
+            Enrollment.objects.filter(section=self.section).count(),
+        )
+        self.assertEqual(self.sync()[0], (0, 0))
+
+    def test_roll_numbers_follow_the_enrollment(self):
+        student = self.section_students[0]
+        Enrollment.objects.filter(pk=student.enrollment_id).update(roll_number='40')
+
+        self.assertEqual(self.sync()[0], (0, 1))
+        student.refresh_from_db()
+        self.assertEqual(student.roll_number, '40')
+
+    def test_legacy_class_profiles_keep_their_roll_number(self):
+        student = self.class_students[0]
+        enrollment = Enrollment.objects.create(
+            tenant=self.tenant,
+            student=student.user,
+            section=self.section,
+            academic_session=self.session,
+            roll_number='41',
+            enrollment_date=student.admission_date,
+        )
+
+        self.assertEqual(self.sync()[0], (0, 1))
+        student.refresh_from_db()
+        self.assertEqual((student.enrollment_id, student.roll_number), (enrollment.pk, '1'))
+
+    def test_new_enrollment_gets_a_profile_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            enrollment = self.enroll('newcomer')
+
+        self.assertTrue(Student.objects.filter(user=enrollment.student, enrollment=enrollment).exists())
@@ -0,0 +1,112 @@
+from django.test import override_settings
+from django.urls import reverse
+
+from modules.attendance.models import Attendance, QueuedAttendanceSubmission
+from modules.attendance.queue import MAX_ATTEMPTS, drain_queue, enqueue_attendance, process_queue
+from modules.attendance.rollups import AttendanceConflict
+from modules.attendance.submissions import get_pending_submissions
+from modules.attendance.writer import write_attendance
+
+from .base import DAYS, AttendanceTestCase, make_tenant, make_user
+
+
+@override_settings(ATTENDANCE_WRITE_BEHIND=True)
+class WriteBehindQueueTests(AttendanceTestCase):
+
+    def enqueue(self, statuses, marked_by=None, **kwargs):
+        return enqueue_attendance(self.tenant, marked_by or self.teacher, DAYS[0], statuses, **kwargs)
+
+    def other_teacher(self):
+        return make_user(self.tenant, self.teacher.role, 'other')
+
+    def section_statuses(self):
+        """Statuses the section API shows for the day, keyed by user id."""
+        self.client.force_login(self.teacher)
+        response = self.client.get(
+            reverse('api:v1:section-attendance', args=[self.section.pk]), {'date': DAYS[0].isoformat()}
+        )
+        return {entry['student']: entry['status'] for entry in response.json()['students']}
+
+    def test_queued_submission_is_visible_before_the_drain(self):
+        first, second = self.section_students[:2]
+        self.enqueue([(student, 'present') for student in self.section_students], section=self.section)
+        self.enqueue([(first, 'absent')], section=self.section)
+
+        self.assertFalse(Attendance.objects.exists())
+        statuses = self.section_statuses()
+        self.assertEqual(statuses[str(first.user_id)], 'absent')
+        self.assertEqual(statuses[str(second.user_id)], 'present')
+
+        written, left = drain_queue()
+
+        self.assertEqual((written, left), (2, 0))
+        self.assertEqual(self.section_statuses(), statuses)
+        self.assertEqual(Attendance.objects.get(student=first).status, 'absent')
+        self.assertEqual(Attendance.objects.count(), len(self.section_students))
+
+    def test_submissions_are_written_per_section_day(self):
+        self.enqueue([(student, 'present') for student in self.section_students], section=self.section)
+        self.enqueue([(student, 'late') for student in self.class_students], class_obj=self.legacy_class)
+        self.enqueue([(self.section_students[0], 'excused')], section=self.section)
+
+        self.assertEqual(process_queue(batch_size=1), (2, 2, 0))
+        self.assertEqual(QueuedAttendanceSubmission.objects.count(), 1)
+        self.assertEqual(Attendance.objects.get(student=self.section_students[0]).status, 'excused')
+        self.assertEqual(get_pending_submissions(self.tenant, DAYS[0]), [])
+
+        self.assertEqual(process_queue(), (1, 1, 0))
+        self.assertFalse(QueuedAttendanceSubmission.objects.exists())
+
+    def test_failing_submission_is_parked(self):
+        other_tenant, roles = make_tenant('beta')
+        QueuedAttendanceSubmission.objects.create(
+            tenant=self.tenant,
+            section=self.section,
+            date=DAYS[0],
+            marked_by=make_user(other_tenant, roles['Teacher'], 'stranger'),
+            statuses={str(self.section_students[0].pk): 'late'},
+        )
+
+        written, left = drain_queue()
+
+        self.assertEqual((written, left), (0, 1))
+        self.assertEqual(QueuedAttendanceSubmission.objects.get().attempts, MAX_ATTEMPTS)
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_each_marker_is_kept(self):
+        other = self.other_teacher()
+        first, second = self.section_students[:2]
+        self.enqueue([(student, 'present') for student in self.section_students], section=self.section)
+        self.enqueue([(first, 'absent')], marked_by=other, section=self.section)
+
+        self.assertEqual(drain_queue(), (2, 0))
+        self.assertEqual(Attendance.objects.get(student=first).marked_by, other)
+        self.assertEqual(Attendance.objects.get(student=second).marked_by, self.teacher)
+
+    def test_stale_versions_are_refused_when_queued(self):
+        write_attendance(self.tenant, self.teacher, DAYS[0], [(self.section_students[0], 'late')], section=self.section)
+        other = self.other_teacher()
+
+        with self.assertRaises(AttendanceConflict) as raised:
+            self.enqueue([(self.section_students[0], 'absent')], section=self.section, expected_version=0)
+        self.assertEqual(raised.exception.current_version, 1)
+
+        self.enqueue([(self.section_students[0], 'absent')], section=self.section, expected_version=1)
+        # The same marker may resubmit; someone else based on version 1 may not
+        self.enqueue([(self.section_students[1], 'absent')], section=self.section, expected_version=1)
+        with self.assertRaises(AttendanceConflict):
+            self.enqueue([(self.section_students[0], 'present')], marked_by=other, section=self.section, expected_version=1)
+
+        self.assertEqual(drain_queue(), (2, 0))
+        self.assertEqual(Attendance.objects.filter(status='absent').count(), 2)
+
+    def test_submissions_gone_stale_are_parked(self):
+        student = self.section_students[0]
+        self.enqueue([(student, 'absent')], section=self.section, expected_version=0)
+        # Written directly before the queue gets to it
+        write_attendance(self.tenant, self.teacher, DAYS[0], [(student, 'late')], section=self.section)
+
+        self.assertEqual(drain_queue(), (0, 1))
+        self.assertEqual(QueuedAttendanceSubmission.objects.get().attempts, MAX_ATTEMPTS)
+        self.assertEqual(Attendance.objects.get(student=student).status, 'late')
+        self.assertEqual(self.section_statuses()[str(student.user_id)], 'late')
@@ -0,0 +1,45 @@
+from django.urls import reverse
+
+from modules.attendance.reports import build_student_report
+
+from .base import DAYS, AttendanceTestCase, STATUS_CYCLE
+
+
+class StudentReportTests(AttendanceTestCase):
+
+    def test_counts_and_percentages(self):
+        self.mark_days()
+
+        rows = build_student_report(self.tenant, DAYS[1], DAYS[-1], section=self.section)
+
+        self.assertEqual([row['student'] for row in rows], self.section_students)
+        for i, row in enumerate(rows):
+            statuses = [STATUS_CYCLE[(i + offset) % len(STATUS_CYCLE)] for offset in range(1, len(DAYS))]
+            self.assertEqual(row['total_days'], len(DAYS) - 1)
+            self.assertEqual(row['present_days'], statuses.count('present'))
+            self.assertEqual(row['absent_days'], statuses.count('absent'))
+            self.assertEqual(row['late_days'], statuses.count('late'))
+            self.assertEqual(row['excused_days'], statuses.count('excused'))
+            self.assertEqual(row['percentage'], round(statuses.count('present') / len(statuses) * 100, 2))
+
+    def test_report_is_one_grouped_query(self):
+        self.mark_days()
+
+        # Plus one read of archived months
+        with self.assertNumQueries(2):
+            rows = build_student_report(self.tenant, DAYS[0], DAYS[-1], section=self.section)
+        self.assertEqual(len(rows), len(self.section_students))
+
+    def test_csv_export(self):
+        self.mark_days()
+        self.client.force_login(self.teacher)
+
+        response = self.client.get(
+            reverse('attendance:export_csv', args=[self.legacy_class.pk]),
+            {'start_date': DAYS[0], 'end_date': DAYS[-1]},
+        )
+
+        lines = response.content.decode().splitlines()
+        self.assertEqual(lines[0], 'Roll Number,Student Name,Total Days,Present,Absent,Late,Attendance %')
+        self.assertEqual(len(lines), 1 + len(self.class_students))
+        self.assertTrue(lines[1].startswith(f'1,legacy0,{len(DAYS)},'))
@@ -0,0 +1,48 @@
+from modules.attendance.models import AttendanceDailyRollup
+from modules.attendance.rollups import COUNT_FIELDS, get_daily_totals, rebuild_rollups
+from modules.attendance.writer import write_attendance
+
+from .base import DAYS, AttendanceTestCase
+
+
+def rollup_rows():
+    return sorted(
+        AttendanceDailyRollup.objects.values_list('section_id', 'legacy_class_id', 'date', *COUNT_FIELDS),
+        key=str,
+    )
+
+
+class DailyRollupTests(AttendanceTestCase):
+
+    def rollup(self, **group):
+        return AttendanceDailyRollup.objects.get(date=DAYS[0], **group)
+
+    def test_writer_keeps_the_rollup_in_step(self):
+        write_attendance(self.tenant, self.teacher, DAYS[0], [
+            (student, 'present') for student in self.section_students
+        ], section=self.section)
+        write_attendance(self.tenant, self.teacher, DAYS[0], [
+            (self.section_students[0], 'absent'), (self.section_students[1], 'late'),
+        ], section=self.section)
+
+        rollup = self.rollup(section=self.section)
+        self.assertEqual(
+            [getattr(rollup, field) for field in COUNT_FIELDS],
+            [4, 1, 1, 0, len(self.section_students)],
+        )
+
+    def test_daily_totals_sum_every_group(self):
+        self.mark_days()
+
+        totals = get_daily_totals(self.tenant, DAYS[0])
+
+        self.assertEqual(totals['total_count'], len(self.section_students) + len(self.class_students))
+        self.assertEqual(totals['present_count'], self.rollup(section=self.section).present_count
+                         + self.rollup(legacy_class=self.legacy_class).present_count)
+
+    def test_rebuild_matches_the_incremental_rollups(self):
+        self.mark_days()
+        written = rollup_rows()
+
+        self.assertEqual(rebuild_rollups(self.tenant), len(DAYS) * 2)
+        self.assertEqual(rollup_rows(), written)
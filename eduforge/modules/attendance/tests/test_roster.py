@@ -0,0 +1,66 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from modules.attendance.roster import get_day_roster
+from modules.attendance.writer import write_attendance
+
+from .base import DAYS, AttendanceTestCase
+
+
+class DayRosterTests(AttendanceTestCase):
+
+    def roster(self, date=DAYS[0]):
+        return get_day_roster(self.tenant, date, section=self.section)
+
+    def test_roster_lists_students_in_roll_order(self):
+        write_attendance(self.tenant, self.teacher, DAYS[0], [(self.section_students[1], 'late')], section=self.section)
+
+        roster = self.roster()
+
+        self.assertEqual(roster['version'], 1)
+        self.assertEqual([student['id'] for student in roster['students']], [s.pk for s in self.section_students])
+        self.assertEqual(
+            [student['status'] for student in roster['students']],
+            [None, 'late', None, None, None, None],
+        )
+        legacy = get_day_roster(self.tenant, DAYS[0], class_obj=self.legacy_class)
+        self.assertEqual([student['id'] for student in legacy['students']], [s.pk for s in self.class_students])
+
+    def test_roster_is_cached_until_the_day_is_written(self):
+        self.roster()
+        with self.assertNumQueries(1):
+            self.roster()
+
+        write_attendance(self.tenant, self.teacher, DAYS[0], [(self.section_students[0], 'absent')], section=self.section)
+
+        self.assertEqual(self.roster()['students'][0]['status'], 'absent')
+
+    def test_new_enrollment_drops_todays_roster(self):
+        today = timezone.now().date()
+        self.roster(today)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.enroll('newcomer')
+
+        self.assertEqual(len(self.roster(today)['students']), 7)
+
+    def test_mark_page_query_count_does_not_grow_with_the_roster(self):
+        def load(day):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(
+                    reverse('attendance:mark_attendance', args=[self.section.pk]), {'date': day.isoformat()}
+                )
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        self.client.force_login(self.teacher)
+        # The first request also fills the entitlement cache
+        load(DAYS[0])
+        small = load(DAYS[1])
+
+        for i in range(6):
+            self.enroll(f'late{i}')
+        self.sync_section()
+        self.assertEqual(load(DAYS[2]), small)
@@ -0,0 +1,109 @@
+from core.plugins.models import TenantModule
+from modules.academic.models import Enrollment
+from modules.attendance.counters import find_counter_mismatches
+from modules.attendance.models import Attendance, Student
+from modules.attendance.profiles import sync_enrollment_profiles
+from modules.attendance.rollups import rebuild_rollups
+from modules.attendance.sparse import (
+    CONFIG_KEY, DENSE, SPARSE, convert_to_dense, convert_to_sparse, get_implied_present, get_storage_mode, is_sparse,
+)
+from modules.attendance.writer import write_attendance
+
+from .base import DAYS, JOINED, AttendanceTestCase, make_user
+
+
+class SparseConversionTests(AttendanceTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.mark_days()
+
+    def to_sparse(self):
+        rebuild_rollups(tenant=self.tenant)
+        return convert_to_sparse(self.tenant)
+
+    def test_sparse_and_back_keeps_reports(self):
+        before = self.snapshot()
+        rows = Attendance.objects.count()
+
+        deleted = self.to_sparse()
+
+        self.assertEqual(get_storage_mode(self.tenant), SPARSE)
+        self.assertGreater(deleted, 0)
+        self.assertFalse(Attendance.objects.filter(status='present').exists())
+        self.assertEqual(self.snapshot(), before)
+        self.assertEqual(find_counter_mismatches(self.tenant), {})
+
+        created = convert_to_dense(self.tenant)
+
+        self.assertEqual(get_storage_mode(self.tenant), DENSE)
+        self.assertEqual(created, deleted)
+        self.assertEqual(Attendance.objects.count(), rows)
+        self.assertEqual(self.snapshot(), before)
+
+    def test_writes_in_sparse_mode_store_exceptions_only(self):
+        self.to_sparse()
+        before = self.snapshot()
+
+        self.mark_days()
+
+        self.assertFalse(Attendance.objects.filter(status='present').exists())
+        self.assertEqual(self.snapshot(), before)
+        self.assertEqual(find_counter_mismatches(self.tenant), {})
+
+    def test_partial_edit_keeps_recorded_presence(self):
+        self.to_sparse()
+        before = self.snapshot()
+        student = self.section_students[0]
+
+        write_attendance(self.tenant, self.teacher, DAYS[0], [(student, 'absent')], section=self.section)
+        write_attendance(self.tenant, self.teacher, DAYS[0], [(student, 'present')], section=self.section)
+
+        self.assertFalse(Attendance.objects.filter(status='present').exists())
+        self.assertEqual(self.snapshot(), before)
+        self.assertEqual(find_counter_mismatches(self.tenant), {})
+
+    def test_membership_changes_keep_recorded_presence(self):
+        self.to_sparse()
+        before = self.snapshot()
+        leaver = self.section_students[0]
+        mover = self.class_students[0]
+
+        # Bulk updates skip model signals
+        Enrollment.objects.filter(pk=leaver.enrollment_id).update(is_active=False)
+        Student.objects.filter(pk=mover.pk).update(class_assigned=None)
+        # A backdated enrollment adds no presence the rollups never counted
+        newcomer = make_user(self.tenant, self.teacher.role, 'newcomer')
+        Enrollment.objects.create(
+            tenant=self.tenant,
+            student=newcomer,
+            section=self.section,
+            academic_session=self.section.class_obj.academic_session,
+            roll_number='7',
+            enrollment_date=JOINED,
+        )
+        sync_enrollment_profiles(tenant=self.tenant)
+
+        self.assertFalse(Attendance.objects.filter(status='present').exists())
+        self.assertEqual(get_implied_present(self.tenant, student_ids=[newcomer.student_profile.pk]), {})
+        self.assertEqual(find_counter_mismatches(self.tenant), {})
+        after = self.snapshot()
+        # Exports label records with the student's current class
+        self.assertEqual(
+            [record[:5] + record[7:] for record in after['records']],
+            [record[:5] + record[7:] for record in before['records']],
+        )
+        # Group reports list current members only
+        self.assertEqual(after['section'][:-1], before['section'][1:])
+        self.assertEqual(after['section'][-1][1:], (0, 0, 0, 0, 0))
+        self.assertEqual(after['class'], before['class'][1:])
+
+    def test_storage_mode_is_cached(self):
+        get_storage_mode(self.tenant)
+
+        with self.assertNumQueries(0):
+            self.assertFalse(is_sparse(self.tenant))
+        installation = TenantModule.objects.get(tenant=self.tenant, module__slug='attendance')
+        installation.config = {CONFIG_KEY: SPARSE}
+        installation.save()
+        self.assertTrue(is_sparse(self.tenant))
@@ -0,0 +1,49 @@
+from modules.attendance.models import AttendanceSubmission
+from modules.attendance.submissions import get_pending_submissions, get_recent_history
+from modules.attendance.writer import write_attendance
+
+from .base import DAYS, AttendanceTestCase
+
+
+class SubmissionLogTests(AttendanceTestCase):
+
+    def mark_section(self, day, status='present'):
+        write_attendance(self.tenant, self.teacher, day, [
+            (student, status) for student in self.section_students
+        ], section=self.section)
+
+    def test_every_submission_is_logged(self):
+        self.mark_section(DAYS[0])
+        self.mark_section(DAYS[0], 'absent')
+
+        submissions = AttendanceSubmission.objects.order_by('created_at')
+        self.assertEqual(
+            list(submissions.values_list('section_id', 'date', 'present_count', 'absent_count', 'total_count')),
+            [
+                (self.section.pk, DAYS[0], 6, 0, 6),
+                (self.section.pk, DAYS[0], 0, 6, 6),
+            ],
+        )
+        self.assertEqual(submissions[0].marked_by, self.teacher)
+
+    def test_recent_history_drops_resubmissions(self):
+        self.mark_days(DAYS[:3])
+        self.mark_section(DAYS[0])
+
+        history = get_recent_history(self.tenant, self.teacher, limit=4)
+
+        self.assertEqual(
+            [(entry['date'], entry['is_academic']) for entry in history],
+            [(DAYS[0], True), (DAYS[2], False), (DAYS[2], True), (DAYS[1], False)],
+        )
+
+    def test_pending_submissions(self):
+        self.assertEqual(
+            {entry['type'] for entry in get_pending_submissions(self.tenant, DAYS[0])},
+            {'academic', 'legacy'},
+        )
+
+        self.mark_section(DAYS[0])
+
+        pending = get_pending_submissions(self.tenant, DAYS[0])
+        self.assertEqual([(entry['id'], entry['type']) for entry in pending], [(self.legacy_class.pk, 'legacy')])
@@ -0,0 +1,112 @@
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from modules.attendance.counters import find_counter_mismatches
+from modules.attendance.models import Attendance
+from modules.attendance.rollups import AttendanceConflict, get_rollup_version
+from modules.attendance.writer import write_attendance
+
+from .base import DAYS, AttendanceTestCase, make_tenant, make_user
+
+
+class BatchWriterTests(AttendanceTestCase):
+
+    def test_writes_and_overwrites_a_day(self):
+        students = self.section_students
+        written = write_attendance(self.tenant, self.teacher, DAYS[0], [
+            (students[0], 'present'), (students[1], 'absent'), (students[2], 'holiday'),
+        ])
+        self.assertEqual(written, 2)
+
+        write_attendance(self.tenant, self.teacher, DAYS[0], [(students[1], 'late'), (students[1], 'excused')])
+
+        self.assertEqual(
+            dict(Attendance.objects.filter(date=DAYS[0]).values_list('student_id', 'status')),
+            {students[0].pk: 'present', students[1].pk: 'excused'},
+        )
+
+    def test_students_of_other_tenants_are_refused(self):
+        other_tenant, roles = make_tenant('beta')
+        stranger = make_user(other_tenant, roles['Teacher'], 'stranger')
+
+        with self.assertRaises(ValidationError):
+            write_attendance(self.tenant, stranger, DAYS[0], [(self.section_students[0], 'present')])
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_query_count_does_not_grow_with_the_roster(self):
+        def post(day):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    reverse('attendance:mark_attendance', args=[self.section.pk]) + f'?date={day}',
+                    {f'status_{student.pk}': 'present' for student in students},
+                )
+            self.assertEqual(response.status_code, 302)
+            self.assertEqual(Attendance.objects.filter(date=day).count(), len(students))
+            return len(queries)
+
+        self.client.force_login(self.teacher)
+        students = self.section_students
+        # The first request also fills the entitlement cache
+        post(DAYS[0])
+        small = post(DAYS[1])
+
+        for i in range(6):
+            self.enroll(f'late{i}')
+        students = self.sync_section()
+        self.assertEqual(post(DAYS[2]), small)
+
+
+class OptimisticConcurrencyTests(AttendanceTestCase):
+
+    def write(self, status, expected_version=None, students=None):
+        return write_attendance(
+            self.tenant, self.teacher, DAYS[0],
+            [(student, status) for student in students or self.section_students],
+            section=self.section,
+            expected_version=expected_version,
+        )
+
+    def version(self):
+        return get_rollup_version(self.tenant, DAYS[0], section=self.section)
+
+    def test_every_write_bumps_the_version(self):
+        self.assertEqual(self.version(), 0)
+        self.write('present', expected_version=0)
+        self.assertEqual(self.version(), 1)
+        self.write('absent', expected_version=1)
+        self.write('late')
+        self.assertEqual(self.version(), 3)
+
+    def test_stale_version_raises_and_saves_nothing(self):
+        self.write('present', expected_version=0)
+        # Someone else saves the day after our form was loaded at version 1
+        self.write('late', expected_version=1, students=self.section_students[:1])
+
+        with self.assertRaises(AttendanceConflict) as raised:
+            self.write('absent', expected_version=1)
+
+        self.assertEqual(raised.exception.current_version, 2)
+        self.assertEqual(self.version(), 2)
+        self.assertFalse(Attendance.objects.filter(status='absent').exists())
+        self.assertEqual(find_counter_mismatches(self.tenant), {})
+
+    def test_stale_first_write_raises(self):
+        self.write('present', expected_version=0)
+
+        with self.assertRaises(AttendanceConflict):
+            self.write('absent', expected_version=0)
+
+    def test_stale_write_fails_before_touching_rows(self):
+        self.write('present', expected_version=0)
+
+        with CaptureQueriesContext(connection) as queries:
+            with self.assertRaises(AttendanceConflict):
+                self.write('absent', expected_version=5)
+
+        touched = [
+            query['sql'] for query in queries.captured_queries
+            if '"attendance_attendance"' in query['sql'] or 'attendance_attendancearchivemonth' in query['sql']
+        ]
+        self.assertEqual(touched, [])
@@ -15,5 +15,11 @@ urlpatterns = [
     path('student/', views.student_summary, name='my_attendance'),
     path('reports/', views.class_report, name='class_report'),
     path('reports/<uuid:class_id>/', views.class_report, name='class_report_detail'),
+    path('reports/section/<int:section_id>/', views.class_report, name='section_report_detail'),
     path('export/<uuid:class_id>/', views.export_report_csv, name='export_csv'),
+    path('export/section/<int:section_id>/', views.export_report_csv, name='export_section_csv'),
+    path('export/', views.export_tenant, name='export_tenant'),
+    path('analytics/', views.analytics_report, name='analytics'),
+    path('heatmap/', views.heatmap, name='heatmap'),
+    path('heatmap/data/', views.heatmap_data, name='heatmap_data'),
 ]
@@ -4,14 +4,28 @@ Attendance module views.
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.core.exceptions import ImproperlyConfigured, ValidationError
 from django.db.models import Q, Count
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
 from datetime import datetime, timedelta
 from functools import wraps
 import csv
 
+from .analytics import DEFAULT_CHRONIC_THRESHOLD, build_analytics
+from .archive import get_archived_records
+from .counters import get_lifetime_counts, get_range_counts
+from .dashboard import get_teacher_dashboard
+from .exports import RECORD_FIELDS, SUMMARY_FIELDS, iter_records, iter_summaries, stream_csv, stream_jsonl
+from .heatmap import get_heatmap
 from .models import Class, Student, Attendance
+from .queue import enqueue_attendance, write_behind_enabled
+from .reports import build_student_report
+from .rollups import AttendanceConflict, get_daily_totals
+from .roster import get_day_roster, invalidate_day_roster
+from .sparse import get_implied_records, is_sparse
+from .submissions import get_pending_submissions
+from .writer import write_attendance
 from core.users.models import CustomUser
 
 
@@ -48,6 +62,9 @@ def index(request):
     late_count = 0
     attendance_percentage = 0
     absent_students = []
+    recent_history = []
+    user_classes = []
+    pending_submissions = []
     
     if user_role == 'Student':
         # Student View: specific to the logged-in student
@@ -55,149 +72,39 @@ def index(request):
             # Try to get student profile from legacy or academic enrollment
             student_profile = Student.objects.filter(user=request.user, is_active=True).first()
             if student_profile:
-                # Personal stats
-                my_attendance = Attendance.objects.filter(student=student_profile)
-                total_days = my_attendance.count()
+                # Personal stats from the latest cumulative counter row
+                my_counts = get_lifetime_counts(student_profile)
+                total_days = my_counts['total']
                 if total_days > 0:
-                    my_present = my_attendance.filter(status='present').count()
-                    attendance_percentage = round((my_present / total_days * 100), 2)
-                    present_count = my_present
-                    absent_count = my_attendance.filter(status='absent').count()
-                    late_count = my_attendance.filter(status='late').count()
+                    attendance_percentage = round((my_counts['present'] / total_days * 100), 2)
+                    present_count = my_counts['present']
+                    absent_count = my_counts['absent']
+                    late_count = my_counts['late']
                     total_students = 1  # Represents "Me"
         except Exception:
             pass
             
     elif user_role == 'Teacher':
-        # Teacher View: restricted to assigned classes/sections
-        # Get legacy classes
-        teacher_classes = Class.objects.for_tenant(tenant).filter(class_teacher=request.user, is_active=True)
-        # Get academic sections (if module exists)
-        try:
-            from modules.academic.models import Section, Enrollment
-            active_sections = Section.objects.for_tenant(tenant).filter(class_teacher=request.user)
-            # Combine queries or counts
-            # For dashboard high-level stats, we'll aggregate
-            
-            # 1. Total Students in my classes
-            legacy_student_ids = Student.objects.filter(class_assigned__in=teacher_classes, is_active=True).values_list('id', flat=True)
-            section_student_ids = Enrollment.objects.filter(section__in=active_sections, is_active=True).values_list('student__id', flat=True) # logic might differ as Enrollment links to User not Student model directly usually, but Student model links to User. 
-            # Note: Student model is the central point for Attendance currently.
-            
-            # Let's verify Student model usage. 
-            # The Student model in attendance app is the "Profile". 
-            # Enrollments link to User. 
-            # We need to find Student profiles corresponding to Enrollments.
-            
-            all_student_users = []
-            
-            # Legacy students
-            legacy_users = Student.objects.filter(class_assigned__in=teacher_classes, is_active=True).values_list('user__id', flat=True)
-            
-            # New section students
-            section_users = Enrollment.objects.filter(section__in=active_sections, is_active=True).values_list('student__id', flat=True)
-            
-            # Combine unique user IDs
-            all_related_user_ids = set(list(legacy_users) + list(section_users))
-            total_students = len(all_related_user_ids)
-            
-            # 2. Today's Attendance for these students
-            today_recs = Attendance.objects.for_tenant(tenant).filter(
-                date=today,
-                student__user__id__in=all_related_user_ids
-            )
-            present_count = today_recs.filter(status='present').count()
-            absent_count = today_recs.filter(status='absent').count()
-            late_count = today_recs.filter(status='late').count()
-            
-            if total_students > 0:
-                attendance_percentage = round((present_count / total_students * 100), 2)
-                
-            # 3. Absent students list
-            absent_students = Student.objects.filter(
-                user__id__in=all_related_user_ids,
-                attendance_records__date=today,
-                attendance_records__status='absent'
-            ).select_related('user')[:10]
-            
-        except ImportError:
-            # Fallback for legacy only
-            total_students = Student.objects.filter(class_assigned__in=teacher_classes, is_active=True).count()
-            today_recs = Attendance.objects.filter(student__class_assigned__in=teacher_classes, date=today)
-            present_count = today_recs.filter(status='present').count()
-            absent_count = today_recs.filter(status='absent').count()
-            late_count = today_recs.filter(status='late').count()
-            
-            if total_students > 0:
-                attendance_percentage = round((present_count / total_students * 100), 2)
-                
-            absent_students = Student.objects.filter(
-                class_assigned__in=teacher_classes,
-                attendance_records__date=today,
-                attendance_records__status='absent'
-            ).select_related('user')[:10]
-
-        # Get recently attended classes (history)
-        recent_history = []
-        try:
-            # Fetch recent attendance records marked by this teacher
-            # We fetch a larger chunk to ensure we get enough unique (date, class) groups
-            recent_logs = Attendance.objects.for_tenant(tenant).filter(
-                marked_by=request.user
-            ).select_related(
-                'student__class_assigned',
-                'student__enrollment__section'
-            ).order_by('-updated_at')[:200]
-
-            seen_groups = set()
-            for log in recent_logs:
-                # Identify the class/section
-                class_name = "Unknown Class"
-                class_id = None
-                is_academic = False
-                
-                if log.student.enrollment and log.student.enrollment.section:
-                    # New Academic Structure
-                    class_name = log.student.enrollment.section.full_name
-                    class_id = log.student.enrollment.section.id
-                    is_academic = True
-                elif log.student.class_assigned:
-                    # Legacy Structure
-                    class_name = log.student.class_assigned.name
-                    if log.student.class_assigned.section:
-                        class_name += f" - {log.student.class_assigned.section}"
-                    class_id = log.student.class_assigned.id
-                    is_academic = False
-                else:
-                    continue
-
-                # Group Key: Date + Class
-                group_key = (log.date, class_name)
-                
-                if group_key not in seen_groups:
-                    seen_groups.add(group_key)
-                    recent_history.append({
-                        'class_name': class_name,
-                        'date': log.date,
-                        'id': class_id,
-                        'is_academic': is_academic
-                    })
-                    
-                if len(recent_history) >= 5:
-                    break
-        except Exception as e:
-            # Fallback or error handling
-            print(f"Error fetching recent history: {e}")
-            pass
+        # Teacher View: restricted to assigned classes/sections, cached per day
+        dashboard = get_teacher_dashboard(tenant, request.user, today)
+        total_students = dashboard['total_students']
+        present_count = dashboard['present_count']
+        absent_count = dashboard['absent_count']
+        late_count = dashboard['late_count']
+        attendance_percentage = dashboard['attendance_percentage']
+        absent_students = dashboard['absent_students']
+        recent_history = dashboard['recent_history']
+        user_classes = dashboard['user_classes']
 
     else:
         # Principal/Admin View: Global stats (existing logic)
         recent_history = [] # Not needed for Principal yet, or could add similar logic
         total_students = Student.objects.for_tenant(tenant).filter(is_active=True).count()
-        today_attendance = Attendance.objects.for_tenant(tenant).filter(date=today)
-        present_count = today_attendance.filter(status='present').count()
-        absent_count = today_attendance.filter(status='absent').count()
-        late_count = today_attendance.filter(status='late').count()
+        # Today's counts come from the per-section daily rollups
+        today_totals = get_daily_totals(tenant, today)
+        present_count = today_totals['present_count']
+        absent_count = today_totals['absent_count']
+        late_count = today_totals['late_count']
         
         attendance_percentage = round((present_count / total_students * 100), 2) if total_students > 0 else 0
         
@@ -207,43 +114,9 @@ def index(request):
             is_active=True
         ).select_related('user', 'class_assigned')[:10]
         
-    # Get user's classes if teacher (for list display)
-    user_classes = []
-    if user_role == 'Teacher':
-        # Legacy Classes
-        legacy_classes = Class.objects.for_tenant(tenant).filter(
-            class_teacher=request.user,
-            is_active=True
-        )
+        # Classes and sections nobody has submitted attendance for today
+        pending_submissions = get_pending_submissions(tenant, today)
         
-        # New Academic Sections
-        try:
-            from modules.academic.models import Section
-            academic_sections = Section.objects.for_tenant(tenant).filter(
-                class_teacher=request.user
-            )
-        except ImportError:
-            academic_sections = []
-            
-        # Combine for display - generic structure
-        for lc in legacy_classes:
-            user_classes.append({
-                'id': lc.id,
-                'name': lc.name,
-                'section': lc.section,
-                'student_count': lc.get_student_count(),
-                'type': 'legacy'
-            })
-            
-        for section in academic_sections:
-            user_classes.append({
-                'id': section.id,
-                'name': section.class_obj.name, 
-                'section': section.name,   # just 'A', 'B' etc
-                'student_count': section.enrollments.filter(is_active=True).count(), # approximated
-                'type': 'academic'
-            })
-
     context = {
         'tenant': tenant,
         'user': request.user,
@@ -256,7 +129,8 @@ def index(request):
         'attendance_percentage': attendance_percentage,
         'absent_students': absent_students,
         'user_classes': user_classes,
-        'recent_history': recent_history if 'recent_history' in locals() else [],
+        'recent_history': recent_history,
+        'pending_submissions': pending_submissions,
         'today': today,
     }
     
@@ -337,34 +211,17 @@ def mark_attendance(request, class_id):
     
     if is_academic_section:
         # NEW: Handle academic section
-        from modules.academic.models import Section, Enrollment
+        from modules.academic.models import Section
         
-        section = get_object_or_404(Section, id=section_id, tenant=tenant)
+        section = get_object_or_404(Section.objects.select_related('class_obj'), id=section_id, tenant=tenant)
         class_obj = None  # Not using legacy class
         
         # Check permissions
         user_role = request.user.role.name if request.user.role else None
-        if user_role == 'Teacher' and section.class_teacher != request.user:
+        if user_role == 'Teacher' and section.class_teacher_id != request.user.id:
             messages.error(request, 'You do not have permission to mark attendance for this section.')
             return redirect('attendance:select_class')
         
-        # Get students from enrollments
-        enrollments = Enrollment.objects.for_tenant(tenant).filter(
-            section=section,
-            is_active=True
-        ).select_related('student').order_by('roll_number')
-        
-        # Create student list with enrollment info
-        students_data = []
-        for enrollment in enrollments:
-            students_data.append({
-                'id': enrollment.student.id,
-                'user': enrollment.student,
-                'roll_number': enrollment.roll_number,
-                'name': enrollment.student.get_full_name() or enrollment.student.username,
-                'enrollment': enrollment
-            })
-        
         display_name = section.full_name
         
     else:
@@ -374,27 +231,10 @@ def mark_attendance(request, class_id):
         
         # Check permissions
         user_role = request.user.role.name if request.user.role else None
-        if user_role == 'Teacher' and class_obj.class_teacher != request.user:
+        if user_role == 'Teacher' and class_obj.class_teacher_id != request.user.id:
             messages.error(request, 'You do not have permission to mark attendance for this class.')
             return redirect('attendance:select_class')
         
-        # Get students from legacy Student model
-        students = Student.objects.for_tenant(tenant).filter(
-            class_assigned=class_obj,
-            is_active=True
-        ).select_related('user').order_by('roll_number')
-        
-        # Format for template consistency
-        students_data = []
-        for student in students:
-            students_data.append({
-                'id': student.user.id,
-                'user': student.user,
-                'roll_number': student.roll_number,
-                'name': student.user.get_full_name() or student.user.username,
-                'student_obj': student
-            })
-        
         display_name = str(class_obj)
     
     # Get date from query params or use today
@@ -404,63 +244,72 @@ def mark_attendance(request, class_id):
     except ValueError:
         attendance_date = timezone.now().date()
     
-    # Get existing attendance records for this date
-    existing_attendance = {}
-    if is_academic_section:
-        # Query by student user IDs for academic sections
-        student_ids = [s['id'] for s in students_data]
-        attendance_records = Attendance.objects.filter(
-            tenant=tenant,
-            student__user_id__in=student_ids,
-            date=attendance_date
-        )
-        for record in attendance_records:
-            existing_attendance[str(record.student.user.id)] = record.status
-    else:
-        # Query by legacy class for old structure
-        attendance_records = Attendance.objects.for_tenant(tenant).filter(
-            student__class_assigned=class_obj,
-            date=attendance_date
-        )
-        for record in attendance_records:
-            existing_attendance[str(record.student.user.id)] = record.status
+    # Ordered students with the day's status, keyed by Student.id for both kinds of group
+    roster = get_day_roster(tenant, attendance_date, section=section, class_obj=class_obj)
+    students_data = roster['students']
     
+    conflict = False
     if request.method == 'POST':
-        # Process attendance submission
-        marked_count = 0
+        # Process attendance submission as one batch
+        students = Student.objects.in_bulk([student_data['id'] for student_data in students_data])
+        statuses = [
+            (students[student_data['id']], request.POST.get(f"status_{student_data['id']}"))
+            for student_data in students_data
+            if student_data['id'] in students
+        ]
         
-        for student_data in students_data:
-            status = request.POST.get(f'status_{student_data["id"]}')
-            if status in ['present', 'absent', 'late', 'excused']:
-                # Find or create Student record (for backward compatibility)
-                if is_academic_section:
-                    # For academic sections, ensure Student record exists
-                    student_obj, created = Student.objects.get_or_create(
-                        tenant=tenant,
-                        user=student_data['user'],
-                        defaults={
-                            'roll_number': student_data['roll_number'],
-                            'admission_number': f"ADM-{student_data['user'].id}",
-                            'enrollment': student_data.get('enrollment')
-                        }
-                    )
-                else:
-                    student_obj = student_data['student_obj']
-                
-                # Update or create attendance record
-                attendance, created = Attendance.objects.update_or_create(
-                    tenant=tenant,
-                    student=student_obj,
-                    date=attendance_date,
-                    defaults={
-                        'status': status,
-                        'marked_by': request.user,
-                    }
-                )
-                marked_count += 1
+        # The form carries the day's version; a stale one means a concurrent edit
+        try:
+            expected_version = int(request.POST['version'])
+        except (KeyError, ValueError):
+            expected_version = None
         
-        messages.success(request, f'Attendance marked for {marked_count} students on {attendance_date}.')
-        return redirect('attendance:index')
+        try:
+            # In write-behind mode the queue workers write the submission
+            if write_behind_enabled():
+                marked_count = enqueue_attendance(
+                    tenant,
+                    request.user,
+                    attendance_date,
+                    statuses,
+                    section=section,
+                    class_obj=class_obj,
+                    expected_version=expected_version,
+                )
+                invalidate_day_roster(tenant, attendance_date, section=section, class_obj=class_obj)
+                messages.success(request, f'Attendance for {marked_count} students on {attendance_date} is being saved.')
+                return redirect('attendance:index')
+            
+            marked_count = write_attendance(
+                tenant,
+                request.user,
+                attendance_date,
+                statuses,
+                section=section,
+                class_obj=class_obj,
+                expected_version=expected_version,
+            )
+        except AttendanceConflict:
+            conflict = True
+            roster = get_day_roster(tenant, attendance_date, section=section, class_obj=class_obj)
+            students_data = roster['students']
+        else:
+            messages.success(request, f'Attendance marked for {marked_count} students on {attendance_date}.')
+            return redirect('attendance:index')
+    
+    if conflict:
+        # Show the latest statuses and name the students the submission disagrees with
+        differing = [
+            student_data['name']
+            for student_data in students_data
+            if request.POST.get(f"status_{student_data['id']}") != student_data['status']
+        ]
+        messages.warning(
+            request,
+            'Someone else saved attendance for this day while you were editing, so your changes were not saved. '
+            'The latest attendance is shown below'
+            + (f"; it differs from your submission for {', '.join(differing)}." if differing else '.')
+        )
     
     context = {
         'tenant': tenant,
@@ -470,7 +319,7 @@ def mark_attendance(request, class_id):
         'display_name': display_name,
         'students_data': students_data,
         'attendance_date': attendance_date,
-        'existing_attendance': existing_attendance,
+        'version': roster['version'],
         'module_name': 'Attendance',
         'is_academic_section': is_academic_section,
     }
@@ -530,14 +379,26 @@ def student_summary(request, student_id=None):
         student=student,
         date__gte=start_date,
         date__lte=end_date
-    ).order_by('-date')
+    ).select_related('marked_by').order_by('-date')
+    
+    # Archived days and implied presence are shown alongside live records
+    extra_records = get_archived_records(student, start_date, end_date)
+    if is_sparse(tenant):
+        extra_records += get_implied_records(student, start_date, end_date)
+    if extra_records:
+        attendance_records = sorted(
+            [*attendance_records, *extra_records],
+            key=lambda record: record.date,
+            reverse=True
+        )
     
-    # Calculate statistics
-    total_days = attendance_records.count()
-    present_days = attendance_records.filter(status='present').count()
-    absent_days = attendance_records.filter(status='absent').count()
-    late_days = attendance_records.filter(status='late').count()
-    excused_days = attendance_records.filter(status='excused').count()
+    # Calculate statistics from cumulative counters
+    counts = get_range_counts(student, start_date, end_date)
+    total_days = counts['total']
+    present_days = counts['present']
+    absent_days = counts['absent']
+    late_days = counts['late']
+    excused_days = counts['excused']
     
     attendance_percentage = round((present_days / total_days * 100), 2) if total_days > 0 else 0
     
@@ -560,87 +421,107 @@ def student_summary(request, student_id=None):
     return render(request, 'modules/attendance/student_summary.html', context)
 
 
+def _get_report_range(request):
+    """Parse start_date/end_date query params, defaulting to the current month."""
+    end_date = timezone.now().date()
+    start_date = end_date.replace(day=1)  # Current month
+    
+    if request.GET.get('start_date'):
+        try:
+            start_date = datetime.strptime(request.GET.get('start_date'), '%Y-%m-%d').date()
+        except ValueError:
+            pass
+    
+    if request.GET.get('end_date'):
+        try:
+            end_date = datetime.strptime(request.GET.get('end_date'), '%Y-%m-%d').date()
+        except ValueError:
+            pass
+    
+    return start_date, end_date
+
+
+def _get_report_target(request, class_id=None, section_id=None):
+    """
+    Resolve the legacy class or academic section a report is for.
+    Returns (class_obj, section, error_redirect).
+    """
+    tenant = request.user.tenant
+    user_role = request.user.role.name if request.user.role else None
+    class_obj = None
+    section = None
+    
+    if class_id:
+        class_obj = get_object_or_404(Class, id=class_id, tenant=tenant)
+        teacher_id = class_obj.class_teacher_id
+    elif section_id:
+        from modules.academic.models import Section
+        section = get_object_or_404(Section.objects.select_related('class_obj'), id=section_id, tenant=tenant)
+        teacher_id = section.class_teacher_id
+    else:
+        return None, None, None
+    
+    # Check permissions
+    if user_role == 'Teacher' and teacher_id != request.user.id:
+        messages.error(request, 'You do not have permission to view this class report.')
+        return class_obj, section, redirect('attendance:class_report')
+    
+    return class_obj, section, None
+
+
 @teacher_or_principal_required
-def class_report(request, class_id=None):
+def class_report(request, class_id=None, section_id=None):
     """
-    View attendance report for a class.
+    View attendance report for a legacy class or academic section.
     """
     tenant = request.user.tenant
     user_role = request.user.role.name if request.user.role else None
     
-    # Get classes based on role
-    if user_role == 'Principal':
-        classes = Class.objects.for_tenant(tenant).filter(is_active=True)
-    else:  # Teacher
-        classes = Class.objects.for_tenant(tenant).filter(
-            class_teacher=request.user,
-            is_active=True
+    # Get classes and sections based on role
+    classes = Class.objects.for_tenant(tenant).filter(is_active=True)
+    if user_role != 'Principal':  # Teacher
+        classes = classes.filter(class_teacher=request.user)
+    classes = classes.annotate(
+        student_count=Count('students', filter=Q(students__is_active=True))
+    )
+    
+    academic_sections = []
+    try:
+        from modules.academic.models import Section
+        academic_sections = Section.objects.for_tenant(tenant).filter(
+            class_obj__academic_session__is_active=True
+        ).select_related('class_obj').annotate(
+            student_count=Count('enrollments', filter=Q(enrollments__is_active=True))
         )
+        if user_role != 'Principal':
+            academic_sections = academic_sections.filter(class_teacher=request.user)
+    except ImportError:
+        # Academic module not installed
+        pass
+    
+    class_obj, section, error_redirect = _get_report_target(request, class_id, section_id)
+    if error_redirect:
+        return error_redirect
     
-    class_obj = None
     students_data = []
+    start_date = end_date = None
     
-    if class_id:
-        class_obj = get_object_or_404(Class, id=class_id, tenant=tenant)
-        
-        # Check permissions
-        if user_role == 'Teacher' and class_obj.class_teacher != request.user:
-            messages.error(request, 'You do not have permission to view this class report.')
-            return redirect('attendance:class_report')
-        
-        # Get date range
-        end_date = timezone.now().date()
-        start_date = end_date.replace(day=1)  # Current month
-        
-        if request.GET.get('start_date'):
-            try:
-                start_date = datetime.strptime(request.GET.get('start_date'), '%Y-%m-%d').date()
-            except ValueError:
-                pass
-        
-        if request.GET.get('end_date'):
-            try:
-                end_date = datetime.strptime(request.GET.get('end_date'), '%Y-%m-%d').date()
-            except ValueError:
-                pass
-        
-        # Get students and their attendance
-        students = Student.objects.for_tenant(tenant).filter(
-            class_assigned=class_obj,
-            is_active=True
-        ).select_related('user').order_by('roll_number')
-        
-        for student in students:
-            attendance_records = Attendance.objects.filter(
-                student=student,
-                date__gte=start_date,
-                date__lte=end_date
-            )
-            
-            total_days = attendance_records.count()
-            present_days = attendance_records.filter(status='present').count()
-            absent_days = attendance_records.filter(status='absent').count()
-            late_days = attendance_records.filter(status='late').count()
-            
-            percentage = round((present_days / total_days * 100), 2) if total_days > 0 else 0
-            
-            students_data.append({
-                'student': student,
-                'total_days': total_days,
-                'present_days': present_days,
-                'absent_days': absent_days,
-                'late_days': late_days,
-                'percentage': percentage,
-            })
+    if class_obj or section:
+        start_date, end_date = _get_report_range(request)
+        students_data = build_student_report(
+            tenant, start_date, end_date, class_obj=class_obj, section=section
+        )
     
     context = {
         'tenant': tenant,
         'user': request.user,
         'classes': classes,
+        'academic_sections': academic_sections,
         'class_obj': class_obj,
+        'section': section,
         'students_data': students_data,
-        'start_date': start_date if class_id else None,
-        'end_date': end_date if class_id else None,
+        'start_date': start_date,
+        'end_date': end_date,
         'module_name': 'Attendance',
     }
     
@@ -648,64 +529,235 @@ def class_report(request, class_id=None):
 
 
 @teacher_or_principal_required
-def export_report_csv(request, class_id):
+def export_report_csv(request, class_id=None, section_id=None):
     """
-    Export class attendance report as CSV.
+    Export class or section attendance report as CSV.
     """
     tenant = request.user.tenant
-    class_obj = get_object_or_404(Class, id=class_id, tenant=tenant)
-    
-    # Get date range
-    end_date = timezone.now().date()
-    start_date = end_date.replace(day=1)
+    class_obj, section, error_redirect = _get_report_target(request, class_id, section_id)
+    if error_redirect:
+        return error_redirect
+    if not class_obj and not section:
+        return redirect('attendance:class_report')
     
-    if request.GET.get('start_date'):
-        try:
-            start_date = datetime.strptime(request.GET.get('start_date'), '%Y-%m-%d').date()
-        except ValueError:
-            pass
-    
-    if request.GET.get('end_date'):
-        try:
-            end_date = datetime.strptime(request.GET.get('end_date'), '%Y-%m-%d').date()
-        except ValueError:
-            pass
+    start_date, end_date = _get_report_range(request)
+    report_name = class_obj.name if class_obj else section.full_name
     
     # Create CSV response
     response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="attendance_report_{class_obj.name}_{start_date}_{end_date}.csv"'
+    response['Content-Disposition'] = f'attachment; filename="attendance_report_{report_name}_{start_date}_{end_date}.csv"'
     
     writer = csv.writer(response)
     writer.writerow(['Roll Number', 'Student Name', 'Total Days', 'Present', 'Absent', 'Late', 'Attendance %'])
     
-    # Get students and their attendance
-    students = Student.objects.for_tenant(tenant).filter(
-        class_assigned=class_obj,
-        is_active=True
-    ).select_related('user').order_by('roll_number')
-    
-    for student in students:
-        attendance_records = Attendance.objects.filter(
-            student=student,
-            date__gte=start_date,
-            date__lte=end_date
-        )
-        
-        total_days = attendance_records.count()
-        present_days = attendance_records.filter(status='present').count()
-        absent_days = attendance_records.filter(status='absent').count()
-        late_days = attendance_records.filter(status='late').count()
-        
-        percentage = round((present_days / total_days * 100), 2) if total_days > 0 else 0
-        
+    for row in build_student_report(tenant, start_date, end_date, class_obj=class_obj, section=section):
         writer.writerow([
-            student.roll_number,
-            student.user.get_full_name(),
-            total_days,
-            present_days,
-            absent_days,
-            late_days,
-            f'{percentage}%'
+            row['student'].roll_number,
+            row['student'].user.get_full_name(),
+            row['total_days'],
+            row['present_days'],
+            row['absent_days'],
+            row['late_days'],
+            f"{row['percentage']}%"
         ])
     
     return response
+
+
+@login_required
+def export_tenant(request):
+    """
+    Stream a tenant-wide attendance export (Principal only).
+    
+    Query params: kind=records|summary, format=csv|jsonl, start_date,
+    end_date, session (academic session id) and section (section id).
+    """
+    tenant = request.user.tenant
+    user_role = request.user.role.name if request.user.role else None
+    if user_role != 'Principal':
+        messages.error(request, 'Only Principals can export tenant-wide attendance.')
+        return redirect('attendance:index')
+    
+    kind = request.GET.get('kind', 'records')
+    export_format = request.GET.get('format', 'csv')
+    if kind not in ('records', 'summary') or export_format not in ('csv', 'jsonl'):
+        return HttpResponseBadRequest('Invalid export kind or format.')
+    
+    start_date, end_date = _get_report_range(request)
+    section = None
+    try:
+        from modules.academic.models import AcademicSession, Section
+        if request.GET.get('session'):
+            session = get_object_or_404(AcademicSession, id=request.GET.get('session'), tenant=tenant)
+            # Clamp the range to the session unless explicit dates were given
+            if not request.GET.get('start_date'):
+                start_date = session.start_date
+            if not request.GET.get('end_date'):
+                end_date = session.end_date
+        if request.GET.get('section'):
+            section = get_object_or_404(Section, id=request.GET.get('section'), tenant=tenant)
+    except ImportError:
+        # Academic module not installed
+        pass
+    except ValueError:
+        return HttpResponseBadRequest('Invalid session or section.')
+    
+    if kind == 'records':
+        rows = iter_records(tenant, start_date, end_date, section)
+        fields = RECORD_FIELDS
+    else:
+        rows = iter_summaries(tenant, start_date, end_date, section)
+        fields = SUMMARY_FIELDS
+    
+    if export_format == 'csv':
+        response = StreamingHttpResponse(stream_csv(rows, fields), content_type='text/csv')
+    else:
+        response = StreamingHttpResponse(stream_jsonl(rows), content_type='application/x-ndjson')
+    
+    response['Content-Disposition'] = (
+        f'attachment; filename="attendance_{kind}_{tenant.subdomain}_{start_date}_{end_date}.{export_format}"'
+    )
+    return response
+
+
+@login_required
+def analytics_report(request):
+    """
+    Attendance analytics for the whole school or one section (Principal only).
+    
+    Query params: start_date, end_date, section (section id), class (legacy
+    class id) and threshold (chronic absenteeism percentage).
+    """
+    tenant = request.user.tenant
+    user_role = request.user.role.name if request.user.role else None
+    if user_role != 'Principal':
+        messages.error(request, 'Only Principals can view attendance analytics.')
+        return redirect('attendance:index')
+    
+    start_date, end_date = _get_report_range(request)
+    
+    try:
+        threshold = float(request.GET.get('threshold', DEFAULT_CHRONIC_THRESHOLD * 100)) / 100
+    except ValueError:
+        threshold = DEFAULT_CHRONIC_THRESHOLD
+    
+    class_obj = None
+    section = None
+    academic_sections = []
+    try:
+        from modules.academic.models import Section
+        academic_sections = Section.objects.for_tenant(tenant).filter(
+            class_obj__academic_session__is_active=True
+        ).select_related('class_obj')
+        if request.GET.get('section'):
+            section = get_object_or_404(Section, id=request.GET.get('section'), tenant=tenant)
+    except ImportError:
+        # Academic module not installed
+        pass
+    except ValueError:
+        return HttpResponseBadRequest('Invalid section.')
+    if request.GET.get('class'):
+        try:
+            class_obj = get_object_or_404(Class, id=request.GET.get('class'), tenant=tenant)
+        except ValidationError:
+            return HttpResponseBadRequest('Invalid class.')
+    
+    try:
+        analytics = build_analytics(
+            tenant, start_date, end_date,
+            class_obj=class_obj, section=section, chronic_threshold=threshold
+        )
+    except ImproperlyConfigured as e:
+        messages.error(request, str(e))
+        return redirect('attendance:index')
+    
+    # Students needing attention: chronic absentees and ongoing absence streaks
+    flagged_students = sorted(
+        (
+            student for student in analytics['students']
+            if student['is_chronic'] or student['current_absence_streak'] >= 3
+        ),
+        key=lambda student: (-student['missed_rate'], -student['longest_absence_streak'])
+    )[:50]
+    
+    context = {
+        'tenant': tenant,
+        'user': request.user,
+        'user_role': user_role,
+        'analytics': analytics,
+        'flagged_students': flagged_students,
+        'academic_sections': academic_sections,
+        'class_obj': class_obj,
+        'section': section,
+        'start_date': start_date,
+        'end_date': end_date,
+        'threshold': round(threshold * 100, 2),
+        'module_name': 'Attendance',
+    }
+    
+    return render(request, 'modules/attendance/analytics.html', context)
+
+
+def _get_heatmap_params(request):
+    """
+    Parse the heatmap month (YYYY-MM, default this month) and the
+    below-threshold percentage (default 90) from the query string.
+    """
+    try:
+        month = datetime.strptime(request.GET.get('month', ''), '%Y-%m').date()
+    except ValueError:
+        month = timezone.now().date().replace(day=1)
+    try:
+        threshold = float(request.GET.get('threshold', 90))
+    except ValueError:
+        threshold = 90.0
+    return month, threshold
+
+
+@login_required
+def heatmap(request):
+    """
+    Sections x days heatmap of present percentages for a month (Principal only).
+    """
+    tenant = request.user.tenant
+    user_role = request.user.role.name if request.user.role else None
+    if user_role != 'Principal':
+        messages.error(request, 'Only Principals can view the attendance heatmap.')
+        return redirect('attendance:index')
+    
+    month, threshold = _get_heatmap_params(request)
+    heatmap_data = get_heatmap(tenant, month)
+    
+    rows = [
+        dict(row, below_count=sum(1 for cell in row['cells'] if cell is not None and cell < threshold))
+        for row in heatmap_data['rows']
+    ]
+    
+    context = {
+        'tenant': tenant,
+        'user': request.user,
+        'user_role': user_role,
+        'month': month,
+        'previous_month': (month - timedelta(days=1)).replace(day=1),
+        'next_month': (month + timedelta(days=31)).replace(day=1),
+        'days': [datetime.strptime(day, '%Y-%m-%d').date() for day in heatmap_data['days']],
+        'rows': rows,
+        'daily': heatmap_data['daily'],
+        'threshold': threshold,
+        'module_name': 'Attendance',
+    }
+    
+    return render(request, 'modules/attendance/heatmap.html', context)
+
+
+@login_required
+def heatmap_data(request):
+    """
+    JSON heatmap for a month (Principal only). Query params: month (YYYY-MM).
+    """
+    user_role = request.user.role.name if request.user.role else None
+    if user_role != 'Principal':
+        return JsonResponse({'error': 'Only Principals can view the attendance heatmap.'}, status=403)
+    
+    month, _ = _get_heatmap_params(request)
+    return JsonResponse(get_heatmap(request.user.tenant, month))
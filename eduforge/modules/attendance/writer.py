@@ -0,0 +1,146 @@
+"""
+Batch attendance writer.
+
+Writes a whole section-day (or legacy class-day) of attendance in one
+transaction with a constant number of queries, however large the class.
+Tenant membership is validated once per submission instead of once per
+row through Attendance.full_clean().
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .archive import release_archived_days
+from .counters import apply_status_changes
+from .dashboard import invalidate_teacher_dashboards
+from .heatmap import invalidate_heatmaps
+from .models import Attendance
+from .profiles import sync_profiles
+from .rollups import claim_daily_rollup, refresh_daily_rollup
+from .sparse import fill_implied_statuses, get_recorded_present, implied_members, is_sparse
+from .submissions import record_submission
+
+
+VALID_STATUSES = frozenset(status for status, _ in Attendance.STATUS_CHOICES)
+
+
+def ensure_student_profiles(tenant, enrollments):
+    """
+    Return {user_id: Student} for academic enrollments, creating or
+    updating their attendance Student profiles in bulk.
+    """
+    profiles, _, _ = sync_profiles(enrollments)
+
+    for student in profiles.values():
+        if student.tenant_id != tenant.id:
+            raise ValidationError("Student must belong to the same tenant.")
+
+    return profiles
+
+
+def write_attendance(tenant, marked_by, date, statuses, section=None, class_obj=None, expected_version=None):
+    """
+    Upsert attendance for one day.
+
+    ``statuses`` is an iterable of (Student, status) pairs. Invalid statuses
+    are skipped. When the academic ``section`` or legacy ``class_obj`` being
+    marked is given, its daily rollup is refreshed and the submission is
+    logged in the same transaction. For tenants with exceptions-only
+    storage, that rollup is the day's taken marker: present students who
+    are members of the group on that day are recorded on it instead of
+    getting a row.
+    Per-student cumulative counters are always updated, and the cached
+    dashboards of the class teacher and the marker and the month's heatmap
+    are dropped. Returns the number of records written.
+
+    ``expected_version`` is the section-day's rollup version the submission
+    was based on. If someone else has written the day since,
+    AttendanceConflict is raised before any attendance row is read, locked
+    or saved. The claimed rollup row stays locked until the transaction
+    ends, which serializes writers of the same day.
+    """
+    if marked_by is not None and marked_by.tenant_id != tenant.id:
+        raise ValidationError("Marker must belong to the same tenant.")
+
+    # Keyed by student so a duplicate entry cannot hit the same row twice
+    records = {}
+    for student, status in statuses:
+        if status not in VALID_STATUSES:
+            continue
+        if student.tenant_id != tenant.id:
+            raise ValidationError("Student must belong to the same tenant.")
+        records[student.pk] = Attendance(
+            tenant=tenant,
+            student=student,
+            date=date,
+            status=status,
+            marked_by=marked_by,
+        )
+
+    if not records:
+        return 0
+
+    # Exceptions-only storage needs the section-day or class-day as marker
+    sparse = (section is not None or class_obj is not None) and is_sparse(tenant)
+
+    with transaction.atomic():
+        taken = None
+        if section is not None or class_obj is not None:
+            # First, so a stale version fails before any attendance row is
+            # touched; the claimed rollup row stays locked until commit and
+            # serializes writers of the day
+            _, taken = claim_daily_rollup(
+                tenant, date, section=section, class_obj=class_obj, expected_version=expected_version
+            )
+
+        # Previous statuses, so counter deltas match what is overwritten.
+        # Archived days move back to live rows.
+        previous = release_archived_days(list(records), date)
+        current = Attendance.objects.filter(student_id__in=list(records), date=date)
+        if taken is None:
+            # No section-day to serialize on
+            current = current.select_for_update()
+        previous.update(current.values_list('student_id', 'status'))
+
+        stored = records
+        implied = None
+        if sparse:
+            # Students without a row whom the marker records were present
+            recorded = get_recorded_present(tenant, date, section=section, class_obj=class_obj) if taken else set()
+            fill_implied_statuses(
+                tenant, date, previous, list(records), section=section, class_obj=class_obj, recorded=recorded
+            )
+            members = implied_members(tenant, date, list(records), section=section, class_obj=class_obj)
+            implied = (recorded - set(records)) | {
+                student_id for student_id, record in records.items()
+                if record.status == 'present' and student_id in members
+            }
+            stored = {student_id: record for student_id, record in records.items() if student_id not in implied}
+            Attendance.objects.filter(
+                student_id__in=[student_id for student_id in records if student_id not in stored],
+                date=date,
+            ).delete()
+
+        Attendance.objects.bulk_create(
+            list(stored.values()),
+            update_conflicts=True,
+            unique_fields=['student', 'date'],
+            update_fields=['status', 'marked_by', 'updated_at'],
+        )
+        refresh_daily_rollup(tenant, date, section=section, class_obj=class_obj, implied=implied)
+        record_submission(
+            tenant, marked_by, date,
+            [record.status for record in records.values()],
+            section=section, class_obj=class_obj,
+        )
+        apply_status_changes(tenant, date, {
+            student_id: (previous.get(student_id), record.status)
+            for student_id, record in records.items()
+        })
+        invalidate_teacher_dashboards([
+            getattr(section, 'class_teacher_id', None),
+            getattr(class_obj, 'class_teacher_id', None),
+            getattr(marked_by, 'pk', None),
+        ], date)
+        invalidate_heatmaps(tenant.id, date)
+
+    return len(records)